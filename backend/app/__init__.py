@@ -3,10 +3,11 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from .config import config
+from .utils.routing import RoutingSession, configure_replicas
 import os
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 cors = CORS()
 
@@ -17,24 +18,59 @@ def create_app(config_name='default'):
     # Load configuration
     app.config.from_object(config[config_name])
     
+    if app.config['PROXY_FIX_X_FOR']:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    
+    if app.config['JSON_FAST_ENCODER']:
+        from .utils.encoding import FastJSONProvider
+        app.json = FastJSONProvider(app)
+    
     # Initialize extensions
+    configure_replicas(app)
     db.init_app(app)
     jwt.init_app(app)
     cors.init_app(app, origins=app.config['CORS_ORIGINS'])
     
+    from .utils.database import init_database
+    from .utils.instrumentation import init_instrumentation
+    from .utils.cache import init_cache
+    from .utils.events import init_events
+    from .utils.activity import init_activity
+    from .utils.notifications import init_notifications
+    init_database(app)
+    init_instrumentation(app)
+    init_cache(app)
+    init_events(app)
+    init_activity(app)
+    init_notifications(app)
+    
     # Register blueprints
     from .routes.auth import auth_bp
     from .routes.projects import projects_bp
     from .routes.tasks import tasks_bp
+    from .routes.sync import sync_bp
+    from .routes.search import search_bp
+    from .routes.notifications import notifications_bp
     
     api_prefix = app.config['API_PREFIX']
     app.register_blueprint(auth_bp, url_prefix=f'{api_prefix}/auth')
     app.register_blueprint(projects_bp, url_prefix=f'{api_prefix}/projects')
     app.register_blueprint(tasks_bp, url_prefix=f'{api_prefix}/tasks')
+    app.register_blueprint(sync_bp, url_prefix=f'{api_prefix}/sync')
+    app.register_blueprint(search_bp, url_prefix=f'{api_prefix}/search')
+    app.register_blueprint(notifications_bp, url_prefix=f'{api_prefix}/notifications')
     
-    # Create database tables
+    # Register CLI commands
+    from .commands import register_commands
+    register_commands(app)
+    
+    # Create database tables on the primary; replicas receive them through replication
     with app.app_context():
-        db.create_all()
+        db.create_all(bind_key=None)
+    
+    from .utils.search import init_search
+    init_search(app)
     
     # Error handlers
     @app.errorhandler(404)
@@ -45,4 +81,20 @@ def create_app(config_name='default'):
     def internal_error(error):
         return jsonify({'error': 'Internal server error'}), 500
     
+    from .utils.helpers import InvalidArgument
+    from .utils.passwords import PasswordHasherBusy
+    from .utils.ratelimit import RateLimitExceeded
+    
+    @app.errorhandler(InvalidArgument)
+    def invalid_argument(error):
+        return jsonify({'error': str(error)}), 400
+    
+    @app.errorhandler(RateLimitExceeded)
+    def rate_limited(error):
+        return jsonify({'error': str(error)}), 429, {'Retry-After': str(error.retry_after)}
+    
+    @app.errorhandler(PasswordHasherBusy)
+    def hasher_busy(error):
+        return jsonify({'error': str(error)}), 503, {'Retry-After': '1'}
+    
     return app
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+ASGI application serving the read-heavy endpoints on SQLAlchemy's asyncio engine.
+
+    uvicorn --factory app.asgi:create_asgi_app
+
+GET requests for the routes in routes/aio.py are handled on the event loop.
+Every other request is passed to the regular Flask app running in a thread
+pool, so a deployment can choose this or the WSGI entry point (wsgi.py)
+without any difference in the API. Requires starlette, a2wsgi and the
+asyncio driver for the database (aiomysql, aiosqlite or asyncpg).
+"""
+import contextlib
+from flask import current_app
+from flask_jwt_extended import verify_jwt_in_request
+
+def create_asgi_app(config_name='production'):
+    """Build the ASGI app around a Flask app created with config_name"""
+    try:
+        from starlette.applications import Starlette
+        from starlette.routing import Mount, Route
+        from a2wsgi import WSGIMiddleware
+    except ImportError:
+        raise RuntimeError('The ASGI entry point requires the starlette and a2wsgi packages')
+    
+    from . import create_app
+    from .routes.aio import ASYNC_ROUTES
+    from .utils.database import init_async_engine
+    
+    flask_app = create_app(config_name)
+    engine = init_async_engine(flask_app)
+    prefix = flask_app.config['API_PREFIX']
+    
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+    
+    routes = [
+        Route(prefix + path, _endpoint(flask_app, handler), methods=['GET'])
+        for path, handler in ASYNC_ROUTES
+    ]
+    # Anything else, including other methods on the same paths
+    routes.append(Mount('/', app=WSGIMiddleware(flask_app)))
+    
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.flask_app = flask_app
+    return app
+
+def _endpoint(flask_app, handler):
+    """
+    Adapt an async handler to Starlette.
+    
+    The handler runs in a Flask request context built from the ASGI request,
+    with the JWT verified as @jwt_required would and an asyncio session
+    opened for it. Its return value and any exception go through Flask's
+    own response, error handler and after_request processing.
+    """
+    from starlette.responses import Response
+    
+    async def endpoint(request):
+        with flask_app.test_request_context(
+            request.url.path,
+            method=request.method,
+            query_string=request.url.query,
+            headers=list(request.headers.items())
+        ):
+            try:
+                rv = flask_app.preprocess_request()
+                if rv is None:
+                    verify_jwt_in_request()
+                    async with current_app.extensions['async_session']() as session:
+                        rv = await handler(session, **request.path_params)
+            except Exception as error:
+                try:
+                    rv = flask_app.handle_user_exception(error)
+                except Exception as unhandled:
+                    rv = flask_app.handle_exception(unhandled)
+            response = flask_app.process_response(flask_app.make_response(rv))
+        
+        result = Response(response.get_data(), status_code=response.status_code)
+        result.raw_headers = [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in response.headers.items()
+        ]
+        return result
+    
+    return endpoint
@@ -0,0 +1,233 @@
+import click
+from flask.cli import with_appcontext
+
+@click.command('rebalance-positions')
+@click.option('--project-id', type=int, help='Only rebalance this project')
+@with_appcontext
+def rebalance_positions_command(project_id):
+    """Renumber task sort keys to evenly spaced values"""
+    from . import db
+    from .models.task import Task
+    from .utils.positions import rebalance_all, rebalance_column
+    
+    if project_id is None:
+        columns = rebalance_all()
+    else:
+        statuses = db.session.query(Task.status).filter_by(project_id=project_id).distinct()
+        columns = 0
+        for (status,) in statuses:
+            rebalance_column(project_id, status)
+            columns += 1
+    click.echo(f'Rebalanced {columns} columns')
+
+@click.command('prune-revoked-tokens')
+@with_appcontext
+def prune_revoked_tokens_command():
+    """Delete revocation entries for refresh tokens that have expired anyway"""
+    from datetime import datetime
+    from . import db
+    from .models.token import RevokedToken
+    
+    deleted = RevokedToken.query.filter(RevokedToken.expires_at < datetime.utcnow()).delete()
+    db.session.commit()
+    click.echo(f'Pruned {deleted} revoked tokens')
+
+@click.command('prune-change-log')
+@click.option('--days', type=int, help='Keep this many days (default SYNC_RETENTION_DAYS)')
+@with_appcontext
+def prune_change_log_command(days):
+    """Delete delta-sync change log entries past the retention window"""
+    from datetime import datetime, timedelta
+    from flask import current_app
+    from . import db
+    from .models.change import ChangeLog
+    
+    days = days if days is not None else current_app.config['SYNC_RETENTION_DAYS']
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    # The newest entry always stays: it tells sync which tokens were pruned,
+    # and keeps an emptied table from handing out its ids again
+    newest = db.session.query(db.func.max(ChangeLog.id)).scalar() or 0
+    deleted = ChangeLog.query.filter(ChangeLog.created_at < cutoff, ChangeLog.id < newest).delete()
+    db.session.commit()
+    click.echo(f'Pruned {deleted} change log entries')
+
+@click.command('prune-activity-log')
+@click.option('--days', type=int, help='Keep this many days (default ACTIVITY_RETENTION_DAYS)')
+@with_appcontext
+def prune_activity_log_command(days):
+    """Delete activity log entries past the retention window"""
+    from datetime import datetime, timedelta
+    from flask import current_app
+    from . import db
+    from .models.activity import Activity
+    
+    days = days if days is not None else current_app.config['ACTIVITY_RETENTION_DAYS']
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = Activity.query.filter(Activity.created_at < cutoff).delete()
+    db.session.commit()
+    click.echo(f'Pruned {deleted} activity log entries')
+
+@click.command('rebuild-task-rollups')
+@click.option('--project-id', type=int, help='Only rebuild this project')
+@with_appcontext
+def rebuild_task_rollups_command(project_id):
+    """Recompute project and assignee task rollups from the tasks table"""
+    from .utils.rollups import rebuild_rollups
+    
+    rows = rebuild_rollups(project_id)
+    click.echo(f'Rebuilt {rows} rollup rows')
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Rebuild the SQLite FTS5 search indexes from the tasks and projects tables"""
+    from .utils.search import rebuild_search_index, search_backend
+    
+    rebuilt = rebuild_search_index()
+    if rebuilt:
+        click.echo(f"Rebuilt search indexes for {', '.join(rebuilt)}")
+    else:
+        click.echo(f'Nothing to rebuild: the {search_backend()} backend maintains its own index')
+
+@click.command('rebuild-inbox')
+@click.option('--user-id', type=int, help='Only rebuild this user')
+@with_appcontext
+def rebuild_inbox_command(user_id):
+    """Recompute the "My Work" inbox rows from the tasks and memberships"""
+    from .utils.inbox import rebuild_inbox
+    
+    rows = rebuild_inbox(user_id)
+    click.echo(f'Rebuilt {rows} inbox rows')
+
+@click.command('check-inbox')
+@click.option('--fix', is_flag=True, help='Rebuild the inbox when it has drifted')
+@with_appcontext
+def check_inbox_command(fix):
+    """Compare the inbox rows with a fresh computation; exits 1 on drift"""
+    from .utils.inbox import check_inbox, rebuild_inbox
+    
+    missing, stale = check_inbox()
+    if not missing and not stale:
+        click.echo('Inbox is consistent')
+        return
+    click.echo(f'Inbox has drifted: {missing} missing rows, {stale} stale rows')
+    if fix:
+        click.echo(f'Rebuilt {rebuild_inbox()} inbox rows')
+        return
+    raise SystemExit(1)
+
+@click.command('scan-due-dates')
+@click.option('--date', 'today', type=click.DateTime(formats=['%Y-%m-%d']), help='Scan as of this day (default today)')
+@with_appcontext
+def scan_due_dates_command(today):
+    """Create due-soon and overdue notifications, then deliver pending ones"""
+    from .utils.notifications import scan_due_dates, deliver_notifications
+    
+    created = scan_due_dates(today.date() if today else None)
+    delivered = deliver_notifications()
+    click.echo(f'Created {created} notifications, delivered {delivered}')
+
+@click.command('purge-deleted-projects')
+@click.option('--project-id', type=int, help='Purge this deleted project now, even within its restore window')
+@with_appcontext
+def purge_deleted_projects_command(project_id):
+    """Remove the rows of deleted projects whose restore window has passed"""
+    from .utils.deletion import purge_deleted_projects, purge_project
+    
+    if project_id is not None:
+        removed = purge_project(project_id)
+        if removed is None:
+            raise click.ClickException(f'Project {project_id} is not deleted')
+        click.echo(f'Purged project {project_id} and its {removed} tasks')
+    else:
+        click.echo(f'Purged {purge_deleted_projects()} deleted projects')
+
+@click.command('import-tasks')
+@click.argument('path', required=False, type=click.Path(exists=True, dir_okay=False))
+@click.option('--project-id', type=int, help='Project to import into')
+@click.option('--user-id', type=int, help='Recorded as the user who imported the tasks')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='Default: from the file extension')
+@click.option('--resume', 'job_id', type=int, help='Continue an interrupted import job instead')
+@with_appcontext
+def import_tasks_command(path, project_id, user_id, fmt, job_id):
+    """Import tasks from a CSV or NDJSON file into a project, reporting progress"""
+    import os
+    from .utils.access import find_project
+    from .utils.imports import claim_import, create_import, guess_format, run_import
+    
+    if job_id is None:
+        if path is None or project_id is None:
+            raise click.UsageError('PATH and --project-id are required unless resuming')
+        if find_project(project_id) is None:
+            raise click.ClickException(f'Project {project_id} not found')
+        fmt = fmt or guess_format(path, None)
+        if fmt is None:
+            raise click.UsageError('Cannot tell the format from the file name; pass --format')
+        with open(path, 'rb') as source:
+            job = create_import(project_id, user_id, fmt, iter(lambda: source.read(1 << 20), b''),
+                                filename=os.path.basename(path))
+        job_id = job.id
+        click.echo(f'Created import job {job_id}')
+    
+    def progress(job):
+        percent = job.bytes_read * 100 // job.size if job.size else 100
+        click.echo(f'{percent}%: {job.rows_read} rows read, {job.rows_imported} imported, {job.rows_failed} failed')
+    
+    if not claim_import(job_id):
+        raise click.ClickException(f'Import job {job_id} is completed or still running')
+    try:
+        job = run_import(job_id, progress)
+    except Exception as error:
+        raise click.ClickException(f'Import job {job_id} failed ({error}); continue it with --resume {job_id}')
+    for error in job.errors or []:
+        click.echo(f"Row {error['row']}: {error['error']}")
+    click.echo(f'Imported {job.rows_imported} tasks; {job.rows_failed} rows failed')
+
+@click.command('run-scheduler')
+@click.option('--interval', type=int, help='Seconds between scans (default REMINDER_SCAN_INTERVAL)')
+@with_appcontext
+def run_scheduler_command(interval):
+    """Scan due dates, deliver notifications and purge deleted projects every interval, until stopped"""
+    import time
+    from flask import current_app
+    from . import db
+    from .utils.notifications import scan_due_dates, deliver_notifications
+    from .utils.deletion import purge_deleted_projects
+    
+    interval = interval or current_app.config['REMINDER_SCAN_INTERVAL']
+    while True:
+        started = time.monotonic()
+        try:
+            created = scan_due_dates()
+            delivered = deliver_notifications()
+            current_app.logger.info('Created %d notifications, delivered %d', created, delivered)
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception('Due date scan failed')
+        finally:
+            db.session.remove()
+        try:
+            purged = purge_deleted_projects()
+            if purged:
+                current_app.logger.info('Purged %d deleted projects', purged)
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception('Project purge failed')
+        finally:
+            db.session.remove()
+        time.sleep(max(interval - (time.monotonic() - started), 0))
+
+def register_commands(app):
+    """Register CLI commands on the app"""
+    app.cli.add_command(rebalance_positions_command)
+    app.cli.add_command(prune_revoked_tokens_command)
+    app.cli.add_command(prune_change_log_command)
+    app.cli.add_command(prune_activity_log_command)
+    app.cli.add_command(rebuild_task_rollups_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(rebuild_inbox_command)
+    app.cli.add_command(check_inbox_command)
+    app.cli.add_command(scan_due_dates_command)
+    app.cli.add_command(purge_deleted_projects_command)
+    app.cli.add_command(import_tasks_command)
+    app.cli.add_command(run_scheduler_command)
@@ -1,5 +1,12 @@
 from .user import User, project_members
 from .project import Project
 from .task import Task
+from .token import RevokedToken
+from .change import ChangeLog
+from .rollup import TaskRollup
+from .work_item import WorkItem
+from .activity import Activity
+from .notification import Notification
+from .import_job import ImportJob
 
-__all__ = ['User', 'Project', 'Task', 'project_members']
\ No newline at end of file
+__all__ = ['User', 'Project', 'Task', 'RevokedToken', 'ChangeLog', 'TaskRollup', 'WorkItem', 'Activity', 'Notification', 'ImportJob', 'project_members']
\ No newline at end of file
@@ -0,0 +1,35 @@
+from .. import db
+from datetime import datetime
+
+class Activity(db.Model):
+    """
+    Who changed what on a project: status moves, reassignments, members.
+    
+    Written in batches by utils/activity.py, so the ids and created_at order
+    of entries logged by different workers can differ by a flush interval.
+    """
+    __tablename__ = 'activity_log'
+    __table_args__ = (
+        # Project feed, newest first
+        db.Index('ix_activity_log_project_id_id', 'project_id', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, nullable=False)
+    task_id = db.Column(db.Integer)
+    user_id = db.Column(db.Integer)  # The actor
+    action = db.Column(db.String(40), nullable=False)  # e.g. 'task.status_changed'
+    data = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'project_id': self.project_id,
+            'task_id': self.task_id,
+            'user_id': self.user_id,
+            'action': self.action,
+            'data': self.data or {},
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -0,0 +1,23 @@
+from .. import db
+from datetime import datetime
+
+class ChangeLog(db.Model):
+    """
+    Append-only record of task and project changes for delta sync.
+    
+    The autoincrement id is the sync token: a client that has seen every
+    change up to id N asks for rows with id > N. Ids can become visible out
+    of order as transactions commit, so rows are only served once they are
+    SYNC_SETTLE_SECONDS old. Rows with a user_id are
+    addressed to that user only (e.g. "you were removed from this project")
+    and are visible even when the project no longer is.
+    """
+    __tablename__ = 'change_log'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # 'task' or 'project'
+    entity_id = db.Column(db.Integer, nullable=False)
+    project_id = db.Column(db.Integer, index=True)
+    user_id = db.Column(db.Integer, index=True)
+    action = db.Column(db.String(10), nullable=False)  # 'upsert' or 'delete'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
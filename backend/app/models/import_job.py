@@ -0,0 +1,54 @@
+from .. import db
+from datetime import datetime
+
+class ImportJob(db.Model):
+    """
+    A bulk task import from an uploaded CSV or NDJSON file.
+    
+    The upload is kept in the instance folder until the job completes.
+    ``bytes_read`` is the byte position after the last committed row and is
+    written in the same transaction as that batch's tasks, so a job resumed
+    after a crash continues exactly where it stopped, without duplicates.
+    """
+    __tablename__ = 'import_jobs'
+    __table_args__ = (
+        # A project's imports, newest first
+        db.Index('ix_import_jobs_project_id_id', 'project_id', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer)  # Who started the import
+    format = db.Column(db.String(10), nullable=False)  # 'csv' or 'ndjson'
+    filename = db.Column(db.String(255))
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, completed, failed
+    size = db.Column(db.BigInteger, nullable=False, default=0)
+    bytes_read = db.Column(db.BigInteger, nullable=False, default=0)
+    rows_read = db.Column(db.Integer, nullable=False, default=0)
+    rows_imported = db.Column(db.Integer, nullable=False, default=0)
+    rows_failed = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.JSON)  # The first IMPORT_MAX_ERRORS row errors
+    message = db.Column(db.Text)  # Why the job failed, if it did
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'project_id': self.project_id,
+            'user_id': self.user_id,
+            'format': self.format,
+            'filename': self.filename,
+            'status': self.status,
+            'progress': round(self.bytes_read / self.size, 4) if self.size else 1.0,
+            'rows_read': self.rows_read,
+            'rows_imported': self.rows_imported,
+            'rows_failed': self.rows_failed,
+            'errors': self.errors or [],
+            'message': self.message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,47 @@
+from .. import db
+from datetime import datetime
+
+class Notification(db.Model):
+    """
+    A due-date reminder for one user about one task or project.
+    
+    The unique constraint makes reminders idempotent: each recipient gets at
+    most one 'due_soon' and one 'overdue' notification per due date of an
+    item, however often the scanner runs. Moving the due date or changing
+    the assignee starts a new window. delivered_at is set once the delivery
+    backend has accepted the notification.
+    """
+    __tablename__ = 'notifications'
+    __table_args__ = (
+        db.UniqueConstraint('entity', 'entity_id', 'kind', 'due_date', 'user_id', name='uq_notifications_window'),
+        # The recipient's feed, newest first
+        db.Index('ix_notifications_user_id_id', 'user_id', 'id'),
+        # Undelivered notifications, oldest first
+        db.Index('ix_notifications_delivered_at_id', 'delivered_at', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    project_id = db.Column(db.Integer, nullable=False)
+    entity = db.Column(db.String(20), nullable=False)  # 'task' or 'project'
+    entity_id = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # 'due_soon' or 'overdue'
+    due_date = db.Column(db.Date, nullable=False)
+    title = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'project_id': self.project_id,
+            'entity': self.entity,
+            'entity_id': self.entity_id,
+            'kind': self.kind,
+            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'title': self.title,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'delivered_at': self.delivered_at.isoformat() if self.delivered_at else None
+        }
@@ -1,8 +1,15 @@
 from .. import db
+from .user import project_members
 from datetime import datetime
 
 class Project(db.Model):
     __tablename__ = 'projects'
+    __table_args__ = (
+        db.Index('ix_projects_owner_id', 'owner_id'),
+        db.Index('ix_projects_due_date_id', 'due_date', 'id'),
+        # Purge scans for projects whose restore window has passed
+        db.Index('ix_projects_deleted_at', 'deleted_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -14,12 +21,29 @@ class Project(db.Model):
     due_date = db.Column(db.Date) 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set when the owner deletes the project; its rows are purged once the
+    # restore window has passed (see utils/deletion.py)
+    deleted_at = db.Column(db.DateTime)
     
     # Relationships
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     owner = db.relationship('User', foreign_keys=[owner_id])
-    members = db.relationship('User', secondary='project_members', back_populates='projects')
-    tasks = db.relationship('Task', back_populates='project', cascade='all, delete-orphan')
+    # The database removes member rows and tasks with the project (ON DELETE
+    # CASCADE), so deleting one never loads the collections
+    members = db.relationship('User', secondary='project_members', back_populates='projects', passive_deletes=True)
+    tasks = db.relationship('Task', back_populates='project', cascade='all, delete-orphan', passive_deletes=True)
+    
+    # Aggregate counts computed in SQL instead of loading the collections;
+    # deferred so plain lookups skip them, undefer_group('counts') in listings.
+    # tasks_count is attached in task.py once the tasks table is defined.
+    members_count = db.column_property(
+        db.select(db.func.count(project_members.c.user_id))
+        .where(project_members.c.project_id == id)
+        .correlate_except(project_members)
+        .scalar_subquery(),
+        deferred=True,
+        group='counts'
+    )
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -35,8 +59,8 @@ class Project(db.Model):
             'owner_id': self.owner_id,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'team': len(self.members),
-            'tasks_count': len(self.tasks)
+            'team': self.members_count,
+            'tasks_count': self.tasks_count
         }
     
     def to_dict_with_details(self):
@@ -0,0 +1,20 @@
+from .. import db
+
+class TaskRollup(db.Model):
+    """
+    Running task totals per project, assignee and status.
+    
+    Maintained incrementally in the same transaction as every task write
+    (see utils/rollups.py), so project and workload stats are read from a
+    handful of rows instead of aggregating the tasks table. Unassigned tasks
+    are counted under assignee_id 0. `flask rebuild-task-rollups` recomputes
+    the table from scratch.
+    """
+    __tablename__ = 'task_rollups'
+    
+    project_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    assignee_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    status = db.Column(db.String(50), primary_key=True)
+    task_count = db.Column(db.Integer, nullable=False, default=0)
+    estimated_hours = db.Column(db.Float, nullable=False, default=0)
+    actual_hours = db.Column(db.Float, nullable=False, default=0)
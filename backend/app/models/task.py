@@ -1,8 +1,18 @@
 from .. import db
+from .project import Project
 from datetime import datetime
 
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Board reads, column MAX(position) lookups and reorder neighbours
+        db.Index('ix_tasks_project_status_position', 'project_id', 'status', 'position'),
+        db.Index('ix_tasks_assignee_id', 'assignee_id'),
+        # Overdue counts in project stats
+        db.Index('ix_tasks_project_due_date', 'project_id', 'due_date'),
+        # Due-date reminder scans, one due date at a time in id order
+        db.Index('ix_tasks_due_date_id', 'due_date', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -12,12 +22,12 @@ class Task(db.Model):
     due_date = db.Column(db.Date)
     estimated_hours = db.Column(db.Float)
     actual_hours = db.Column(db.Float, default=0)
-    position = db.Column(db.Integer, default=0)  # For drag-and-drop ordering
+    position = db.Column(db.Float, default=0)  # Fractional sort key for drag-and-drop ordering
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign keys
-    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False)
     assignee_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     
     # Relationships
@@ -41,4 +51,13 @@ class Task(db.Model):
             'assignee': self.assignee.to_dict() if self.assignee else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        }
+
+Project.tasks_count = db.column_property(
+    db.select(db.func.count(Task.id))
+    .where(Task.project_id == Project.id)
+    .correlate_except(Task)
+    .scalar_subquery(),
+    deferred=True,
+    group='counts'
+)
@@ -0,0 +1,12 @@
+from .. import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    """Refresh tokens that were rotated or logged out and may not be used again"""
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
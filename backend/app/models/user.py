@@ -1,5 +1,5 @@
 from .. import db
-import bcrypt
+from ..utils.passwords import hash_password, check_password
 from datetime import datetime
 
 class User(db.Model):
@@ -19,12 +19,12 @@ class User(db.Model):
     tasks = db.relationship('Task', back_populates='assignee')
     
     def set_password(self, password):
-        """Hash and set password"""
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        """Hash and set password (on the hashing pool, at the configured cost)"""
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        """Check password against hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        """Check password against hash (on the hashing pool)"""
+        return check_password(password, self.password_hash)
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -40,8 +40,10 @@ class User(db.Model):
 
 # Association table for project members
 project_members = db.Table('project_members',
-    db.Column('project_id', db.Integer, db.ForeignKey('projects.id'), primary_key=True),
+    db.Column('project_id', db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
     db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
     db.Column('role', db.String(50), default='member'),
-    db.Column('joined_at', db.DateTime, default=datetime.utcnow)
+    db.Column('joined_at', db.DateTime, default=datetime.utcnow),
+    # The primary key covers lookups by project; this covers lookups by user
+    db.Index('ix_project_members_user_id', 'user_id', 'project_id')
 )
\ No newline at end of file
@@ -0,0 +1,26 @@
+from .. import db
+
+class WorkItem(db.Model):
+    """
+    One row per (user, open task) in the user's "My Work" inbox.
+    
+    Covers the same tasks as the task feed (assigned to the user, or in a
+    project the user owns or belongs to) minus finished ones, denormalized
+    with the sort key so the inbox is a single range read on
+    ix_work_items_inbox. Maintained by utils/inbox.py on every write that
+    changes the audience or sort key of a task.
+    """
+    __tablename__ = 'work_items'
+    __table_args__ = (
+        db.Index('ix_work_items_inbox', 'user_id', 'due_key', 'priority_rank', 'task_id'),
+        db.Index('ix_work_items_task_id', 'task_id'),
+        db.Index('ix_work_items_project_user', 'project_id', 'user_id'),
+    )
+    
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    task_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    project_id = db.Column(db.Integer, nullable=False)
+    # Due date, with tasks without one sorted after every dated task
+    due_key = db.Column(db.Date, nullable=False)
+    # 0 = urgent ... 3 = low, 4 = anything else
+    priority_rank = db.Column(db.Integer, nullable=False)
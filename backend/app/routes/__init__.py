@@ -1,5 +1,7 @@
 from .auth import auth_bp
 from .projects import projects_bp
 from .tasks import tasks_bp
+from .sync import sync_bp
+from .search import search_bp
 
-__all__ = ['auth_bp', 'projects_bp', 'tasks_bp']
\ No newline at end of file
+__all__ = ['auth_bp', 'projects_bp', 'tasks_bp', 'sync_bp', 'search_bp']
\ No newline at end of file
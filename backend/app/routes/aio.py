@@ -0,0 +1,106 @@
+"""
+Asyncio versions of the read-heavy endpoints, served by app/asgi.py.
+
+Each handler runs inside a Flask request context built from the ASGI
+request, so it reuses the query builders, argument parsing, pagination and
+serializers of the synchronous views (app/utils/listings.py). Only the
+statements are executed differently: they are awaited on the asyncio
+engine, so a request waiting on the database does not hold a thread.
+"""
+from flask import jsonify
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.orm import selectinload, undefer_group
+from ..models.project import Project
+from ..models.task import Task
+from ..utils.access import accessible_project_ids_async
+from ..utils.cache import cached_project_response_async
+from ..utils.helpers import parse_fields, serialize
+from ..utils.listings import PROJECT_FIELDS, PROJECT_FIELD_ATTRIBUTES, PROJECT_SORT_COLUMNS, projects_query
+from ..utils.listings import accessible_tasks_query, filter_tasks, task_serializer, task_page
+from ..utils.pagination import seek, page
+
+async def _task_listing(session, query, key, sort_columns, descending=False):
+    serializer = task_serializer(sort_columns)
+    query, limit = seek(serializer.select(query), key, sort_columns, descending)
+    result = await session.execute(query.statement)
+    rows, next_cursor = page(result.all(), key, sort_columns, limit)
+    return task_page(serializer, rows, next_cursor)
+
+async def _project_exists(session, project_id):
+    result = await session.execute(
+        Project.query.filter_by(id=project_id, deleted_at=None).with_entities(Project.id).statement
+    )
+    return result.first() is not None
+
+async def get_tasks(session):
+    """Get all tasks for current user"""
+    user_id = get_jwt_identity()
+    query = filter_tasks(accessible_tasks_query(user_id))
+    return jsonify(await _task_listing(session, query, 'tasks', [Task.updated_at, Task.id], descending=True)), 200
+
+async def get_project_tasks(session, project_id):
+    """Get all tasks for a project"""
+    return await cached_project_response_async(session, project_id, _project_tasks)
+
+async def _project_tasks(session, project_id):
+    user_id = get_jwt_identity()
+    
+    if not await _project_exists(session, project_id):
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if project_id not in await accessible_project_ids_async(session, user_id, [project_id]):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    query = filter_tasks(Task.query.filter_by(project_id=project_id))
+    
+    return jsonify(await _task_listing(session, query, f'project-tasks:{project_id}', [Task.position, Task.id])), 200
+
+async def get_projects(session):
+    """Get all projects for current user"""
+    user_id = get_jwt_identity()
+    fields = parse_fields(PROJECT_FIELDS)
+    
+    query, limit = seek(projects_query(user_id, fields), 'projects', PROJECT_SORT_COLUMNS, descending=True)
+    result = await session.execute(query.statement)
+    projects, next_cursor = page(result.scalars().all(), 'projects', PROJECT_SORT_COLUMNS, limit)
+    
+    return jsonify({
+        'projects': [serialize(project, fields, PROJECT_FIELD_ATTRIBUTES) for project in projects],
+        'next_cursor': next_cursor
+    }), 200
+
+async def get_project(session, project_id):
+    """Get project by ID"""
+    return await cached_project_response_async(session, project_id, _project)
+
+async def _project(session, project_id):
+    user_id = get_jwt_identity()
+    
+    # Everything to_dict_with_details touches is loaded up front, since
+    # lazy loads cannot run on an asyncio session
+    result = await session.execute(
+        Project.query.filter_by(id=project_id, deleted_at=None).options(
+            undefer_group('counts'),
+            selectinload(Project.members),
+            selectinload(Project.tasks).joinedload(Task.assignee)
+        ).statement
+    )
+    project = result.scalars().first()
+    if not project:
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if project_id not in await accessible_project_ids_async(session, user_id, [project_id]):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return jsonify({
+        'project': project.to_dict_with_details()
+    }), 200
+
+# (path under API_PREFIX, handler); the synchronous views keep serving
+# every other method and path
+ASYNC_ROUTES = (
+    ('/tasks', get_tasks),
+    ('/tasks/project/{project_id:int}', get_project_tasks),
+    ('/projects', get_projects),
+    ('/projects/{project_id:int}', get_project),
+)
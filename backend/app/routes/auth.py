@@ -1,11 +1,61 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from .. import db
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from .. import db, jwt
 from ..models.user import User
+from ..models.token import RevokedToken
 from datetime import datetime
+from sqlalchemy.orm import load_only
+from ..utils.helpers import parse_fields, parse_list_arg, serialize
+from ..utils.pagination import paginate
+from ..utils.passwords import needs_rehash
+from ..utils.ratelimit import login_limiter
+from ..utils.principal import user_claims, get_user_dict, invalidate_user
+from ..utils.access import accessible_project_ids_query
+from ..utils.cache import bump_project_version
 
 auth_bp = Blueprint('auth', __name__)
 
+USER_FIELDS = ('name', 'email', 'role', 'status', 'created_at', 'updated_at')
+
+@jwt.token_in_blocklist_loader
+def _is_token_revoked(jwt_header, jwt_payload):
+    """Only refresh tokens are checked, so ordinary requests never hit the table"""
+    if jwt_payload.get('type') != 'refresh':
+        return False
+    return db.session.query(
+        RevokedToken.query.filter_by(jti=jwt_payload['jti']).exists()
+    ).scalar()
+
+@jwt.token_verification_loader
+def _is_principal_active(jwt_header, jwt_data):
+    """Reject tokens issued to deactivated users; older tokens carry no status"""
+    return jwt_data.get('status', 'active') == 'active'
+
+@jwt.token_verification_failed_loader
+def _inactive_principal(jwt_header, jwt_data):
+    return jsonify({'error': 'Account is not active'}), 403
+
+def _issue_tokens(user):
+    """Create an access token carrying the user's claims and a refresh token"""
+    return {
+        'access_token': create_access_token(identity=user.id, additional_claims=user_claims(user)),
+        'refresh_token': create_refresh_token(identity=user.id)
+    }
+
+def _revoke(jwt_payload):
+    """Add a token to the revocation list; the caller commits"""
+    db.session.add(RevokedToken(
+        jti=jwt_payload['jti'],
+        user_id=jwt_payload['sub'],
+        expires_at=datetime.utcfromtimestamp(jwt_payload['exp'])
+    ))
+
+def _limit_by_ip():
+    """Count an attempt against the caller's IP before doing any hashing"""
+    config = current_app.config
+    login_limiter.hit(f'ip:{request.remote_addr}', config['LOGIN_RATE_LIMIT_IP'], config['LOGIN_RATE_LIMIT_PERIOD'])
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user"""
@@ -15,6 +65,8 @@ def register():
     if not data.get('email') or not data.get('password') or not data.get('name'):
         return jsonify({'error': 'Missing required fields'}), 400
     
+    _limit_by_ip()
+    
     # Check if user exists
     if User.query.filter_by(email=data['email']).first():
         return jsonify({'error': 'User already exists'}), 400
@@ -31,13 +83,10 @@ def register():
     db.session.add(user)
     db.session.commit()
     
-    # Create access token
-    access_token = create_access_token(identity=user.id)
-    
     return jsonify({
         'message': 'User created successfully',
         'user': user.to_dict(),
-        'access_token': access_token
+        **_issue_tokens(user)
     }), 201
 
 @auth_bp.route('/login', methods=['POST'])
@@ -47,6 +96,13 @@ def login():
     
     if not data.get('email') or not data.get('password'):
         return jsonify({'error': 'Missing email or password'}), 400
+    if not isinstance(data['email'], str) or not isinstance(data['password'], str):
+        return jsonify({'error': 'Email and password must be strings'}), 400
+    
+    # Reject brute-force traffic before spending any time on bcrypt
+    _limit_by_ip()
+    email_key = f"email:{data['email'].strip().lower()}"
+    login_limiter.hit(email_key, current_app.config['LOGIN_RATE_LIMIT_EMAIL'], current_app.config['LOGIN_RATE_LIMIT_PERIOD'])
     
     # Find user
     user = User.query.filter_by(email=data['email']).first()
@@ -54,26 +110,66 @@ def login():
     if not user or not user.check_password(data['password']):
         return jsonify({'error': 'Invalid credentials'}), 401
     
-    # Create access token
-    access_token = create_access_token(identity=user.id)
+    login_limiter.reset(email_key)
+    
+    # Tokens of inactive users would be rejected on every request
+    if user.status != 'active':
+        return jsonify({'error': 'Account is not active'}), 403
+    
+    # Upgrade hashes made with an older cost factor while we have the password
+    if needs_rehash(user.password_hash):
+        user.set_password(data['password'])
+        db.session.commit()
     
     return jsonify({
         'message': 'Login successful',
         'user': user.to_dict(),
-        'access_token': access_token
+        **_issue_tokens(user)
     }), 200
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """Exchange a refresh token for new tokens, revoking the old refresh token"""
+    user = User.query.get(get_jwt_identity())
+    
+    # Re-read the user so role and status changes reach the new access token
+    if not user or user.status != 'active':
+        return jsonify({'error': 'Account is not active'}), 401
+    
+    _revoke(get_jwt())
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another request already rotated this token
+        db.session.rollback()
+        return jsonify({'error': 'Token has been revoked'}), 401
+    
+    return jsonify(_issue_tokens(user)), 200
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(refresh=True)
+def logout():
+    """Revoke the refresh token; access tokens expire on their own"""
+    _revoke(get_jwt())
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+    
+    return jsonify({'message': 'Logged out successfully'}), 200
+
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     """Get current user profile"""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_user_dict(user_id)
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    return jsonify({'user': user.to_dict()}), 200
+    return jsonify({'user': user}), 200
 
 @auth_bp.route('/profile', methods=['PUT'])
 @jwt_required()
@@ -97,6 +193,10 @@ def update_profile():
         user.email = data['email']
     
     db.session.commit()
+    invalidate_user(user.id)
+    # Cached project responses embed the names and emails of their members
+    for (project_id,) in accessible_project_ids_query(user.id):
+        bump_project_version(project_id)
     
     return jsonify({
         'message': 'Profile updated successfully',
@@ -107,5 +207,22 @@ def update_profile():
 @jwt_required()
 def get_users():
     """Get all users (for team management)"""
-    users = User.query.all()
-    return jsonify({'users': [user.to_dict() for user in users]}), 200
\ No newline at end of file
+    fields = parse_fields(USER_FIELDS)
+    query = User.query
+    
+    roles = parse_list_arg('role')
+    if roles:
+        query = query.filter(User.role.in_(roles))
+    statuses = parse_list_arg('status')
+    if statuses:
+        query = query.filter(User.status.in_(statuses))
+    
+    if fields is not None:
+        query = query.options(load_only(*[getattr(User, field) for field in fields]))
+    
+    users, next_cursor = paginate(query, 'users', [User.id])
+    
+    return jsonify({
+        'users': [serialize(user, fields) for user in users],
+        'next_cursor': next_cursor
+    }), 200
\ No newline at end of file
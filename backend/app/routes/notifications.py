@@ -0,0 +1,25 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..models.notification import Notification
+from ..utils.helpers import parse_list_arg
+from ..utils.pagination import paginate
+
+notifications_bp = Blueprint('notifications', __name__)
+
+@notifications_bp.route('', methods=['GET'])
+@jwt_required()
+def get_notifications():
+    """Due-date reminders for the current user, newest first"""
+    user_id = get_jwt_identity()
+    
+    query = Notification.query.filter_by(user_id=user_id)
+    kinds = parse_list_arg('kind')
+    if kinds:
+        query = query.filter(Notification.kind.in_(kinds))
+    
+    notifications, next_cursor = paginate(query, 'notifications', [Notification.id], descending=True)
+    
+    return jsonify({
+        'notifications': [notification.to_dict() for notification in notifications],
+        'next_cursor': next_cursor
+    }), 200
@@ -1,28 +1,47 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from .. import db
 from ..models.project import Project
-from ..models.user import User
-from datetime import datetime
+from ..models.user import User, project_members
+from ..models.task import Task
+from datetime import datetime, timedelta
+from sqlalchemy.orm import undefer_group
+from ..utils.helpers import parse_fields, parse_list_arg, serialize
+from ..utils.pagination import paginate
+from ..utils.listings import PROJECT_FIELDS, PROJECT_FIELD_ATTRIBUTES, PROJECT_SORT_COLUMNS, projects_query
+from ..utils.access import find_project, has_project_access, is_project_member, invalidate_project_access
+from ..utils.cache import cached_project_response
+from ..utils.events import project_changed, event_stream, get_broker
+from ..utils.export import export_tasks_response
+from ..utils.changes import record_change, record_changes, record_project_tasks
+from ..utils.rollups import project_stats
+from ..utils.inbox import add_member_items, remove_member_items
+from ..utils.deletion import mark_deleted, mark_restored, purge_project, restore_deadline
+from ..utils.background import submit
+from ..utils.imports import IMPORT_FORMATS, claim_import, create_import, guess_format, run_import
+from ..utils.activity import log_activity
+from ..models.activity import Activity
+from ..models.import_job import ImportJob
 
 projects_bp = Blueprint('projects', __name__)
 
+# Bytes copied per read while storing an import upload
+IMPORT_CHUNK_SIZE = 1 << 20
+
 @projects_bp.route('', methods=['GET'])
 @jwt_required()
 def get_projects():
     """Get all projects for current user"""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    # Get projects where user is owner or member
-    owned_projects = Project.query.filter_by(owner_id=user_id).all()
-    member_projects = user.projects
+    fields = parse_fields(PROJECT_FIELDS)
     
-    # Combine and remove duplicates
-    all_projects = list(set(owned_projects + member_projects))
+    projects, next_cursor = paginate(
+        projects_query(user_id, fields), 'projects', PROJECT_SORT_COLUMNS, descending=True
+    )
     
     return jsonify({
-        'projects': [project.to_dict() for project in all_projects]
+        'projects': [serialize(project, fields, PROJECT_FIELD_ATTRIBUTES) for project in projects],
+        'next_cursor': next_cursor
     }), 200
 
 @projects_bp.route('', methods=['POST'])
@@ -50,12 +69,16 @@ def create_project():
     if data.get('due_date'):
         project.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00')).date()
     
-    # Add current user as member
-    user = User.query.get(user_id)
-    project.members.append(user)
-    
     db.session.add(project)
+    db.session.flush()
+    
+    # Add current user as member without loading the user
+    db.session.execute(project_members.insert().values(project_id=project.id, user_id=user_id))
+    log_activity(project.id, 'project.created', user_id=user_id, data={'name': project.name})
+    record_change('project', project.id, project.id)
     db.session.commit()
+    # Project ids can be reused after a delete on some backends
+    invalidate_project_access(project.id)
     
     return jsonify({
         'message': 'Project created successfully',
@@ -64,16 +87,17 @@ def create_project():
 
 @projects_bp.route('/<int:project_id>', methods=['GET'])
 @jwt_required()
+@cached_project_response
 def get_project(project_id):
     """Get project by ID"""
     user_id = get_jwt_identity()
-    project = Project.query.get(project_id)
+    project = find_project(project_id)
     
     if not project:
         return jsonify({'error': 'Project not found'}), 404
     
     # Check if user has access
-    if project.owner_id != user_id and user_id not in [member.id for member in project.members]:
+    if not has_project_access(user_id, project.id):
         return jsonify({'error': 'Access denied'}), 403
     
     return jsonify({
@@ -85,7 +109,7 @@ def get_project(project_id):
 def update_project(project_id):
     """Update project"""
     user_id = get_jwt_identity()
-    project = Project.query.get(project_id)
+    project = find_project(project_id)
     
     if not project:
         return jsonify({'error': 'Project not found'}), 404
@@ -112,7 +136,13 @@ def update_project(project_id):
     if 'due_date' in data and data['due_date']:
         project.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00')).date()
     
+    fields = sorted(field for field in data if field in (
+        'name', 'description', 'status', 'priority', 'progress', 'start_date', 'due_date'
+    ))
+    log_activity(project.id, 'project.updated', user_id=user_id, data={'fields': fields})
+    record_change('project', project.id, project.id)
     db.session.commit()
+    project_changed(project.id, 'project.updated', project.to_dict())
     
     return jsonify({
         'message': 'Project updated successfully',
@@ -122,9 +152,15 @@ def update_project(project_id):
 @projects_bp.route('/<int:project_id>', methods=['DELETE'])
 @jwt_required()
 def delete_project(project_id):
-    """Delete project"""
+    """
+    Delete project.
+    
+    The project disappears at once but its rows stay for
+    PROJECT_RESTORE_DAYS, during which the owner can restore it; they are
+    purged in batches afterwards (see utils/deletion.py).
+    """
     user_id = get_jwt_identity()
-    project = Project.query.get(project_id)
+    project = find_project(project_id)
     
     if not project:
         return jsonify({'error': 'Project not found'}), 404
@@ -133,23 +169,287 @@ def delete_project(project_id):
     if project.owner_id != user_id:
         return jsonify({'error': 'Only project owner can delete'}), 403
     
-    db.session.delete(project)
+    # Address the deletion to every member, since nobody can see the project afterwards
+    record_changes([('project', project.id, project.id, 'delete', member_id) for member_id in _member_ids(project)])
+    
+    mark_deleted(project)
+    log_activity(project.id, 'project.deleted', user_id=user_id)
+    db.session.commit()
+    invalidate_project_access(project_id)
+    project_changed(project_id, 'project.deleted', {'id': project_id})
+    
+    if current_app.config['PROJECT_RESTORE_DAYS'] <= 0:
+        submit(purge_project, project_id)
+        return jsonify({'message': 'Project deleted successfully'}), 200
+    
+    return jsonify({
+        'message': 'Project deleted successfully',
+        'restore_until': restore_deadline(project).isoformat()
+    }), 200
+
+@projects_bp.route('/deleted', methods=['GET'])
+@jwt_required()
+def get_deleted_projects():
+    """The current user's deleted projects that can still be restored"""
+    user_id = get_jwt_identity()
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config['PROJECT_RESTORE_DAYS'])
+    
+    projects = Project.query.filter(
+        Project.owner_id == user_id,
+        Project.deleted_at > cutoff
+    ).options(undefer_group('counts')).order_by(Project.deleted_at.desc(), Project.id.desc()).all()
+    
+    return jsonify({
+        'projects': [
+            {
+                **project.to_dict(),
+                'deleted_at': project.deleted_at.isoformat(),
+                'restore_until': restore_deadline(project).isoformat()
+            }
+            for project in projects
+        ]
+    }), 200
+
+@projects_bp.route('/<int:project_id>/restore', methods=['POST'])
+@jwt_required()
+def restore_project(project_id):
+    """Restore a deleted project within its restore window"""
+    user_id = get_jwt_identity()
+    project = db.session.get(Project, project_id)
+    
+    if not project or project.deleted_at is None:
+        return jsonify({'error': 'Deleted project not found'}), 404
+    
+    if project.owner_id != user_id:
+        return jsonify({'error': 'Only project owner can restore'}), 403
+    
+    if restore_deadline(project) <= datetime.utcnow():
+        return jsonify({'error': 'The project can no longer be restored'}), 410
+    
+    mark_restored(project)
+    record_changes([('project', project.id, project.id, 'upsert', member_id) for member_id in _member_ids(project)])
+    log_activity(project.id, 'project.restored', user_id=user_id)
     db.session.commit()
+    invalidate_project_access(project_id)
+    project_changed(project_id, 'project.restored', project.to_dict())
+    
+    return jsonify({
+        'message': 'Project restored successfully',
+        'project': project.to_dict()
+    }), 200
+
+def _member_ids(project):
+    """The ids of the project's members and owner"""
+    member_ids = {
+        row.user_id for row in
+        db.session.query(project_members.c.user_id).filter(project_members.c.project_id == project.id)
+    }
+    member_ids.add(project.owner_id)
+    return member_ids
+
+@projects_bp.route('/<int:project_id>/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def project_events(project_id):
+    """
+    Server-Sent Events stream of a project's changes.
+    
+    EventSource cannot send headers, so the token may also be passed as
+    ?jwt=<access token>. On reconnect its Last-Event-ID header tells
+    whether events were missed (see event_stream).
+    """
+    user_id = get_jwt_identity()
+    
+    if get_broker() is None:
+        return jsonify({'error': 'Events are disabled'}), 404
+    
+    if not find_project(project_id):
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if not has_project_access(user_id, project_id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    # Release the pooled connection before holding the stream open
+    db.session.remove()
+    
+    return Response(
+        stream_with_context(event_stream(project_id, request.headers.get('Last-Event-ID'))),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@projects_bp.route('/<int:project_id>/export', methods=['GET'])
+@jwt_required()
+def export_project(project_id):
+    """Stream a project's tasks as NDJSON or CSV"""
+    user_id = get_jwt_identity()
+    project = find_project(project_id)
+    
+    if not project:
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if not has_project_access(user_id, project.id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return export_tasks_response(Task.query.filter_by(project_id=project_id), f'project-{project_id}-tasks')
+
+@projects_bp.route('/<int:project_id>/import', methods=['POST'])
+@jwt_required()
+def import_project_tasks(project_id):
+    """
+    Import tasks into a project from a CSV or NDJSON file, in the background.
+    
+    The file is the request body or its multipart ``file`` field, in the
+    export's format; ?format=csv|ndjson overrides the format guessed from
+    the file name or content type. Assignees are given as assignee_email or
+    assignee_id. Responds 202 with the import job; poll it for progress.
+    """
+    user_id = get_jwt_identity()
+    project = find_project(project_id)
+    
+    if not project:
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if not has_project_access(user_id, project.id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    upload = request.files.get('file')
+    if upload is not None:
+        stream, filename, content_type = upload.stream, upload.filename, upload.mimetype
+    else:
+        stream, filename, content_type = request.stream, None, request.mimetype
+    
+    fmt = request.args.get('format') or guess_format(filename, content_type)
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({'error': 'Format must be ndjson or csv'}), 400
+    
+    try:
+        job = create_import(
+            project.id, user_id, fmt,
+            iter(lambda: stream.read(IMPORT_CHUNK_SIZE), b''),
+            filename=filename,
+            max_bytes=current_app.config['IMPORT_MAX_BYTES']
+        )
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 413
+    
+    claim_import(job.id)
+    submit(run_import, job.id)
+    
+    return jsonify({
+        'message': 'Import started',
+        'job': job.to_dict()
+    }), 202
+
+@projects_bp.route('/<int:project_id>/imports', methods=['GET'])
+@jwt_required()
+def get_import_jobs(project_id):
+    """A project's import jobs, newest first, a page at a time"""
+    user_id = get_jwt_identity()
+    
+    if not db.session.query(Project.query.filter_by(id=project_id, deleted_at=None).exists()).scalar():
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if not has_project_access(user_id, project_id):
+        return jsonify({'error': 'Access denied'}), 403
     
-    return jsonify({'message': 'Project deleted successfully'}), 200
+    jobs, next_cursor = paginate(
+        ImportJob.query.filter_by(project_id=project_id), 'imports', [ImportJob.id], descending=True
+    )
+    
+    return jsonify({
+        'imports': [job.to_dict() for job in jobs],
+        'next_cursor': next_cursor
+    }), 200
+
+@projects_bp.route('/<int:project_id>/imports/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_import_job(project_id, job_id):
+    """Progress and row errors of an import job"""
+    user_id = get_jwt_identity()
+    job = db.session.get(ImportJob, job_id)
+    
+    if not job or job.project_id != project_id:
+        return jsonify({'error': 'Import not found'}), 404
+    
+    if not has_project_access(user_id, project_id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return jsonify({'job': job.to_dict()}), 200
+
+@projects_bp.route('/<int:project_id>/imports/<int:job_id>/resume', methods=['POST'])
+@jwt_required()
+def resume_import_job(project_id, job_id):
+    """Continue a failed or stalled import after its last committed batch"""
+    user_id = get_jwt_identity()
+    job = db.session.get(ImportJob, job_id)
+    
+    if not job or job.project_id != project_id:
+        return jsonify({'error': 'Import not found'}), 404
+    
+    if not has_project_access(user_id, project_id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if not claim_import(job.id):
+        return jsonify({'error': f'Import is {job.status}'}), 409
+    
+    submit(run_import, job.id)
+    
+    return jsonify({
+        'message': 'Import resumed',
+        'job': job.to_dict()
+    }), 202
+
+@projects_bp.route('/<int:project_id>/stats', methods=['GET'])
+@jwt_required()
+def get_project_stats(project_id):
+    """Task counts by status, hours, overdue tasks and progress, overall and per assignee"""
+    user_id = get_jwt_identity()
+    
+    if not db.session.query(Project.query.filter_by(id=project_id, deleted_at=None).exists()).scalar():
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if not has_project_access(user_id, project_id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return jsonify({'stats': project_stats(project_id)}), 200
+
+@projects_bp.route('/<int:project_id>/activity', methods=['GET'])
+@jwt_required()
+def get_project_activity(project_id):
+    """Who changed what on a project, newest first, a page at a time"""
+    user_id = get_jwt_identity()
+    
+    if not db.session.query(Project.query.filter_by(id=project_id, deleted_at=None).exists()).scalar():
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if not has_project_access(user_id, project_id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    query = Activity.query.filter_by(project_id=project_id)
+    actions = parse_list_arg('action')
+    if actions:
+        query = query.filter(Activity.action.in_(actions))
+    
+    entries, next_cursor = paginate(query, f'activity:{project_id}', [Activity.id], descending=True)
+    
+    return jsonify({
+        'activity': [entry.to_dict() for entry in entries],
+        'next_cursor': next_cursor
+    }), 200
 
 @projects_bp.route('/<int:project_id>/members', methods=['GET'])
 @jwt_required()
+@cached_project_response
 def get_project_members(project_id):
     """Get project members"""
     user_id = get_jwt_identity()
-    project = Project.query.get(project_id)
+    project = find_project(project_id)
     
     if not project:
         return jsonify({'error': 'Project not found'}), 404
     
     # Check if user has access
-    if project.owner_id != user_id and user_id not in [member.id for member in project.members]:
+    if not has_project_access(user_id, project.id):
         return jsonify({'error': 'Access denied'}), 403
     
     return jsonify({
@@ -161,7 +461,7 @@ def get_project_members(project_id):
 def add_project_member(project_id):
     """Add member to project"""
     user_id = get_jwt_identity()
-    project = Project.query.get(project_id)
+    project = find_project(project_id)
     
     if not project:
         return jsonify({'error': 'Project not found'}), 404
@@ -182,12 +482,19 @@ def add_project_member(project_id):
         return jsonify({'error': 'User not found'}), 404
     
     # Check if already a member
-    if user in project.members:
+    if is_project_member(user.id, project.id):
         return jsonify({'error': 'User is already a project member'}), 400
     
-    # Add user to project
-    project.members.append(user)
+    # Add user to project without loading the member collection
+    db.session.execute(project_members.insert().values(project_id=project.id, user_id=user.id))
+    add_member_items(project.id, user.id)
+    log_activity(project.id, 'member.added', user_id=user_id, data={'user_id': user.id})
+    record_change('project', project.id, project.id)
+    # The new member's clients have none of the project's tasks yet
+    record_project_tasks(project.id, user.id)
     db.session.commit()
+    invalidate_project_access(project.id, user.id)
+    project_changed(project.id, 'member.added', user.to_dict())
     
     return jsonify({
         'message': 'Member added successfully',
@@ -199,7 +506,7 @@ def add_project_member(project_id):
 def remove_project_member(project_id, member_id):
     """Remove member from project"""
     user_id = get_jwt_identity()
-    project = Project.query.get(project_id)
+    project = find_project(project_id)
     
     if not project:
         return jsonify({'error': 'Project not found'}), 404
@@ -214,7 +521,7 @@ def remove_project_member(project_id, member_id):
         return jsonify({'error': 'User not found'}), 404
     
     # Check if user is a member
-    if user not in project.members:
+    if not is_project_member(user.id, project.id):
         return jsonify({'error': 'User is not a project member'}), 400
     
     # Cannot remove owner
@@ -222,7 +529,18 @@ def remove_project_member(project_id, member_id):
         return jsonify({'error': 'Cannot remove project owner'}), 400
     
     # Remove user from project
-    project.members.remove(user)
+    db.session.execute(project_members.delete().where(
+        project_members.c.project_id == project.id,
+        project_members.c.user_id == user.id
+    ))
+    remove_member_items(project.id, user.id)
+    log_activity(project.id, 'member.removed', user_id=user_id, data={'user_id': user.id})
+    record_changes([
+        ('project', project.id, project.id, 'upsert', None),
+        ('project', project.id, project.id, 'delete', user.id)
+    ])
     db.session.commit()
+    invalidate_project_access(project.id, user.id)
+    project_changed(project.id, 'member.removed', {'user_id': user.id})
     
     return jsonify({'message': 'Member removed successfully'}), 200
\ No newline at end of file
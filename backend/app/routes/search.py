@@ -0,0 +1,65 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import undefer_group
+from .. import db
+from ..models.project import Project
+from ..models.task import Task
+from ..utils.access import accessible_project_ids_query
+from ..utils.helpers import parse_fields, serialize, InvalidArgument
+from ..utils.listings import PROJECT_FIELDS, PROJECT_FIELD_ATTRIBUTES, accessible_tasks_query, filter_tasks, task_listing
+from ..utils.pagination import paginate
+from ..utils.search import parse_terms, search_clause
+
+search_bp = Blueprint('search', __name__)
+
+def _search(query, entity, terms):
+    """Join and filter a query for the search terms; returns it with its sort key"""
+    target, condition, rank, descending = search_clause(entity, terms)
+    if target is not None:
+        query = query.join(*target)
+    return query.filter(condition), rank, descending
+
+@search_bp.route('', methods=['GET'])
+@jwt_required()
+def search():
+    """
+    Ranked prefix search over the tasks or projects the caller can see.
+    
+    Query arguments: ``q`` (required), ``type`` (``tasks``, the default, or
+    ``projects``), ``limit`` and ``cursor`` as in the listings, ``fields``,
+    and for tasks the usual status, priority, assignee and due date filters.
+    """
+    user_id = get_jwt_identity()
+    terms = parse_terms(request.args.get('q'))
+    entity = request.args.get('type', 'tasks')
+    key = f"search:{entity}:{' '.join(terms)}"
+    
+    if entity == 'tasks':
+        query = filter_tasks(accessible_tasks_query(user_id))
+        query, rank, descending = _search(query, entity, terms)
+        # Rank ties are broken by id in the same direction
+        return jsonify(task_listing(query, key, [rank, Task.id], descending)), 200
+    
+    if entity == 'projects':
+        fields = parse_fields(PROJECT_FIELDS)
+        query = db.session.query(Project.id).filter(
+            Project.id.in_(accessible_project_ids_query(user_id))
+        )
+        query, rank, descending = _search(query, entity, terms)
+        rows, next_cursor = paginate(query.add_columns(rank), key, [rank, Project.id], descending)
+        
+        # Load the page of projects by id, then restore the ranked order
+        ids = [row.id for row in rows]
+        projects = {
+            project.id: project for project in
+            Project.query.filter(Project.id.in_(ids)).options(undefer_group('counts'))
+        } if ids else {}
+        return jsonify({
+            'projects': [
+                serialize(projects[project_id], fields, PROJECT_FIELD_ATTRIBUTES)
+                for project_id in ids if project_id in projects
+            ],
+            'next_cursor': next_cursor
+        }), 200
+    
+    raise InvalidArgument('Type must be tasks or projects')
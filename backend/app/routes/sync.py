@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import undefer_group
+from .. import db
+from ..models.change import ChangeLog
+from ..models.project import Project
+from ..models.task import Task
+from ..utils.access import accessible_project_ids_query
+from ..utils.serializers import TaskRowSerializer
+
+sync_bp = Blueprint('sync', __name__)
+
+def _log_bounds():
+    """
+    Return (oldest id, newest id, high-water mark) of the change log.
+    
+    Ids are handed out when a row is inserted but become visible when its
+    transaction commits, so a row may appear after rows with higher ids have
+    been read. Only rows older than SYNC_SETTLE_SECONDS are served: the mark
+    is the id before the first newer row, so a token never passes a row
+    whose transaction may still be open.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['SYNC_SETTLE_SECONDS'])
+    unsettled = db.select(db.func.min(ChangeLog.id)).where(ChangeLog.created_at > cutoff).scalar_subquery()
+    oldest, newest, first_unsettled = db.session.execute(
+        db.select(db.func.min(ChangeLog.id), db.func.max(ChangeLog.id), unsettled)
+    ).one()
+    mark = first_unsettled - 1 if first_unsettled is not None else newest or 0
+    return oldest, newest, mark
+
+@sync_bp.route('', methods=['GET'])
+@jwt_required()
+def get_changes():
+    """
+    Return the tasks and projects changed since a sync token.
+    
+    Like the task feed, this covers the user's projects and the tasks
+    assigned to them elsewhere.
+    
+    Without ``since`` only the current token is returned: clients load their
+    data once, then poll with the token. When nothing changed the response is
+    an empty 204, produced by index-only range scans on the change log's
+    primary key. Changes are served once they are SYNC_SETTLE_SECONDS old
+    (see _log_bounds). A 410 means the token is older than the retained log,
+    or newer than the log itself (e.g. after a restore), and the client must
+    reload everything.
+    """
+    user_id = get_jwt_identity()
+    since = request.args.get('since')
+    
+    if not since:
+        _, _, mark = _log_bounds()
+        return jsonify({'token': str(mark)}), 200
+    
+    try:
+        since = int(since)
+    except ValueError:
+        return jsonify({'error': 'Invalid sync token'}), 400
+    
+    # prune-change-log keeps the newest entry, so an empty log has never had
+    # entries and a gap below the oldest one means entries were pruned
+    oldest, newest, mark = _log_bounds()
+    if since > (newest or 0) or (oldest is not None and since < oldest - 1):
+        return jsonify({'error': 'Sync token expired, reload required'}), 410
+    
+    if since >= mark:
+        return '', 204
+    
+    limit = current_app.config['SYNC_MAX_CHANGES']
+    assigned_task_ids = db.select(Task.id).join(Project, Project.id == Task.project_id).where(
+        Task.assignee_id == user_id,
+        Project.deleted_at.is_(None)
+    )
+    rows = db.session.query(
+        ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.action
+    ).filter(
+        ChangeLog.id > since,
+        ChangeLog.id <= mark,
+        db.or_(
+            ChangeLog.user_id == user_id,
+            db.and_(
+                ChangeLog.user_id.is_(None),
+                db.or_(
+                    ChangeLog.project_id.in_(accessible_project_ids_query(user_id)),
+                    # Tasks assigned to the user in projects they are not a member of
+                    db.and_(ChangeLog.entity == 'task', ChangeLog.entity_id.in_(assigned_task_ids))
+                )
+            )
+        )
+    ).order_by(ChangeLog.id).limit(limit + 1).all()
+    
+    if not rows:
+        return '', 204
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    # The last change to each entity wins
+    latest = {}
+    for row in rows:
+        latest[(row.entity, row.entity_id)] = row.action
+    
+    task_ids = [entity_id for (entity, entity_id), action in latest.items() if entity == 'task' and action == 'upsert']
+    project_ids = [entity_id for (entity, entity_id), action in latest.items() if entity == 'project' and action == 'upsert']
+    
+    tasks = []
+    if task_ids:
+        serializer = TaskRowSerializer()
+        tasks, _ = serializer.serialize(serializer.select(Task.query.filter(Task.id.in_(task_ids))))
+    projects = []
+    if project_ids:
+        projects = [
+            project.to_dict() for project in
+            Project.query.filter(
+                Project.id.in_(project_ids), Project.deleted_at.is_(None)
+            ).options(undefer_group('counts'))
+        ]
+    
+    # Rows that vanished after being logged were deleted by a later change
+    found_tasks = {task['id'] for task in tasks}
+    found_projects = {project['id'] for project in projects}
+    deleted_tasks = [
+        entity_id for (entity, entity_id), action in latest.items()
+        if entity == 'task' and (action == 'delete' or entity_id not in found_tasks)
+    ]
+    deleted_projects = [
+        entity_id for (entity, entity_id), action in latest.items()
+        if entity == 'project' and (action == 'delete' or entity_id not in found_projects)
+    ]
+    
+    return jsonify({
+        'token': str(rows[-1].id),
+        'has_more': has_more,
+        'tasks': {'upserted': tasks, 'deleted': deleted_tasks},
+        'projects': {'upserted': projects, 'deleted': deleted_projects}
+    }), 200
@@ -1,36 +1,74 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from .. import db
 from ..models.task import Task
-from ..models.project import Project
-from ..models.user import User
+from ..models.work_item import WorkItem
 from datetime import datetime
+from ..utils.positions import get_column_ends, position_for_rank, schedule_rebalance
+from ..utils.access import find_project, has_project_access, accessible_project_ids
+from ..utils.cache import cached_project_response
+from ..utils.events import project_changed, task_event_data
+from ..utils.changes import record_change, record_changes, record_unassignments
+from ..utils.rollups import task_snapshot, apply_rollups
+from ..utils.inbox import INBOX_FIELDS, refresh_task_items, remove_task_items
+from ..utils.activity import log_activity, log_activities, task_activity
+from ..utils.listings import accessible_tasks_query, filter_tasks, task_listing
+from ..utils.export import export_tasks_response
 
 tasks_bp = Blueprint('tasks', __name__)
 
+def _task_changes(data):
+    """Parse the updatable task fields present in a request body into column values"""
+    changes = {}
+    for key in ('title', 'description', 'status', 'priority', 'assignee_id'):
+        if key in data:
+            changes[key] = data[key]
+    if 'due_date' in data:
+        if data['due_date']:
+            changes['due_date'] = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00')).date()
+        else:
+            changes['due_date'] = None
+    if 'estimated_hours' in data:
+        changes['estimated_hours'] = float(data['estimated_hours']) if data['estimated_hours'] else None
+    if 'actual_hours' in data:
+        changes['actual_hours'] = float(data['actual_hours']) if data['actual_hours'] else 0
+    return changes
+
 @tasks_bp.route('', methods=['GET'])
 @jwt_required()
 def get_tasks():
     """Get all tasks for current user"""
     user_id = get_jwt_identity()
     
-    # Get tasks where user is assigned or from user's projects
-    assigned_tasks = Task.query.filter_by(assignee_id=user_id).all()
+    # Tasks assigned to the user or belonging to a project the user owns or
+    # is a member of, fetched a page at a time in a single statement
+    query = filter_tasks(accessible_tasks_query(user_id))
     
-    # Get user's projects
-    user = User.query.get(user_id)
-    user_projects = user.projects + Project.query.filter_by(owner_id=user_id).all()
-    project_ids = [project.id for project in user_projects]
+    return jsonify(task_listing(query, 'tasks', [Task.updated_at, Task.id], descending=True)), 200
+
+@tasks_bp.route('/inbox', methods=['GET'])
+@jwt_required()
+def get_inbox():
+    """
+    "My Work": the user's open tasks by due date (undated last), then priority.
     
-    # Get tasks from user's projects
-    project_tasks = Task.query.filter(Task.project_id.in_(project_ids)).all()
+    Read from the precomputed work_items rows, so each page is one range scan
+    of ix_work_items_inbox joined to the tasks by primary key.
+    """
+    user_id = get_jwt_identity()
     
-    # Combine and remove duplicates
-    all_tasks = list(set(assigned_tasks + project_tasks))
+    query = Task.query.join(WorkItem, WorkItem.task_id == Task.id).filter(WorkItem.user_id == user_id)
+    sort_columns = [WorkItem.due_key, WorkItem.priority_rank, WorkItem.task_id]
     
-    return jsonify({
-        'tasks': [task.to_dict() for task in all_tasks]
-    }), 200
+    return jsonify(task_listing(query, 'inbox', sort_columns)), 200
+
+@tasks_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_tasks():
+    """Stream every task the user can see as NDJSON or CSV"""
+    user_id = get_jwt_identity()
+    query = filter_tasks(accessible_tasks_query(user_id))
+    return export_tasks_response(query, 'tasks')
 
 @tasks_bp.route('', methods=['POST'])
 @jwt_required()
@@ -43,11 +81,11 @@ def create_task():
         return jsonify({'error': 'Title and project ID are required'}), 400
     
     # Check if project exists and user has access
-    project = Project.query.get(data['project_id'])
+    project = find_project(data['project_id'])
     if not project:
         return jsonify({'error': 'Project not found'}), 404
     
-    if project.owner_id != user_id and user_id not in [member.id for member in project.members]:
+    if not has_project_access(user_id, project.id):
         return jsonify({'error': 'Access denied'}), 403
     
     # Create task
@@ -73,13 +111,233 @@ def create_task():
     task.position = max_position + 1
     
     db.session.add(task)
+    db.session.flush()
+    apply_rollups(after=[task_snapshot(task)])
+    refresh_task_items([task.id])
+    log_activity(task.project_id, 'task.created', task.id, user_id, {'title': task.title})
+    record_change('task', task.id, task.project_id)
     db.session.commit()
+    project_changed(task.project_id, 'task.created', task_event_data(task))
     
     return jsonify({
         'message': 'Task created successfully',
         'task': task.to_dict()
     }), 201
 
+def _is_id(value):
+    """Whether a JSON value can be a row id (an integer, not a boolean)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+@tasks_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_tasks():
+    """
+    Apply a batch of create, update and delete operations in one transaction.
+    
+    Body: {"operations": [{"op": "create", "data": {...}},
+                          {"op": "update", "id": 1, "data": {...}},
+                          {"op": "delete", "id": 2}]}
+    
+    Access is checked once per distinct project and the changes are written
+    with batched INSERT/UPDATE/DELETE statements. Operations that fail
+    validation are reported in the per-item results and skipped.
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    operations = data.get('operations') if data else None
+    
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'Operations are required'}), 400
+    if len(operations) > current_app.config['BULK_MAX_OPERATIONS']:
+        return jsonify({'error': 'Too many operations'}), 400
+    
+    results = [None] * len(operations)
+    
+    def fail(index, message):
+        operation = operations[index] if isinstance(operations[index], dict) else {}
+        results[index] = {
+            'index': index,
+            'op': operation.get('op'),
+            'id': operation.get('id'),
+            'status': 'error',
+            'error': message
+        }
+    
+    # Load the project, status and rolled-up values of every referenced task in one query
+    task_ids = {
+        operation.get('id') for operation in operations
+        if isinstance(operation, dict) and operation.get('op') in ('update', 'delete')
+        and _is_id(operation.get('id'))
+    }
+    existing = {}
+    if task_ids:
+        rows = db.session.query(
+            Task.id, Task.project_id, Task.status, Task.assignee_id,
+            Task.estimated_hours, Task.actual_hours
+        ).filter(Task.id.in_(task_ids))
+        existing = {row.id: row for row in rows}
+    
+    # Check access once per distinct project
+    project_ids = {row.project_id for row in existing.values()}
+    for operation in operations:
+        if isinstance(operation, dict) and operation.get('op') == 'create' and isinstance(operation.get('data'), dict):
+            project_id = operation['data'].get('project_id')
+            if _is_id(project_id):
+                project_ids.add(project_id)
+    allowed_projects = accessible_project_ids(user_id, project_ids)
+    
+    creates, updates, deletes = [], [], []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get('op') not in ('create', 'update', 'delete'):
+            fail(index, 'Unknown operation')
+            continue
+        
+        op = operation['op']
+        values = operation.get('data') or {}
+        if not isinstance(values, dict):
+            fail(index, 'Invalid task data')
+            continue
+        
+        if op == 'create':
+            if not values.get('title') or not values.get('project_id'):
+                fail(index, 'Title and project ID are required')
+            elif not _is_id(values['project_id']):
+                fail(index, 'Invalid project ID')
+            elif values['project_id'] not in allowed_projects:
+                fail(index, 'Access denied')
+            else:
+                try:
+                    creates.append((index, values['project_id'], _task_changes(values)))
+                except (TypeError, ValueError):
+                    fail(index, 'Invalid task data')
+            continue
+        
+        if not _is_id(operation.get('id')):
+            fail(index, 'Invalid task ID')
+            continue
+        row = existing.get(operation['id'])
+        if row is None:
+            fail(index, 'Task not found')
+        elif row.project_id not in allowed_projects:
+            fail(index, 'Access denied')
+        elif op == 'delete':
+            deletes.append((index, row))
+        else:
+            try:
+                updates.append((index, row, _task_changes(values)))
+            except (TypeError, ValueError):
+                fail(index, 'Invalid task data')
+    
+    # Tasks created or moved to another status go to the end of their column,
+    # so look up the end of every affected column in a single grouped query
+    columns = {(project_id, changes.get('status', 'not-started')) for _, project_id, changes in creates}
+    columns.update(
+        (row.project_id, changes['status']) for _, row, changes in updates
+        if 'status' in changes and changes['status'] != row.status
+    )
+    column_ends = get_column_ends(columns)
+    
+    def next_position(project_id, status):
+        column_ends[(project_id, status)] = column_ends.get((project_id, status), 0) + 1
+        return column_ends[(project_id, status)]
+    
+    if updates:
+        now = datetime.utcnow()
+        params = []
+        for index, row, changes in updates:
+            if 'status' in changes and changes['status'] != row.status:
+                changes['position'] = next_position(row.project_id, changes['status'])
+            params.append({'id': row.id, 'updated_at': now, **changes})
+            results[index] = {'index': index, 'op': 'update', 'id': row.id, 'status': 'ok'}
+        # Bulk UPDATE by primary key, executed as one executemany per key set
+        db.session.execute(db.update(Task), params)
+    
+    if deletes:
+        db.session.execute(
+            db.delete(Task).where(Task.id.in_([row.id for _, row in deletes])),
+            execution_options={'synchronize_session': False}
+        )
+        for index, row in deletes:
+            results[index] = {'index': index, 'op': 'delete', 'id': row.id, 'status': 'ok'}
+    
+    created, tasks = [], []
+    if creates:
+        for index, project_id, changes in creates:
+            task = Task(
+                description='',
+                status='not-started',
+                priority='medium',
+                project_id=project_id
+            )
+            for key, value in changes.items():
+                setattr(task, key, value)
+            task.position = next_position(project_id, task.status)
+            tasks.append((index, task))
+        # Flushed together so the unit of work can batch the INSERTs
+        db.session.add_all([task for _, task in tasks])
+        db.session.flush()
+        for (index, task), (_, _, changes) in zip(tasks, creates):
+            results[index] = {'index': index, 'op': 'create', 'id': task.id, 'status': 'ok'}
+            # Captured before the commit expires the objects
+            created.append({
+                'id': task.id,
+                'project_id': task.project_id,
+                'status': task.status,
+                'position': task.position,
+                **changes
+            })
+    
+    apply_rollups(
+        before=[task_snapshot(row) for _, row, _ in updates] + [task_snapshot(row) for _, row in deletes],
+        after=[task_snapshot(row, **changes) for _, row, changes in updates] +
+              [task_snapshot(task) for _, task in tasks]
+    )
+    remove_task_items([row.id for _, row in deletes])
+    refresh_task_items(
+        [row.id for _, row, changes in updates if INBOX_FIELDS & changes.keys()] +
+        [data['id'] for data in created]
+    )
+    log_activities(
+        [
+            entry for _, row, changes in updates
+            for entry in task_activity(
+                row.project_id, row.id, user_id,
+                {'status': row.status, 'assignee_id': row.assignee_id}, changes
+            )
+        ] +
+        [(row.project_id, 'task.deleted', row.id, user_id, None) for _, row in deletes] +
+        [(data['project_id'], 'task.created', data['id'], user_id, {'title': data['title']}) for data in created]
+    )
+    record_changes(
+        [('task', row.id, row.project_id, 'upsert', None) for _, row, _ in updates] +
+        [('task', row.id, row.project_id, 'delete', None) for _, row in deletes] +
+        [('task', data['id'], data['project_id'], 'upsert', None) for data in created]
+    )
+    record_unassignments(
+        [
+            (row.id, row.project_id, row.assignee_id) for _, row, changes in updates
+            if changes.get('assignee_id', row.assignee_id) != row.assignee_id
+        ] +
+        [(row.id, row.project_id, row.assignee_id) for _, row in deletes]
+    )
+    db.session.commit()
+    
+    # One compact event per project summarising the whole batch
+    events = {}
+    for _, row, changes in updates:
+        events.setdefault(row.project_id, {'created': [], 'updated': [], 'deleted': []})
+        events[row.project_id]['updated'].append({'id': row.id, **changes})
+    for _, row in deletes:
+        events.setdefault(row.project_id, {'created': [], 'updated': [], 'deleted': []})
+        events[row.project_id]['deleted'].append(row.id)
+    for data in created:
+        events.setdefault(data['project_id'], {'created': [], 'updated': [], 'deleted': []})
+        events[data['project_id']]['created'].append(data)
+    for project_id, data in events.items():
+        project_changed(project_id, 'tasks.bulk', data)
+    
+    return jsonify({'results': results}), 200
+
 @tasks_bp.route('/<int:task_id>', methods=['GET'])
 @jwt_required()
 def get_task(task_id):
@@ -91,8 +349,7 @@ def get_task(task_id):
         return jsonify({'error': 'Task not found'}), 404
     
     # Check if user has access to the project
-    project = Project.query.get(task.project_id)
-    if project.owner_id != user_id and user_id not in [member.id for member in project.members]:
+    if not has_project_access(user_id, task.project_id):
         return jsonify({'error': 'Access denied'}), 403
     
     return jsonify({'task': task.to_dict()}), 200
@@ -108,42 +365,34 @@ def update_task(task_id):
         return jsonify({'error': 'Task not found'}), 404
     
     # Check if user has access to the project
-    project = Project.query.get(task.project_id)
-    if project.owner_id != user_id and user_id not in [member.id for member in project.members]:
+    if not has_project_access(user_id, task.project_id):
         return jsonify({'error': 'Access denied'}), 403
     
     data = request.get_json()
-    
-    # Update fields
-    if 'title' in data:
-        task.title = data['title']
-    if 'description' in data:
-        task.description = data['description']
-    if 'status' in data:
-        # If status changed, update position
-        if task.status != data['status']:
-            # Get max position in new status
-            max_position = db.session.query(db.func.max(Task.position)).filter_by(
-                project_id=task.project_id,
-                status=data['status']
-            ).scalar() or 0
-            task.position = max_position + 1
-        task.status = data['status']
-    if 'priority' in data:
-        task.priority = data['priority']
-    if 'assignee_id' in data:
-        task.assignee_id = data['assignee_id']
-    if 'due_date' in data:
-        if data['due_date']:
-            task.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00')).date()
-        else:
-            task.due_date = None
-    if 'estimated_hours' in data:
-        task.estimated_hours = float(data['estimated_hours']) if data['estimated_hours'] else None
-    if 'actual_hours' in data:
-        task.actual_hours = float(data['actual_hours']) if data['actual_hours'] else 0
-    
+    changes = _task_changes(data)
+    before = task_snapshot(task)
+    old = {'status': task.status, 'assignee_id': task.assignee_id}
+    
+    # If status changed, move the task to the end of the new column
+    if 'status' in changes and task.status != changes['status']:
+        max_position = db.session.query(db.func.max(Task.position)).filter_by(
+            project_id=task.project_id,
+            status=changes['status']
+        ).scalar() or 0
+        task.position = max_position + 1
+    
+    for key, value in changes.items():
+        setattr(task, key, value)
+    
+    apply_rollups(before=[before], after=[task_snapshot(task)])
+    if INBOX_FIELDS & changes.keys():
+        refresh_task_items([task.id])
+    log_activities(task_activity(task.project_id, task.id, user_id, old, changes))
+    record_change('task', task.id, task.project_id)
+    if task.assignee_id != old['assignee_id']:
+        record_unassignments([(task.id, task.project_id, old['assignee_id'])])
     db.session.commit()
+    project_changed(task.project_id, 'task.updated', task_event_data(task))
     
     return jsonify({
         'message': 'Task updated successfully',
@@ -161,39 +410,45 @@ def delete_task(task_id):
         return jsonify({'error': 'Task not found'}), 404
     
     # Check if user has access to the project
-    project = Project.query.get(task.project_id)
-    if project.owner_id != user_id and user_id not in [member.id for member in project.members]:
+    if not has_project_access(user_id, task.project_id):
         return jsonify({'error': 'Access denied'}), 403
     
+    project_id = task.project_id
+    apply_rollups(before=[task_snapshot(task)])
+    remove_task_items([task_id])
+    log_activity(project_id, 'task.deleted', task_id, user_id, {'title': task.title})
+    assignee_id = task.assignee_id
     db.session.delete(task)
+    record_change('task', task_id, project_id, 'delete')
+    record_unassignments([(task_id, project_id, assignee_id)])
     db.session.commit()
+    project_changed(project_id, 'task.deleted', {'id': task_id})
     
     return jsonify({'message': 'Task deleted successfully'}), 200
 
 @tasks_bp.route('/project/<int:project_id>', methods=['GET'])
 @jwt_required()
+@cached_project_response
 def get_project_tasks(project_id):
     """Get all tasks for a project"""
     user_id = get_jwt_identity()
     
     # Check if project exists and user has access
-    project = Project.query.get(project_id)
+    project = find_project(project_id)
     if not project:
         return jsonify({'error': 'Project not found'}), 404
     
-    if project.owner_id != user_id and user_id not in [member.id for member in project.members]:
+    if not has_project_access(user_id, project.id):
         return jsonify({'error': 'Access denied'}), 403
     
-    tasks = Task.query.filter_by(project_id=project_id).order_by(Task.position).all()
+    query = filter_tasks(Task.query.filter_by(project_id=project_id))
     
-    return jsonify({
-        'tasks': [task.to_dict() for task in tasks]
-    }), 200
+    return jsonify(task_listing(query, f'project-tasks:{project_id}', [Task.position, Task.id])), 200
 
 @tasks_bp.route('/reorder', methods=['POST'])
 @jwt_required()
 def reorder_tasks():
-    """Reorder tasks within a status column"""
+    """Move a task to a 1-based position within a status column"""
     user_id = get_jwt_identity()
     data = request.get_json()
     
@@ -204,57 +459,45 @@ def reorder_tasks():
     if not task_id or new_position is None:
         return jsonify({'error': 'Task ID and position are required'}), 400
     
+    try:
+        new_position = int(new_position)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Position must be an integer'}), 400
+    
     task = Task.query.get(task_id)
     if not task:
         return jsonify({'error': 'Task not found'}), 404
     
     # Check if user has access to the project
-    project = Project.query.get(task.project_id)
-    if project.owner_id != user_id and user_id not in [member.id for member in project.members]:
+    if not has_project_access(user_id, task.project_id):
         return jsonify({'error': 'Access denied'}), 403
     
+    # Positions are fractional sort keys: the moved task gets a key between
+    # its new neighbours, so no other row in either column is rewritten
+    status = new_status or task.status
+    before = task_snapshot(task)
+    task.position, needs_rebalance, rebalanced = position_for_rank(
+        task.project_id, status, new_position, exclude_id=task.id
+    )
     old_status = task.status
-    old_position = task.position
-    
-    # If status changed
-    if new_status and new_status != old_status:
-        task.status = new_status
-        
-        # Shift tasks in old status up
-        Task.query.filter(
-            Task.project_id == task.project_id,
-            Task.status == old_status,
-            Task.position > old_position
-        ).update({Task.position: Task.position - 1})
-        
-        # Shift tasks in new status down
-        Task.query.filter(
-            Task.project_id == task.project_id,
-            Task.status == new_status,
-            Task.position >= new_position
-        ).update({Task.position: Task.position + 1})
-    
-    # If position changed within same status
-    elif new_position != old_position:
-        if new_position > old_position:
-            # Moving down
-            Task.query.filter(
-                Task.project_id == task.project_id,
-                Task.status == old_status,
-                Task.position > old_position,
-                Task.position <= new_position
-            ).update({Task.position: Task.position - 1})
-        else:
-            # Moving up
-            Task.query.filter(
-                Task.project_id == task.project_id,
-                Task.status == old_status,
-                Task.position >= new_position,
-                Task.position < old_position
-            ).update({Task.position: Task.position + 1})
-    
-    task.position = new_position
+    task.status = status
+    apply_rollups(before=[before], after=[task_snapshot(task)])
+    if status != old_status:
+        refresh_task_items([task.id])
+        log_activities(task_activity(task.project_id, task.id, user_id, {'status': old_status}, {'status': status}))
+    record_change('task', task.id, task.project_id)
     db.session.commit()
+    if rebalanced:
+        # Every key in the column changed, not just the moved task's
+        project_changed(task.project_id, 'tasks.rebalanced', {'status': status})
+    project_changed(task.project_id, 'task.reordered', {
+        'id': task.id,
+        'status': task.status,
+        'position': task.position
+    })
+    
+    if needs_rebalance:
+        schedule_rebalance(task.project_id, status)
     
     return jsonify({
         'message': 'Task reordered successfully',
@@ -0,0 +1,145 @@
+import threading
+import time
+from flask import g, current_app, has_request_context
+from .. import db
+from ..models.project import Project
+from ..models.user import project_members
+
+# Process-level cache of (user_id, project_id) -> (allowed, expires_at).
+# Entries are short-lived because other workers cannot invalidate them.
+_cache = {}
+_cache_lock = threading.Lock()
+
+def _request_cache():
+    if not has_request_context():
+        return {}
+    if '_project_access' not in g:
+        g._project_access = {}
+    return g._project_access
+
+def _cache_get(key):
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        allowed, expires_at = entry
+        if expires_at < time.monotonic():
+            del _cache[key]
+            return None
+        return allowed
+
+def _cache_set(key, allowed):
+    ttl = current_app.config['ACCESS_CACHE_TTL']
+    if ttl <= 0:
+        return
+    with _cache_lock:
+        if len(_cache) >= current_app.config['ACCESS_CACHE_SIZE']:
+            _cache.clear()
+        _cache[key] = (allowed, time.monotonic() + ttl)
+
+def find_project(project_id):
+    """Return the project, or None when it does not exist or has been deleted"""
+    project = db.session.get(Project, project_id)
+    if project is None or project.deleted_at is not None:
+        return None
+    return project
+
+def accessible_project_ids_query(user_id):
+    """Subquery of the ids of every live project the user owns or is a member of"""
+    member_project_ids = db.session.query(project_members.c.project_id).join(
+        Project, Project.id == project_members.c.project_id
+    ).filter(
+        project_members.c.user_id == user_id,
+        Project.deleted_at.is_(None)
+    )
+    owned_project_ids = db.session.query(Project.id).filter(
+        Project.owner_id == user_id,
+        Project.deleted_at.is_(None)
+    )
+    return member_project_ids.union(owned_project_ids)
+
+def _access_query(user_id, project_ids):
+    """Select the ids among project_ids that the user owns or is a member of, unless deleted"""
+    is_member = db.exists().where(
+        project_members.c.project_id == Project.id,
+        project_members.c.user_id == user_id
+    )
+    return db.session.query(Project.id).filter(
+        Project.id.in_(project_ids),
+        Project.deleted_at.is_(None),
+        db.or_(Project.owner_id == user_id, is_member)
+    )
+
+def has_project_access(user_id, project_id):
+    """Check whether the user owns or is a member of the project"""
+    return project_id in accessible_project_ids(user_id, [project_id])
+
+def accessible_project_ids(user_id, project_ids):
+    """
+    Return the subset of project_ids the user owns or is a member of.
+    
+    Answers come from the per-request cache, then the process-level cache,
+    and any remaining ids are resolved with a single indexed EXISTS query.
+    """
+    user_id = int(user_id)
+    allowed, missing = _cached_access(user_id, project_ids)
+    if missing:
+        found = {row.id for row in _access_query(user_id, missing)}
+        allowed |= _remember_access(user_id, missing, found)
+    return allowed
+
+async def accessible_project_ids_async(session, user_id, project_ids):
+    """accessible_project_ids for the asyncio endpoints, querying through ``session``"""
+    user_id = int(user_id)
+    allowed, missing = _cached_access(user_id, project_ids)
+    if missing:
+        result = await session.execute(_access_query(user_id, missing).statement)
+        allowed |= _remember_access(user_id, missing, set(result.scalars()))
+    return allowed
+
+def _cached_access(user_id, project_ids):
+    """Split project_ids into cached allowed ids and ids with no cached answer"""
+    request_cache = _request_cache()
+    allowed = set()
+    missing = []
+    
+    for project_id in set(project_ids):
+        key = (user_id, project_id)
+        result = request_cache.get(key)
+        if result is None:
+            result = _cache_get(key)
+            if result is not None:
+                request_cache[key] = result
+        if result is None:
+            missing.append(project_id)
+        elif result:
+            allowed.add(project_id)
+    
+    return allowed, missing
+
+def _remember_access(user_id, project_ids, found):
+    """Cache the answers for project_ids, of which ``found`` are allowed"""
+    request_cache = _request_cache()
+    for project_id in project_ids:
+        result = project_id in found
+        request_cache[(user_id, project_id)] = result
+        _cache_set((user_id, project_id), result)
+    return found
+
+def is_project_member(user_id, project_id):
+    """Check the project_members table directly, without loading the collection"""
+    return db.session.query(
+        db.exists().where(
+            project_members.c.project_id == project_id,
+            project_members.c.user_id == user_id
+        )
+    ).scalar()
+
+def invalidate_project_access(project_id, user_id=None):
+    """Drop cached answers for a project, or for one user on a project"""
+    request_cache = _request_cache()
+    with _cache_lock:
+        for cache in (_cache, request_cache):
+            for key in list(cache):
+                if key[1] == project_id and (user_id is None or key[0] == int(user_id)):
+                    del cache[key]
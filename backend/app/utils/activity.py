@@ -0,0 +1,179 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event
+from .. import db
+from ..models.activity import Activity
+
+ACTIVITY_MODES = ('async', 'transactional', 'none')
+
+# Task fields whose changes are logged, and the action recorded for each
+TASK_FIELD_ACTIONS = {'status': 'task.status_changed', 'assignee_id': 'task.assignee_changed'}
+
+_STOP = object()
+_listening = False
+
+class ActivityWriter:
+    """
+    Write queued activity entries from a background thread in multi-row INSERTs.
+    
+    A batch is written when it reaches ``batch_size`` entries or its oldest
+    entry has waited ``interval`` seconds. When the queue is full the caller
+    writes its own entries, slowing the request down rather than dropping
+    them. An atexit hook flushes the queue on a clean shutdown; a crash loses
+    what is still queued (see ACTIVITY_LOG_MODE='transactional').
+    """
+    
+    def __init__(self, app, batch_size, interval, max_queue):
+        self.app = app
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_queue = max_queue
+        self.inline = app.config['BACKGROUND_TASKS_INLINE']
+        self.queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+    
+    def put(self, entries):
+        if self.inline:
+            self.write(entries)
+            return
+        self._ensure_thread()
+        for i, entry in enumerate(entries):
+            try:
+                self.queue.put_nowait(entry)
+            except queue.Full:
+                self.app.logger.warning('Activity queue is full; writing %d entries inline', len(entries) - i)
+                self.write(entries[i:])
+                return
+    
+    def write(self, entries):
+        if not entries:
+            return
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as connection:
+                    connection.execute(db.insert(Activity).values(entries))
+        except Exception:
+            self.app.logger.exception('Could not write %d activity entries', len(entries))
+    
+    def close(self):
+        """Write everything queued so far and stop the thread"""
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        self.queue.put(_STOP)
+        self._thread.join(timeout=10)
+    
+    def _ensure_thread(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid != pid:
+                # Started lazily, and again after a fork, so each worker runs its own
+                self.queue = queue.Queue(maxsize=self.max_queue)
+                self._thread = threading.Thread(target=self._run, name='activity-writer', daemon=True)
+                self._thread.start()
+                self._pid = pid
+    
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                entry = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                entry = None
+            if entry is _STOP:
+                self.write(batch)
+                return
+            if entry is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.interval
+                batch.append(entry)
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self.write(batch)
+                batch = []
+                deadline = None
+
+def init_activity(app):
+    """Create the activity writer for ACTIVITY_LOG_MODE='async' and hook session commits"""
+    global _listening
+    mode = app.config['ACTIVITY_LOG_MODE']
+    if mode not in ACTIVITY_MODES:
+        raise ValueError(f'Unknown ACTIVITY_LOG_MODE: {mode}')
+    
+    writer = None
+    if mode == 'async':
+        writer = ActivityWriter(
+            app,
+            app.config['ACTIVITY_BATCH_SIZE'],
+            app.config['ACTIVITY_FLUSH_INTERVAL'],
+            app.config['ACTIVITY_QUEUE_SIZE']
+        )
+    app.extensions['activity_writer'] = writer
+    
+    if not _listening:
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_soft_rollback', _after_soft_rollback)
+        _listening = True
+    return writer
+
+def log_activity(project_id, action, task_id=None, user_id=None, data=None):
+    """Log one activity entry; it is written only if the current transaction commits"""
+    log_activities([(project_id, action, task_id, user_id, data)])
+
+def log_activities(entries):
+    """
+    Log several activity entries for the current transaction.
+    
+    ``entries`` holds (project_id, action, task_id, user_id, data) tuples.
+    In 'async' mode they wait on the session until it commits and are then
+    queued for the writer; in 'transactional' mode they are inserted now,
+    with the change itself.
+    """
+    mode = current_app.config['ACTIVITY_LOG_MODE']
+    if mode == 'none' or not entries:
+        return
+    now = datetime.utcnow()
+    rows = [
+        {
+            'project_id': project_id,
+            'task_id': task_id,
+            'user_id': user_id,
+            'action': action,
+            'data': data,
+            'created_at': now
+        }
+        for project_id, action, task_id, user_id, data in entries
+    ]
+    if mode == 'transactional':
+        db.session.execute(db.insert(Activity), rows)
+    else:
+        db.session.info.setdefault('pending_activity', []).extend(rows)
+
+def task_activity(project_id, task_id, user_id, old, new):
+    """Entries for the logged task fields that differ between two value mappings"""
+    return [
+        (project_id, action, task_id, user_id, {'from': old.get(field), 'to': new[field]})
+        for field, action in TASK_FIELD_ACTIONS.items()
+        if field in new and new[field] != old.get(field)
+    ]
+
+def _after_commit(session):
+    rows = session.info.pop('pending_activity', None)
+    if rows:
+        writer = current_app.extensions.get('activity_writer')
+        if writer is not None:
+            writer.put(rows)
+
+def _after_soft_rollback(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('pending_activity', None)
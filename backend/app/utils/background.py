@@ -0,0 +1,38 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from .. import db
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor(app):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config['BACKGROUND_WORKERS'],
+                thread_name_prefix='background'
+            )
+        return _executor
+
+def submit(fn, *args, **kwargs):
+    """
+    Run ``fn`` outside the request, inside an application context.
+    
+    Jobs run on a small shared thread pool, or inline when
+    BACKGROUND_TASKS_INLINE is set (useful for tests and CLI commands).
+    """
+    app = current_app._get_current_object()
+    
+    def run():
+        with app.app_context():
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception('Background job %s failed', getattr(fn, '__name__', fn))
+    
+    if app.config['BACKGROUND_TASKS_INLINE']:
+        return run()
+    return _get_executor(app).submit(run)
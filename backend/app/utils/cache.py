@@ -0,0 +1,210 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, request, make_response
+from flask_jwt_extended import get_jwt_identity
+from .access import has_project_access, accessible_project_ids_async
+
+class LRUCache:
+    """In-process cache with least-recently-used eviction and per-key TTL"""
+    
+    shared = False
+    
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value, ttl=None, only_if_missing=False):
+        with self._lock:
+            if only_if_missing and key in self._data:
+                return False
+            expires_at = time.monotonic() + ttl if ttl else None
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+    
+    def incr(self, key):
+        with self._lock:
+            value, expires_at = self._data.get(key, (0, None))
+            value = int(value) + 1
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            return value
+    
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class RedisCache:
+    """Cache backed by any server speaking the Redis protocol, shared by all workers"""
+    
+    shared = True
+    
+    def __init__(self, url, prefix='pm:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('RESPONSE_CACHE_BACKEND=redis requires the redis package')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+    
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+    
+    def set(self, key, value, ttl=None, only_if_missing=False):
+        return bool(self.client.set(self.prefix + key, value, ex=ttl or None, nx=only_if_missing))
+    
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+    
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+    
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+def init_cache(app):
+    """Create the response cache backend selected by RESPONSE_CACHE_BACKEND"""
+    backend = app.config['RESPONSE_CACHE_BACKEND']
+    if backend == 'lru':
+        cache = LRUCache(app.config['RESPONSE_CACHE_SIZE'])
+    elif backend == 'redis':
+        cache = RedisCache(app.config['RESPONSE_CACHE_URL'])
+    elif backend == 'none':
+        cache = None
+    else:
+        raise ValueError(f'Unknown RESPONSE_CACHE_BACKEND: {backend}')
+    app.extensions['response_cache'] = cache
+    return cache
+
+def get_cache():
+    return current_app.extensions.get('response_cache')
+
+def project_version(project_id):
+    """
+    Return the current cache version of a project.
+    
+    New counters start from the current time in milliseconds so that ETags
+    issued before a restart (or an LRU eviction) are never reused.
+    """
+    cache = get_cache()
+    key = f'project-version:{project_id}'
+    version = cache.get(key)
+    if version is None:
+        cache.set(key, int(time.time() * 1000), only_if_missing=True)
+        version = cache.get(key)
+    return int(version)
+
+def bump_project_version(project_id):
+    """Invalidate every cached response for a project and return the new version"""
+    cache = get_cache()
+    if cache is None:
+        return None
+    project_version(project_id)
+    return cache.incr(f'project-version:{project_id}')
+
+def cached_project_response(view):
+    """
+    Cache a project-scoped GET response until the project's version changes.
+    
+    Access is still checked on every request. The ETag is derived from the
+    project version and the query string, so an If-None-Match hit returns a
+    304 without rendering or even reading the cache. Responses rendered from
+    a read replica are neither stored nor given an ETag: the replica may not
+    have caught up with the write that bumped the version.
+    """
+    @wraps(view)
+    def wrapper(project_id, *args, **kwargs):
+        cache = get_cache()
+        if cache is None or not has_project_access(get_jwt_identity(), project_id):
+            # Let the view produce its usual 404/403
+            return view(project_id, *args, **kwargs)
+        
+        version = project_version(project_id)
+        query = hashlib.sha1(request.query_string).hexdigest()[:12]
+        key = f'response:{request.endpoint}:{project_id}:{version}:{query}'
+        etag = f'{project_id}-{version}-{query}'
+        
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            body = cache.get(key)
+            if body is not None:
+                response = current_app.response_class(body, mimetype='application/json')
+            else:
+                response = make_response(view(project_id, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if g.get('_db_replica') is not None:
+                    # Neither cached nor tagged with the version it may predate
+                    response.headers['Cache-Control'] = 'private, no-cache'
+                    return response
+                cache.set(key, response.get_data(), current_app.config['RESPONSE_CACHE_TTL'])
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    return wrapper
+
+async def cached_project_response_async(session, project_id, view):
+    """
+    cached_project_response for the asyncio endpoints.
+    
+    ``view`` is a coroutine function taking (session, project_id). Calls to
+    a Redis cache run in a thread so they do not block the event loop.
+    """
+    cache = get_cache()
+    if cache is None or project_id not in await accessible_project_ids_async(
+        session, get_jwt_identity(), [project_id]
+    ):
+        return await view(session, project_id)
+    
+    async def call(fn, *args):
+        if isinstance(cache, LRUCache):
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+    
+    version = await call(project_version, project_id)
+    query = hashlib.sha1(request.query_string).hexdigest()[:12]
+    key = f'response:{request.endpoint}:{project_id}:{version}:{query}'
+    etag = f'{project_id}-{version}-{query}'
+    
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        body = await call(cache.get, key)
+        if body is not None:
+            response = current_app.response_class(body, mimetype='application/json')
+        else:
+            response = make_response(await view(session, project_id))
+            if response.status_code != 200:
+                return response
+            await call(cache.set, key, response.get_data(), current_app.config['RESPONSE_CACHE_TTL'])
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,62 @@
+from datetime import datetime
+from .. import db
+from ..models.change import ChangeLog
+from ..models.task import Task
+from .access import accessible_project_ids
+
+def record_change(entity, entity_id, project_id, action='upsert', user_id=None):
+    """Log a change inside the current transaction; committed with the change itself"""
+    record_changes([(entity, entity_id, project_id, action, user_id)])
+
+def record_changes(changes):
+    """
+    Log several changes with a single executemany INSERT.
+    
+    ``changes`` holds (entity, entity_id, project_id, action, user_id) tuples.
+    """
+    if not changes:
+        return
+    now = datetime.utcnow()
+    db.session.execute(db.insert(ChangeLog), [
+        {
+            'entity': entity,
+            'entity_id': entity_id,
+            'project_id': project_id,
+            'action': action,
+            'user_id': user_id,
+            'created_at': now
+        }
+        for entity, entity_id, project_id, action, user_id in changes
+    ])
+
+def record_unassignments(tasks):
+    """
+    Log a per-user delete for assignees who lose sight of a task.
+    
+    ``tasks`` holds (task_id, project_id, previous assignee_id) for tasks
+    that were deleted or reassigned. An assignee who is not a project member
+    sees the task only through the assignment, so their clients are told to
+    drop it; members keep it through the project.
+    """
+    changes = [
+        ('task', task_id, project_id, 'delete', assignee_id)
+        for task_id, project_id, assignee_id in tasks
+        if assignee_id is not None and project_id not in accessible_project_ids(assignee_id, [project_id])
+    ]
+    record_changes(changes)
+
+def record_project_tasks(project_id, user_id=None):
+    """
+    Log an upsert of every task of a project with a single INSERT ... SELECT.
+    
+    For a project that becomes visible all at once: to its members when it
+    is restored, or to ``user_id`` alone when they join it.
+    """
+    now = datetime.utcnow()
+    db.session.execute(db.insert(ChangeLog).from_select(
+        ['entity', 'entity_id', 'project_id', 'action', 'user_id', 'created_at'],
+        db.select(
+            db.literal('task'), Task.id, Task.project_id, db.literal('upsert'),
+            db.literal(user_id, db.Integer), db.literal(now)
+        ).where(Task.project_id == project_id)
+    ))
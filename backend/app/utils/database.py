@@ -0,0 +1,74 @@
+from sqlalchemy import event
+from .. import db
+from .instrumentation import instrument_engine
+from .routing import init_replicas
+
+# Session statement used to apply DB_STATEMENT_TIMEOUT (milliseconds)
+STATEMENT_TIMEOUTS = {
+    'mysql': 'SET SESSION max_execution_time = {timeout}',
+    'postgresql': 'SET statement_timeout = {timeout}',
+}
+
+# asyncio drivers for the async read endpoints, by database backend
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'mysql': 'mysql+aiomysql',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+def init_database(app):
+    """Apply the per-connection settings to every engine and set up replica routing"""
+    with app.app_context():
+        engines = dict(db.engines)
+    for engine in engines.values():
+        _set_statement_timeout(engine, app.config['DB_STATEMENT_TIMEOUT'])
+    init_replicas(app, engines)
+
+def _set_statement_timeout(engine, timeout):
+    statement = STATEMENT_TIMEOUTS.get(engine.dialect.name)
+    if not timeout or statement is None:
+        return
+    statement = statement.format(timeout=int(timeout))
+    
+    @event.listens_for(engine, 'connect')
+    def set_statement_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(statement)
+        cursor.close()
+
+def dispose_engine(app):
+    """
+    Drop pooled connections inherited from a parent process.
+    
+    Call in each worker after fork. ``close=False`` leaves the sockets to
+    the parent, which still owns them, and the child opens its own.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+def init_async_engine(app):
+    """
+    Create the asyncio engine behind the async read endpoints (app/asgi.py).
+    
+    Uses ASYNC_DATABASE_URL, or the configured database with its asyncio
+    driver, and the same pool options and statement timeout as the main
+    engine.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    
+    url = app.config['ASYNC_DATABASE_URL']
+    if not url:
+        with app.app_context():
+            url = db.engine.url
+        driver = ASYNC_DRIVERS.get(url.get_backend_name())
+        if driver is None:
+            raise RuntimeError(f'No asyncio driver known for {url.get_backend_name()}; set ASYNC_DATABASE_URL')
+        url = url.set(drivername=driver)
+    
+    engine = create_async_engine(url, **app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+    _set_statement_timeout(engine.sync_engine, app.config['DB_STATEMENT_TIMEOUT'])
+    instrument_engine(app, engine.sync_engine)
+    app.extensions['async_engine'] = engine
+    app.extensions['async_session'] = async_sessionmaker(engine, expire_on_commit=False)
+    return engine
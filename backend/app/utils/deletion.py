@@ -0,0 +1,106 @@
+import os
+from datetime import datetime, timedelta
+from flask import current_app
+from .. import db
+from ..models.activity import Activity
+from ..models.import_job import ImportJob
+from ..models.notification import Notification
+from ..models.project import Project
+from ..models.task import Task
+from ..models.user import project_members
+from .changes import record_project_tasks
+from .imports import import_path
+from .inbox import add_project_items, remove_project_items
+from .rollups import delete_project_rollups
+
+def restore_deadline(project):
+    """When the deleted project stops being restorable and becomes eligible for purging"""
+    return project.deleted_at + timedelta(days=current_app.config['PROJECT_RESTORE_DAYS'])
+
+def mark_deleted(project):
+    """
+    Hide a project from every listing and access check, in the current transaction.
+    
+    Only the project row and its inbox rows are written, so deleting a large
+    project is as cheap as deleting a small one; purge_project removes the
+    rest once the restore window has passed.
+    """
+    project.deleted_at = datetime.utcnow()
+    remove_project_items(project.id)
+
+def mark_restored(project):
+    """Undo mark_deleted, re-announcing the project's tasks to sync clients"""
+    project.deleted_at = None
+    db.session.flush()
+    add_project_items(project.id)
+    record_project_tasks(project.id)
+
+def purge_project(project_id):
+    """
+    Remove a deleted project and everything that belongs to it.
+    
+    Tasks, activity and notifications go PROJECT_PURGE_BATCH_SIZE rows per
+    transaction, so no lock is held for long and an interrupted purge picks
+    up where it stopped. Import jobs go too, with any upload left on disk. The change log is kept: sync clients still need
+    the deletion entries. Returns the number of tasks removed, or None when
+    the project is not (or no longer) deleted.
+    """
+    deleted = db.session.query(Project.id).filter(
+        Project.id == project_id,
+        Project.deleted_at.isnot(None)
+    ).scalar()
+    if deleted is None:
+        return None
+    
+    removed = _delete_in_batches(Task, Task.project_id == project_id)
+    _delete_in_batches(Activity, Activity.project_id == project_id)
+    _delete_in_batches(Notification, Notification.project_id == project_id)
+    
+    uploads = _delete_imports(project_id)
+    delete_project_rollups(project_id)
+    remove_project_items(project_id)
+    db.session.execute(project_members.delete().where(project_members.c.project_id == project_id))
+    db.session.execute(
+        db.delete(Project).where(Project.id == project_id, Project.deleted_at.isnot(None)),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    # Uploads of imports that never completed
+    for path in uploads:
+        if os.path.exists(path):
+            os.remove(path)
+    current_app.logger.info('Purged project %s and its %d tasks', project_id, removed)
+    return removed
+
+def purge_deleted_projects():
+    """Purge every deleted project whose restore window has passed; returns how many"""
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config['PROJECT_RESTORE_DAYS'])
+    project_ids = [row.id for row in db.session.query(Project.id).filter(
+        Project.deleted_at <= cutoff
+    ).order_by(Project.deleted_at)]
+    for project_id in project_ids:
+        purge_project(project_id)
+    return len(project_ids)
+
+def _delete_imports(project_id):
+    """Delete the project's import jobs; returns the upload paths to remove after committing"""
+    paths = [import_path(job) for job in ImportJob.query.filter_by(project_id=project_id)]
+    db.session.execute(
+        db.delete(ImportJob).where(ImportJob.project_id == project_id),
+        execution_options={'synchronize_session': False}
+    )
+    return paths
+
+def _delete_in_batches(model, condition):
+    batch_size = current_app.config['PROJECT_PURGE_BATCH_SIZE']
+    removed = 0
+    while True:
+        ids = [row.id for row in db.session.query(model.id).filter(condition).order_by(model.id).limit(batch_size)]
+        if not ids:
+            return removed
+        db.session.execute(
+            db.delete(model).where(model.id.in_(ids)),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+        removed += len(ids)
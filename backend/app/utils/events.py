@@ -0,0 +1,222 @@
+import json
+import queue
+import threading
+import time
+from flask import current_app
+from .cache import bump_project_version, get_cache, project_version
+
+class Subscription:
+    """A subscriber's view of one channel; iterate with get()"""
+    
+    def __init__(self, broker, channel, max_queue):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.overflowed = False
+    
+    def get(self, timeout):
+        """Return the next event, or None when ``timeout`` passes without one"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class InProcessBroker:
+    """Fans events out to subscribers in this process only (single worker deployments)"""
+    
+    def __init__(self, max_queue=256):
+        self.max_queue = max_queue
+        self._channels = {}
+        self._lock = threading.Lock()
+    
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.max_queue)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+    
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            _deliver(subscription, message)
+    
+    def resync_all(self):
+        """Tell every subscriber to reload, after events may have been lost"""
+        with self._lock:
+            subscriptions = [subscription for subscribers in self._channels.values() for subscription in subscribers]
+        for subscription in subscriptions:
+            subscription.overflowed = True
+
+class RedisBroker:
+    """
+    Fans events out through Redis pub/sub so every worker sees every event.
+    
+    When the connection drops, the listener logs the error and reconnects
+    with a growing delay (up to ``max_retry_seconds``). Events published in
+    the meantime are lost, so every subscriber is sent a 'resync' event.
+    """
+    
+    def __init__(self, url, max_queue=256, logger=None, max_retry_seconds=30):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('EVENT_BROKER=redis requires the redis package')
+        self.client = redis.Redis.from_url(url)
+        self.max_queue = max_queue
+        self.logger = logger
+        self.max_retry_seconds = max_retry_seconds
+        self._local = InProcessBroker(max_queue)
+        self._pubsub = self._connect()
+        self._thread = threading.Thread(target=self._listen, name='event-broker', daemon=True)
+        self._thread.start()
+    
+    def _connect(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe('pm:events:*')
+        return pubsub
+    
+    def _listen(self):
+        delay = 1
+        while True:
+            try:
+                if self._pubsub is None:
+                    self._pubsub = self._connect()
+                    self._local.resync_all()
+                    if self.logger is not None:
+                        self.logger.info('Event broker reconnected')
+                delay = 1
+                for message in self._pubsub.listen():
+                    channel = message['channel'].decode('utf-8').split(':', 2)[2]
+                    self._local.publish(channel, message['data'].decode('utf-8'))
+                raise ConnectionError('Event subscription ended')
+            except Exception:
+                if self.logger is not None:
+                    self.logger.exception('Event broker lost its connection; reconnecting in %ss', delay)
+                if self._pubsub is not None:
+                    try:
+                        self._pubsub.close()
+                    except Exception:
+                        pass
+                    self._pubsub = None
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_seconds)
+    
+    def subscribe(self, channel):
+        return self._local.subscribe(channel)
+    
+    def unsubscribe(self, subscription):
+        self._local.unsubscribe(subscription)
+    
+    def publish(self, channel, message):
+        self.client.publish(f'pm:events:{channel}', message)
+
+def _deliver(subscription, message):
+    try:
+        subscription.queue.put_nowait(message)
+    except queue.Full:
+        # The client is too slow to keep up; tell it to reload instead
+        subscription.overflowed = True
+
+def init_events(app):
+    """Create the event broker selected by EVENT_BROKER"""
+    backend = app.config['EVENT_BROKER']
+    if backend == 'memory':
+        broker = InProcessBroker(app.config['EVENT_QUEUE_SIZE'])
+    elif backend == 'redis':
+        broker = RedisBroker(app.config['EVENT_BROKER_URL'], app.config['EVENT_QUEUE_SIZE'], app.logger)
+    elif backend == 'none':
+        broker = None
+    else:
+        raise ValueError(f'Unknown EVENT_BROKER: {backend}')
+    app.extensions['event_broker'] = broker
+    return broker
+
+def get_broker():
+    return current_app.extensions.get('event_broker')
+
+def project_changed(project_id, event=None, data=None):
+    """
+    Announce a committed change to a project.
+    
+    Bumps the project's cache version and, when ``event`` is given, publishes
+    a compact change event on the project's channel. Call after committing.
+    """
+    version = bump_project_version(project_id)
+    broker = get_broker()
+    if broker is None or event is None:
+        return
+    message = json.dumps({
+        'type': event,
+        'project_id': project_id,
+        'version': version,
+        'data': data or {}
+    }, default=str)
+    broker.publish(f'project:{project_id}', message)
+
+def task_event_data(task):
+    """Compact task payload for events: the assignee is sent as an id only"""
+    data = task.to_dict()
+    data.pop('assignee', None)
+    return data
+
+def event_stream(project_id, last_event_id=None):
+    """
+    Generate Server-Sent Events for a project's channel.
+    
+    Sends a comment every EVENT_HEARTBEAT seconds to keep proxies from
+    closing the connection, and ends after EVENT_STREAM_MAX_SECONDS so a
+    worker is not held forever; EventSource reconnects on its own. A client
+    that falls behind receives a 'resync' event and should reload.
+    
+    Event ids are project versions, and the stream opens with the current
+    one. ``last_event_id`` is the Last-Event-ID a reconnecting EventSource
+    sends: when the project has changed since, events were missed and the
+    stream starts with a 'resync' event.
+    """
+    broker = get_broker()
+    heartbeat = current_app.config['EVENT_HEARTBEAT']
+    deadline = time.monotonic() + current_app.config['EVENT_STREAM_MAX_SECONDS']
+    subscription = broker.subscribe(f'project:{project_id}')
+    # Read after subscribing, so no change falls between the two
+    version = project_version(project_id) if get_cache() is not None else None
+    
+    try:
+        yield 'retry: 3000\n'
+        if version is None:
+            yield '\n'
+        elif last_event_id and _missed_events(last_event_id, version):
+            yield f'id: {version}\nevent: resync\ndata: {{}}\n\n'
+        else:
+            yield f'id: {version}\n\n'
+        while time.monotonic() < deadline:
+            if subscription.overflowed:
+                yield 'event: resync\ndata: {}\n\n'
+                return
+            message = subscription.get(timeout=heartbeat)
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            event = json.loads(message)
+            if event['version'] is not None:
+                yield f"id: {event['version']}\n"
+            yield f"event: {event['type']}\ndata: {message}\n\n"
+    finally:
+        subscription.close()
+
+def _missed_events(last_event_id, version):
+    try:
+        return int(last_event_id) < version
+    except ValueError:
+        return True
@@ -0,0 +1,64 @@
+from datetime import date, datetime
+from flask import request
+
+class InvalidArgument(ValueError):
+    """Raised when a request argument cannot be used; rendered as a 400"""
+
+def parse_fields(allowed):
+    """
+    Parse the ``fields`` query argument into a list of field names.
+    
+    Returns None when no projection was requested, meaning the full
+    representation should be returned. ``id`` is always included.
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    
+    fields = ['id']
+    for field in raw.split(','):
+        field = field.strip()
+        if not field or field in fields:
+            continue
+        if field not in allowed:
+            raise InvalidArgument(f'Unknown field: {field}')
+        fields.append(field)
+    return fields
+
+def parse_list_arg(name):
+    """Parse a comma-separated query argument into a list, or None"""
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    return [value.strip() for value in raw.split(',') if value.strip()]
+
+def parse_date_arg(name):
+    """Parse an ISO date query argument, or None"""
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw[:10])
+    except ValueError:
+        raise InvalidArgument(f'Invalid date for {name}')
+
+def serialize(obj, fields=None, attributes=None):
+    """
+    Serialize a model, limited to ``fields`` when a projection was requested.
+    
+    ``attributes`` maps output field names to model attributes where the two
+    differ.
+    """
+    if fields is None:
+        return obj.to_dict()
+    
+    attributes = attributes or {}
+    data = {}
+    for field in fields:
+        value = getattr(obj, attributes.get(field, field))
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        elif hasattr(value, 'to_dict'):
+            value = value.to_dict()
+        data[field] = value
+    return data
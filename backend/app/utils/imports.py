@@ -0,0 +1,301 @@
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+from itertools import islice
+from flask import current_app
+from .. import db
+from ..models.import_job import ImportJob
+from ..models.task import Task
+from ..models.user import User
+from .access import find_project
+from .activity import log_activity
+from .changes import record_changes
+from .events import project_changed
+from .inbox import refresh_task_items
+from .positions import get_column_ends
+from .rollups import apply_rollups, task_snapshot
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Longest accepted value of each string column
+FIELD_LENGTHS = {'title': 200, 'status': 50, 'priority': 20}
+
+def guess_format(filename, content_type):
+    """The import format implied by a file name or content type, or None"""
+    name = (filename or '').lower()
+    content_type = (content_type or '').lower()
+    if name.endswith('.csv') or 'csv' in content_type:
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    return None
+
+def import_path(job):
+    return os.path.join(current_app.instance_path, current_app.config['IMPORT_DIR'], f'{job.id}.{job.format}')
+
+def create_import(project_id, user_id, fmt, chunks, filename=None, max_bytes=None):
+    """
+    Store an upload and create its import job; claim_import and run_import start it.
+    
+    ``chunks`` yields the file's bytes piece by piece, so an upload of any
+    size is copied to disk without being held in memory. Raises ValueError
+    when it is larger than ``max_bytes``.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError('Format must be ndjson or csv')
+    job = ImportJob(project_id=project_id, user_id=user_id, format=fmt, filename=filename, status='pending')
+    db.session.add(job)
+    db.session.flush()
+    
+    path = import_path(job)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    size = 0
+    try:
+        with open(path, 'wb') as output:
+            for chunk in chunks:
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise ValueError(f'Imports are limited to {max_bytes} bytes')
+                output.write(chunk)
+    except BaseException:
+        db.session.rollback()
+        os.remove(path)
+        raise
+    
+    job.size = size
+    db.session.commit()
+    return job
+
+def claim_import(job_id):
+    """
+    Mark a job running so that exactly one worker runs it.
+    
+    Pending and failed jobs can be claimed, and so can running jobs that made
+    no progress for IMPORT_STALE_SECONDS, whose worker presumably died.
+    Returns whether this caller got the job.
+    """
+    stalled_before = datetime.utcnow() - timedelta(seconds=current_app.config['IMPORT_STALE_SECONDS'])
+    result = db.session.execute(
+        db.update(ImportJob).where(
+            ImportJob.id == job_id,
+            db.or_(
+                ImportJob.status.in_(('pending', 'failed')),
+                db.and_(ImportJob.status == 'running', ImportJob.updated_at < stalled_before)
+            )
+        ).values(status='running', message=None, updated_at=datetime.utcnow()),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+def run_import(job_id, progress=None):
+    """
+    Import a claimed job's rows from its stored upload, after the last committed batch.
+    
+    Rows are validated and inserted IMPORT_BATCH_SIZE at a time: one query
+    resolves the batch's assignees, one grouped query finds the end of each
+    status column so positions are handed out in memory, and the tasks go in
+    with a single executemany INSERT. Each batch commits together with the
+    job's progress. Rows that fail validation are counted and the first
+    IMPORT_MAX_ERRORS are kept on the job. ``progress`` is called with the
+    job after every batch.
+    
+    Returns the finished job. A failure marks the job failed and is raised.
+    """
+    job = db.session.get(ImportJob, job_id)
+    batch_size = current_app.config['IMPORT_BATCH_SIZE']
+    try:
+        if find_project(job.project_id) is None:
+            raise ValueError('Project not found')
+        with open(import_path(job), 'rb') as source:
+            rows = _read_rows(source, job.format, job.bytes_read)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                _import_batch(job, batch)
+                if progress is not None:
+                    progress(job)
+    except Exception as error:
+        db.session.rollback()
+        job = db.session.get(ImportJob, job_id)
+        job.status = 'failed'
+        job.message = str(error) or error.__class__.__name__
+        db.session.commit()
+        raise
+    
+    job.status = 'completed'
+    job.finished_at = datetime.utcnow()
+    log_activity(job.project_id, 'tasks.imported', user_id=job.user_id, data={
+        'job_id': job.id,
+        'imported': job.rows_imported,
+        'failed': job.rows_failed
+    })
+    db.session.commit()
+    os.remove(import_path(job))
+    return job
+
+def _read_rows(source, fmt, offset):
+    """
+    Yield (row, offset after the row) for the rows of an upload from ``offset`` on.
+    
+    The file is read a line at a time; CSV rows become dicts keyed by the
+    lower-cased header. Lines that cannot be parsed are yielded as an error
+    message instead of a dict.
+    """
+    position = 0
+    
+    def lines():
+        nonlocal position
+        for line in source:
+            first = position == 0
+            position += len(line)
+            text = line.decode('utf-8')
+            yield text.lstrip('\ufeff') if first else text
+    
+    if fmt == 'csv':
+        reader = csv.reader(lines())
+        header = [name.strip().lower() for name in next(reader, [])]
+        if offset > position:
+            source.seek(offset)
+            position = offset
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield dict(zip(header, values)), position
+        return
+    
+    if offset:
+        source.seek(offset)
+        position = offset
+    for line in lines():
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield 'Invalid JSON', position
+            continue
+        yield (row if isinstance(row, dict) else 'Each line must be a JSON object'), position
+
+def _import_batch(job, batch):
+    config = current_app.config
+    users = _resolve_assignees([row for row, _ in batch if isinstance(row, dict)])
+    
+    values, errors = [], []
+    for number, (row, _) in enumerate(batch, start=job.rows_read + 1):
+        try:
+            values.append(_task_values(row, users, job.project_id))
+        except ValueError as error:
+            errors.append({'row': number, 'error': str(error)})
+    
+    # Append each row to the end of its column
+    column_ends = get_column_ends({(job.project_id, task['status']) for task in values})
+    now = datetime.utcnow()
+    for task in values:
+        key = (job.project_id, task['status'])
+        column_ends[key] = column_ends.get(key, 0) + 1
+        task.update(position=column_ends[key], created_at=now, updated_at=now)
+    
+    task_ids = _insert_tasks(values)
+    apply_rollups(after=[task_snapshot(None, **task) for task in values])
+    refresh_task_items(task_ids)
+    record_changes([('task', task_id, job.project_id, 'upsert', None) for task_id in task_ids])
+    
+    job.bytes_read = batch[-1][1]
+    job.rows_read += len(batch)
+    job.rows_imported += len(task_ids)
+    job.rows_failed += len(errors)
+    kept = job.errors or []
+    if errors and len(kept) < config['IMPORT_MAX_ERRORS']:
+        job.errors = kept + errors[:config['IMPORT_MAX_ERRORS'] - len(kept)]
+    db.session.commit()
+    
+    if task_ids:
+        project_changed(job.project_id, 'tasks.imported', {'job_id': job.id, 'count': len(task_ids)})
+
+def _resolve_assignees(rows):
+    """Map the assignee emails and ids of a batch to user ids with one query"""
+    emails = {_text(row, 'assignee_email') for row in rows} - {None}
+    ids = set()
+    for row in rows:
+        try:
+            ids.add(int(_text(row, 'assignee_id') or 0))
+        except ValueError:
+            pass
+    ids.discard(0)
+    if not emails and not ids:
+        return {}
+    
+    users = {}
+    for user_id, email in db.session.query(User.id, User.email).filter(
+        db.or_(User.email.in_(emails), User.id.in_(ids))
+    ):
+        users[email] = user_id
+        users[user_id] = user_id
+    return users
+
+def _text(row, name):
+    value = row.get(name)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _task_values(row, users, project_id):
+    """The column values of a task created from an import row; ValueError if it is invalid"""
+    if isinstance(row, str):
+        raise ValueError(row)
+    
+    values = {
+        'project_id': project_id,
+        'title': _text(row, 'title'),
+        'description': _text(row, 'description') or '',
+        'status': _text(row, 'status') or 'not-started',
+        'priority': _text(row, 'priority') or 'medium',
+        'due_date': None,
+        'estimated_hours': None,
+        'actual_hours': 0,
+        'assignee_id': None
+    }
+    if not values['title']:
+        raise ValueError('Title is required')
+    for name, length in FIELD_LENGTHS.items():
+        if len(values[name]) > length:
+            raise ValueError(f'{name} is longer than {length} characters')
+    
+    due_date = _text(row, 'due_date')
+    if due_date:
+        try:
+            values['due_date'] = datetime.fromisoformat(due_date.replace('Z', '+00:00')).date()
+        except ValueError:
+            raise ValueError(f'Invalid due_date: {due_date}')
+    for name in ('estimated_hours', 'actual_hours'):
+        hours = _text(row, name)
+        if hours:
+            try:
+                values[name] = float(hours)
+            except ValueError:
+                raise ValueError(f'Invalid {name}: {hours}')
+    
+    email = _text(row, 'assignee_email')
+    assignee_id = _text(row, 'assignee_id')
+    if email:
+        if email not in users:
+            raise ValueError(f'Unknown assignee: {email}')
+        values['assignee_id'] = users[email]
+    elif assignee_id:
+        try:
+            values['assignee_id'] = users[int(assignee_id)]
+        except (KeyError, ValueError):
+            raise ValueError(f'Unknown assignee: {assignee_id}')
+    return values
+
+def _insert_tasks(rows):
+    """INSERT the rows with one executemany and return the new ids (in no particular order)"""
+    if not rows:
+        return []
+    if db.engine.dialect.insert_executemany_returning:
+        return db.session.execute(db.insert(Task).returning(Task.id), rows).scalars().all()
+    # Without RETURNING for executemany (MySQL) the ids come one INSERT at a time
+    return [db.session.execute(db.insert(Task).values(row)).inserted_primary_key[0] for row in rows]
@@ -0,0 +1,132 @@
+from datetime import date
+from flask import current_app
+from .. import db
+from ..models.project import Project
+from ..models.task import Task
+from ..models.user import project_members
+from ..models.work_item import WorkItem
+
+NO_DUE_DATE = date(9999, 12, 31)
+PRIORITY_RANKS = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+# Task columns that decide whether and where a task appears in an inbox
+INBOX_FIELDS = {'status', 'priority', 'due_date', 'assignee_id'}
+
+WORK_ITEM_COLUMNS = ['user_id', 'task_id', 'project_id', 'due_key', 'priority_rank']
+
+def _audience(*conditions):
+    """
+    SELECT the work item rows for the open tasks matching ``conditions``.
+    
+    A task reaches the project's members, its owner and its assignee; UNION
+    drops the duplicates when one user is several of those. Tasks of deleted
+    projects reach nobody.
+    """
+    priority_rank = db.case(PRIORITY_RANKS, value=Task.priority, else_=len(PRIORITY_RANKS))
+    due_key = db.func.coalesce(Task.due_date, NO_DUE_DATE)
+    live_project = db.aliased(Project)
+    conditions = conditions + (
+        db.func.coalesce(Task.status, 'not-started').notin_(current_app.config['TASK_DONE_STATUSES']),
+        db.exists().where(live_project.id == Task.project_id, live_project.deleted_at.is_(None)),
+    )
+    
+    def rows(user_id, *joins):
+        query = db.select(user_id, Task.id, Task.project_id, due_key, priority_rank).select_from(Task)
+        for target, onclause in joins:
+            query = query.join(target, onclause)
+        return query.where(user_id.isnot(None), *conditions)
+    
+    return db.union(
+        rows(project_members.c.user_id, (project_members, project_members.c.project_id == Task.project_id)),
+        rows(Project.owner_id, (Project, Project.id == Task.project_id)),
+        rows(Task.assignee_id)
+    )
+
+def _insert(select):
+    db.session.execute(db.insert(WorkItem).from_select(WORK_ITEM_COLUMNS, select))
+
+def refresh_task_items(task_ids):
+    """Recompute the inbox rows of tasks that were created or changed"""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    db.session.execute(
+        db.delete(WorkItem).where(WorkItem.task_id.in_(task_ids)),
+        execution_options={'synchronize_session': False}
+    )
+    _insert(_audience(Task.id.in_(task_ids)))
+
+def remove_task_items(task_ids):
+    """Drop the inbox rows of deleted tasks"""
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    db.session.execute(
+        db.delete(WorkItem).where(WorkItem.task_id.in_(task_ids)),
+        execution_options={'synchronize_session': False}
+    )
+
+def add_member_items(project_id, user_id):
+    """Add a new member's rows for the project's open tasks they do not already have"""
+    select = _audience(Task.project_id == project_id).subquery()
+    existing = db.select(WorkItem.task_id).where(
+        WorkItem.user_id == user_id, WorkItem.project_id == project_id
+    )
+    _insert(
+        db.select(*[select.c[i] for i in range(len(WORK_ITEM_COLUMNS))])
+        .where(select.c[0] == user_id, select.c[1].notin_(existing))
+    )
+
+def remove_member_items(project_id, user_id):
+    """Drop a removed member's rows for the project, keeping tasks assigned to them"""
+    assigned = db.select(Task.id).where(Task.project_id == project_id, Task.assignee_id == user_id)
+    db.session.execute(
+        db.delete(WorkItem).where(
+            WorkItem.project_id == project_id,
+            WorkItem.user_id == user_id,
+            WorkItem.task_id.notin_(assigned)
+        ),
+        execution_options={'synchronize_session': False}
+    )
+
+def add_project_items(project_id):
+    """Add the rows of every open task of a project, which has none yet (restored projects)"""
+    _insert(_audience(Task.project_id == project_id))
+
+def remove_project_items(project_id):
+    """Drop every inbox row of a project that is being deleted"""
+    db.session.execute(
+        db.delete(WorkItem).where(WorkItem.project_id == project_id),
+        execution_options={'synchronize_session': False}
+    )
+
+def rebuild_inbox(user_id=None):
+    """Recompute every inbox, or one user's, from the tasks and memberships"""
+    delete = db.delete(WorkItem)
+    select = _audience().subquery()
+    rows = db.select(*[select.c[i] for i in range(len(WORK_ITEM_COLUMNS))])
+    if user_id is not None:
+        delete = delete.where(WorkItem.user_id == user_id)
+        rows = rows.where(select.c[0] == user_id)
+    db.session.execute(delete, execution_options={'synchronize_session': False})
+    result = db.session.execute(db.insert(WorkItem).from_select(WORK_ITEM_COLUMNS, rows))
+    db.session.commit()
+    return result.rowcount
+
+def check_inbox():
+    """
+    Compare the inbox table with a fresh computation.
+    
+    Returns (missing, stale): expected rows absent from the table, and table
+    rows that should not be there or carry an outdated sort key.
+    """
+    expected = _audience().subquery()
+    expected_rows = db.select(*[expected.c[i] for i in range(len(WORK_ITEM_COLUMNS))])
+    actual_rows = db.select(*[getattr(WorkItem, column) for column in WORK_ITEM_COLUMNS])
+    missing = db.session.execute(
+        db.select(db.func.count()).select_from(db.except_(expected_rows, actual_rows).subquery())
+    ).scalar()
+    stale = db.session.execute(
+        db.select(db.func.count()).select_from(db.except_(actual_rows, expected_rows).subquery())
+    ).scalar()
+    return missing, stale
@@ -0,0 +1,283 @@
+import asyncio
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from flask import g, request, current_app, has_request_context
+from sqlalchemy import event
+from .. import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+class MetricsRegistry:
+    """
+    Counters and histograms rendered in the Prometheus text format.
+    
+    Values live in the worker process, so with several workers each one
+    reports its own series; scrape them individually or aggregate upstream.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+    
+    def describe(self, name, kind, text, buckets=None):
+        self._help[name] = (kind, text, buckets)
+    
+    def inc(self, name, labels, value=1):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+    
+    def observe(self, name, labels, value):
+        buckets = self._help[name][2]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            counts = series.get(key)
+            if counts is None:
+                # One count per bucket, then +Inf, sum and count
+                counts = series[key] = [0] * (len(buckets) + 1) + [0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[len(buckets)] += 1
+            counts[-2] += value
+            counts[-1] += 1
+    
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (kind, text, buckets) in self._help.items():
+                lines.append(f'# HELP {name} {text}')
+                lines.append(f'# TYPE {name} {kind}')
+                if kind == 'counter':
+                    for key, value in self._counters.get(name, {}).items():
+                        lines.append(f'{name}{_labels(key)} {value}')
+                    continue
+                for key, counts in self._histograms.get(name, {}).items():
+                    for bound, count in zip(buckets, counts):
+                        lines.append(f'{name}_bucket{_labels(key, le=bound)} {count}')
+                    lines.append(f'{name}_bucket{_labels(key, le="+Inf")} {counts[len(buckets)]}')
+                    lines.append(f'{name}_sum{_labels(key)} {counts[-2]}')
+                    lines.append(f'{name}_count{_labels(key)} {counts[-1]}')
+        return '\n'.join(lines) + '\n'
+
+def _labels(key, le=None):
+    pairs = list(key) + ([('le', le)] if le is not None else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in pairs
+    ) + '}'
+
+class SlowRequestProfiler:
+    """
+    Sample the stacks of threads serving requests; keep them for slow ones.
+    
+    A daemon thread reads sys._current_frames() every ``interval`` seconds
+    for the threads registered with begin(). When a request ends slower than
+    ``threshold_ms``, its samples are written in the folded format
+    ("frame;frame;frame count") read by flamegraph.pl and speedscope.
+    """
+    
+    def __init__(self, interval, threshold_ms, directory, logger):
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.directory = directory
+        self.logger = logger
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def begin(self):
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+            if self._thread is None:
+                # Started lazily so that forked workers each run their own
+                self._thread = threading.Thread(target=self._sample, name='request-profiler', daemon=True)
+                self._thread.start()
+    
+    def end(self, name, elapsed_ms):
+        with self._lock:
+            samples = self._active.pop(threading.get_ident(), None)
+        if not samples or elapsed_ms < self.threshold_ms:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        filename = '{}-{}-{}ms-{}.folded'.format(
+            time.strftime('%Y%m%d-%H%M%S'),
+            os.getpid(),
+            int(elapsed_ms),
+            re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_')
+        )
+        path = os.path.join(self.directory, filename)
+        with open(path, 'w') as output:
+            for stack, count in samples.items():
+                output.write(f'{stack} {count}\n')
+        self.logger.info('Slow request %s took %d ms; profile written to %s', name, elapsed_ms, path)
+    
+    def _sample(self):
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, samples in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None and ident != me:
+                        samples[_fold(frame)] += 1
+
+def _fold(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}")
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+def _in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+def init_instrumentation(app):
+    """Install the request hooks, engine events, /metrics and profiler the config enables"""
+    if not app.config['INSTRUMENTATION_ENABLED']:
+        return
+    
+    state = {'metrics': None, 'profiler': None}
+    app.extensions['instrumentation'] = state
+    
+    if app.config['METRICS_ENABLED']:
+        metrics = state['metrics'] = MetricsRegistry()
+        metrics.describe('http_request_duration_seconds', 'histogram',
+                         'Request latency by route', LATENCY_BUCKETS)
+        metrics.describe('http_request_db_duration_seconds', 'histogram',
+                         'Time spent in database statements per request', LATENCY_BUCKETS)
+        metrics.describe('http_request_queries', 'histogram',
+                         'Database statements per request', QUERY_COUNT_BUCKETS)
+        metrics.describe('http_request_duplicate_queries_total', 'counter',
+                         'Requests that repeated one statement DUPLICATE_QUERY_THRESHOLD times or more')
+        app.add_url_rule('/metrics', 'metrics', _metrics_view)
+    
+    if app.config['PROFILE_SLOW_REQUEST_MS'] > 0:
+        state['profiler'] = SlowRequestProfiler(
+            app.config['PROFILE_SAMPLE_INTERVAL'],
+            app.config['PROFILE_SLOW_REQUEST_MS'],
+            os.path.join(app.instance_path, app.config['PROFILE_DIR']),
+            app.logger
+        )
+    
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(app, engine)
+    
+    # Serialization time is the time jsonify spends encoding responses
+    provider = app.json
+    respond = provider.response
+    
+    def timed_response(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return respond(*args, **kwargs)
+        finally:
+            timings = _timings()
+            if timings is not None:
+                timings['serialize'] += time.perf_counter() - start
+    
+    provider.response = timed_response
+    app.before_request(_begin_request)
+    app.after_request(_end_request)
+
+def instrument_engine(app, engine):
+    """Time and count the statements an engine runs on behalf of requests"""
+    if 'instrumentation' not in app.extensions:
+        return
+    
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault('instrumentation_start', []).append(time.perf_counter())
+    
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - connection.info['instrumentation_start'].pop()
+        timings = _timings()
+        if timings is not None:
+            timings['db'] += elapsed
+            timings['queries'][statement] += 1
+
+def _timings():
+    if not has_request_context():
+        return None
+    return g.get('_instrumentation')
+
+def _begin_request():
+    g._instrumentation = {
+        'start': time.perf_counter(),
+        'db': 0.0,
+        'serialize': 0.0,
+        'queries': Counter(),
+        'profiled': False
+    }
+    profiler = current_app.extensions['instrumentation']['profiler']
+    # Coroutines share the event loop's thread, so only threaded requests are sampled
+    if profiler is not None and not _in_event_loop():
+        profiler.begin()
+        g._instrumentation['profiled'] = True
+
+def _end_request(response):
+    timings = _timings()
+    if timings is None:
+        return response
+    state = current_app.extensions['instrumentation']
+    total = time.perf_counter() - timings['start']
+    queries = timings['queries']
+    query_count = sum(queries.values())
+    handler = max(total - timings['db'] - timings['serialize'], 0.0)
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    name = f'{request.method} {route}'
+    
+    response.headers['Server-Timing'] = (
+        f'db;dur={timings["db"] * 1000:.1f};desc="{query_count} queries", '
+        f'serialize;dur={timings["serialize"] * 1000:.1f}, '
+        f'handler;dur={handler * 1000:.1f}, '
+        f'total;dur={total * 1000:.1f}'
+    )
+    
+    threshold = current_app.config['DUPLICATE_QUERY_THRESHOLD']
+    duplicates = [(statement, count) for statement, count in queries.items() if count >= threshold]
+    for statement, count in duplicates:
+        current_app.logger.warning(
+            'Possible N+1: %s ran the same statement %d times: %s',
+            name, count, ' '.join(statement.split())[:500]
+        )
+    
+    metrics = state['metrics']
+    if metrics is not None and route != '/metrics':
+        labels = {'method': request.method, 'route': route}
+        metrics.observe('http_request_duration_seconds', {**labels, 'status': response.status_code}, total)
+        metrics.observe('http_request_db_duration_seconds', labels, timings['db'])
+        metrics.observe('http_request_queries', labels, query_count)
+        if duplicates:
+            metrics.inc('http_request_duplicate_queries_total', labels)
+    
+    if timings['profiled']:
+        state['profiler'].end(name, total * 1000)
+    return response
+
+def _metrics_view():
+    token = current_app.config['METRICS_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return {'error': 'Unauthorized'}, 401
+    metrics = current_app.extensions['instrumentation']['metrics']
+    return current_app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
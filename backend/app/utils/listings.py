@@ -0,0 +1,112 @@
+from flask import request
+from sqlalchemy.orm import load_only, undefer_group
+from .. import db
+from ..models.project import Project
+from ..models.task import Task
+from ..models.user import project_members
+from .access import accessible_project_ids_query
+from .helpers import parse_fields, parse_list_arg, parse_date_arg, InvalidArgument
+from .pagination import paginate
+from .serializers import TaskRowSerializer
+
+TASK_FIELDS = (
+    'title', 'description', 'status', 'priority', 'due_date', 'estimated_hours',
+    'actual_hours', 'position', 'project_id', 'assignee_id', 'assignee',
+    'created_at', 'updated_at'
+)
+
+def accessible_tasks_query(user_id):
+    """Query for every task the user is assigned to or can see via a project"""
+    deleted_project_ids = db.select(Project.id).where(Project.deleted_at.isnot(None))
+    return Task.query.filter(
+        db.or_(
+            db.and_(Task.assignee_id == user_id, Task.project_id.notin_(deleted_project_ids)),
+            Task.project_id.in_(accessible_project_ids_query(user_id))
+        )
+    )
+
+def filter_tasks(query):
+    """Apply the status, priority, assignee and due date filters from the query string"""
+    statuses = parse_list_arg('status')
+    if statuses:
+        query = query.filter(Task.status.in_(statuses))
+    
+    priorities = parse_list_arg('priority')
+    if priorities:
+        query = query.filter(Task.priority.in_(priorities))
+    
+    assignee_id = request.args.get('assignee_id')
+    if assignee_id == 'none':
+        query = query.filter(Task.assignee_id.is_(None))
+    elif assignee_id:
+        try:
+            query = query.filter(Task.assignee_id == int(assignee_id))
+        except ValueError:
+            raise InvalidArgument('Invalid assignee_id')
+    
+    due_from = parse_date_arg('due_from')
+    if due_from:
+        query = query.filter(Task.due_date >= due_from)
+    due_to = parse_date_arg('due_to')
+    if due_to:
+        query = query.filter(Task.due_date <= due_to)
+    
+    return query
+
+def task_serializer(sort_columns):
+    """Row serializer for the requested fields and assignee format"""
+    return TaskRowSerializer(
+        parse_fields(TASK_FIELDS),
+        users_map=request.args.get('assignees') == 'map',
+        sort_columns=sort_columns
+    )
+
+def task_listing(query, key, sort_columns, descending=False):
+    """Paginate and serialize a task query from column rows rather than ORM objects"""
+    serializer = task_serializer(sort_columns)
+    rows, next_cursor = paginate(serializer.select(query), key, sort_columns, descending)
+    return task_page(serializer, rows, next_cursor)
+
+def task_page(serializer, rows, next_cursor):
+    """Response body for a page of task rows"""
+    tasks, users = serializer.serialize(rows)
+    
+    data = {'tasks': tasks, 'next_cursor': next_cursor}
+    if serializer.users_map:
+        data['users'] = users
+    return data
+
+PROJECT_FIELDS = (
+    'name', 'description', 'status', 'priority', 'progress', 'start_date',
+    'due_date', 'owner_id', 'created_at', 'updated_at', 'team', 'tasks_count'
+)
+
+# Fields whose values come from a differently named attribute
+PROJECT_FIELD_ATTRIBUTES = {'team': 'members_count'}
+
+PROJECT_SORT_COLUMNS = [Project.updated_at, Project.id]
+
+def projects_query(user_id, fields):
+    """Query for the user's projects with the listing's filters and column loading"""
+    # Get projects where user is owner or member
+    member_project_ids = db.session.query(project_members.c.project_id).filter(
+        project_members.c.user_id == user_id
+    )
+    query = Project.query.filter(
+        db.or_(Project.owner_id == user_id, Project.id.in_(member_project_ids)),
+        Project.deleted_at.is_(None)
+    )
+    
+    statuses = parse_list_arg('status')
+    if statuses:
+        query = query.filter(Project.status.in_(statuses))
+    priorities = parse_list_arg('priority')
+    if priorities:
+        query = query.filter(Project.priority.in_(priorities))
+    
+    if fields is None:
+        query = query.options(undefer_group('counts'))
+    else:
+        columns = [getattr(Project, PROJECT_FIELD_ATTRIBUTES.get(field, field)) for field in fields]
+        query = query.options(load_only(*columns, *PROJECT_SORT_COLUMNS))
+    return query
@@ -0,0 +1,198 @@
+import importlib
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from .. import db
+from ..models.notification import Notification
+from ..models.project import Project
+from ..models.task import Task
+
+class MemorySink:
+    """Keeps delivered notifications in a list (tests and development)"""
+    
+    def __init__(self):
+        self.sent = []
+    
+    def send(self, notifications):
+        self.sent.extend(notifications)
+
+class FileSink:
+    """Appends one JSON line per notification to a file, for another process to ship"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def send(self, notifications):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._lock, open(self.path, 'a') as output:
+            for notification in notifications:
+                output.write(json.dumps(notification) + '\n')
+            output.flush()
+            os.fsync(output.fileno())
+
+def init_notifications(app):
+    """
+    Create the delivery backend selected by NOTIFICATION_BACKEND.
+    
+    Besides 'file', 'memory' and 'none', the setting may name any class as
+    'package.module:ClassName'; it is constructed with the app and must have
+    a send(notifications) method taking a list of dicts.
+    """
+    backend = app.config['NOTIFICATION_BACKEND']
+    if backend == 'file':
+        sink = FileSink(os.path.join(app.instance_path, app.config['NOTIFICATION_FILE']))
+    elif backend == 'memory':
+        sink = MemorySink()
+    elif backend == 'none':
+        sink = None
+    elif ':' in backend:
+        module, name = backend.split(':', 1)
+        sink = getattr(importlib.import_module(module), name)(app)
+    else:
+        raise ValueError(f'Unknown NOTIFICATION_BACKEND: {backend}')
+    app.extensions['notification_sink'] = sink
+    return sink
+
+def get_sink():
+    return current_app.extensions.get('notification_sink')
+
+def scan_due_dates(today=None):
+    """
+    Create the due-soon and overdue notifications for tasks and projects.
+    
+    Walks the due dates from REMINDER_OVERDUE_DAYS ago to
+    REMINDER_DUE_SOON_DAYS ahead one day at a time, each day as a range scan
+    on the (due_date, id) indexes read in REMINDER_BATCH_SIZE chunks. Every
+    chunk commits on its own, so no transaction stays open for the whole
+    scan and an interrupted scan simply resumes on the next run. Returns the
+    number of notifications created.
+    """
+    today = today or date.today()
+    created = 0
+    for offset in range(-current_app.config['REMINDER_OVERDUE_DAYS'],
+                        current_app.config['REMINDER_DUE_SOON_DAYS'] + 1):
+        day = today + timedelta(days=offset)
+        kind = 'overdue' if day < today else 'due_soon'
+        created += _scan_day(_due_tasks, 'task', day, kind)
+        created += _scan_day(_due_projects, 'project', day, kind)
+    return created
+
+def _due_tasks(day, after_id, limit):
+    """Open tasks due on ``day``, to the assignee or else the project owner"""
+    return db.session.query(
+        Task.id,
+        Task.project_id,
+        Task.title,
+        db.func.coalesce(Task.assignee_id, Project.owner_id).label('user_id')
+    ).join(Project, Project.id == Task.project_id).filter(
+        Task.due_date == day,
+        Task.id > after_id,
+        Project.deleted_at.is_(None),
+        db.func.coalesce(Task.status, 'not-started').notin_(current_app.config['TASK_DONE_STATUSES'])
+    ).order_by(Task.id).limit(limit).all()
+
+def _due_projects(day, after_id, limit):
+    """Unfinished projects due on ``day``, to the owner"""
+    return db.session.query(
+        Project.id,
+        Project.id.label('project_id'),
+        Project.name.label('title'),
+        Project.owner_id.label('user_id')
+    ).filter(
+        Project.due_date == day,
+        Project.id > after_id,
+        Project.deleted_at.is_(None),
+        db.func.coalesce(Project.status, 'planning') != 'completed'
+    ).order_by(Project.id).limit(limit).all()
+
+def _scan_day(query, entity, day, kind):
+    batch_size = current_app.config['REMINDER_BATCH_SIZE']
+    created = 0
+    after_id = 0
+    while True:
+        rows = query(day, after_id, batch_size)
+        if not rows:
+            break
+        after_id = rows[-1].id
+        created += _create_notifications(entity, day, kind, [row for row in rows if row.user_id is not None])
+        db.session.commit()
+        if len(rows) < batch_size:
+            break
+    return created
+
+def _create_notifications(entity, day, kind, rows):
+    """Insert the notifications of one chunk that do not exist yet"""
+    if not rows:
+        return 0
+    existing = {
+        (entity_id, user_id) for entity_id, user_id in db.session.query(
+            Notification.entity_id, Notification.user_id
+        ).filter(
+            Notification.entity == entity,
+            Notification.entity_id.in_([row.id for row in rows]),
+            Notification.kind == kind,
+            Notification.due_date == day
+        )
+    }
+    now = datetime.utcnow()
+    values = [
+        {
+            'user_id': row.user_id,
+            'project_id': row.project_id,
+            'entity': entity,
+            'entity_id': row.id,
+            'kind': kind,
+            'due_date': day,
+            'title': row.title,
+            'created_at': now
+        }
+        for row in rows if (row.id, row.user_id) not in existing
+    ]
+    if not values:
+        return 0
+    try:
+        with db.session.begin_nested():
+            db.session.execute(db.insert(Notification), values)
+        return len(values)
+    except IntegrityError:
+        # A concurrent scan got there first; keep whichever rows are still new
+        created = 0
+        for value in values:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(db.insert(Notification), [value])
+                created += 1
+            except IntegrityError:
+                pass
+        return created
+
+def deliver_notifications():
+    """
+    Hand undelivered notifications to the delivery backend, oldest first.
+    
+    Each chunk is marked delivered only after the backend accepted it, so a
+    failure means the chunk is sent again on the next run (at-least-once).
+    Returns the number delivered.
+    """
+    sink = get_sink()
+    if sink is None:
+        return 0
+    batch_size = current_app.config['REMINDER_BATCH_SIZE']
+    delivered = 0
+    while True:
+        notifications = Notification.query.filter(
+            Notification.delivered_at.is_(None)
+        ).order_by(Notification.id).limit(batch_size).all()
+        if not notifications:
+            break
+        sink.send([notification.to_dict() for notification in notifications])
+        Notification.query.filter(
+            Notification.id.in_([notification.id for notification in notifications])
+        ).update({'delivered_at': datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+        delivered += len(notifications)
+    return delivered
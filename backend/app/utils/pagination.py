@@ -0,0 +1,101 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import request, current_app
+from .. import db
+from .helpers import InvalidArgument
+
+def encode_cursor(key, values):
+    """Encode the sort key name and last-row values as an opaque cursor"""
+    payload = {'k': key, 'v': [_encode_value(value) for value in values]}
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, key):
+    """Decode a cursor produced by encode_cursor for the given sort key"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload['k'] != key:
+            raise InvalidArgument('Cursor does not match this listing')
+        return [_decode_value(value) for value in payload['v']]
+    except InvalidArgument:
+        raise
+    except (ValueError, KeyError, TypeError):
+        raise InvalidArgument('Invalid cursor')
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+        raise ValueError('Unknown cursor value')
+    return value
+
+def get_page_size():
+    """Read the ``limit`` query argument, bounded by the configured maximum"""
+    default = current_app.config['PAGE_SIZE_DEFAULT']
+    maximum = current_app.config['PAGE_SIZE_MAX']
+    
+    limit = request.args.get('limit', default)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise InvalidArgument('Limit must be an integer')
+    if limit < 1:
+        raise InvalidArgument('Limit must be positive')
+    return min(limit, maximum)
+
+def paginate(query, key, columns, descending=False):
+    """
+    Apply keyset pagination to a query.
+    
+    ``columns`` is the ordered sort key and must end in a unique column
+    (normally the primary key). Rows after the ``cursor`` query argument are
+    selected with a seek predicate rather than an OFFSET, so every page costs
+    the same index range scan. Returns the page of rows and the cursor for the
+    next page, or None when this is the last page.
+    """
+    query, limit = seek(query, key, columns, descending)
+    return page(query.all(), key, columns, limit)
+
+def seek(query, key, columns, descending=False):
+    """Filter, order and limit a query for the requested page without running it"""
+    limit = get_page_size()
+    cursor = request.args.get('cursor')
+    
+    if cursor:
+        values = decode_cursor(cursor, key)
+        if len(values) != len(columns):
+            raise InvalidArgument('Invalid cursor')
+        query = query.filter(_seek_predicate(columns, values, descending))
+    
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order).limit(limit + 1), limit
+
+def page(rows, key, columns, limit):
+    """Trim the rows fetched by a ``seek`` query and build the next cursor"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(key, [getattr(last, column.key) for column in columns])
+    
+    return rows, next_cursor
+
+def _seek_predicate(columns, values, descending):
+    """Build (a > x) OR (a = x AND b > y) ... for the sort key"""
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(db.and_(*equal, beyond))
+    return db.or_(*clauses)
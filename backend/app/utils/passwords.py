@@ -0,0 +1,72 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from flask import current_app
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing queue is full; rendered as a 503"""
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+def _check(password, password_hash):
+    return bcrypt.checkpw(password, password_hash)
+
+def _get_pool(app):
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            workers = app.config['PASSWORD_HASH_WORKERS']
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            # Jobs running plus jobs allowed to wait for a worker
+            _slots = threading.BoundedSemaphore(workers + app.config['PASSWORD_HASH_QUEUE_SIZE'])
+        return _executor, _slots
+
+def _run(fn, *args):
+    """
+    Run a bcrypt call on the process pool so it does not hold the GIL or the
+    request worker's CPU. When every worker is busy and the queue is full the
+    call waits up to PASSWORD_HASH_QUEUE_TIMEOUT and then fails fast with
+    PasswordHasherBusy instead of piling up more work.
+    """
+    app = current_app._get_current_object()
+    if app.config['PASSWORD_HASH_EXECUTOR'] == 'inline':
+        return fn(*args)
+    
+    executor, slots = _get_pool(app)
+    if not slots.acquire(timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT']):
+        raise PasswordHasherBusy('Password hashing is overloaded, retry shortly')
+    try:
+        return executor.submit(fn, *args).result()
+    finally:
+        slots.release()
+
+def hash_password(password):
+    """Hash a password with the configured bcrypt cost"""
+    rounds = current_app.config['BCRYPT_ROUNDS']
+    return _run(_hash, password.encode('utf-8'), rounds).decode('utf-8')
+
+def check_password(password, password_hash):
+    """Check a password against a bcrypt hash"""
+    return _run(_check, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+def needs_rehash(password_hash):
+    """Whether a hash was made with a different cost than BCRYPT_ROUNDS"""
+    try:
+        rounds = int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != current_app.config['BCRYPT_ROUNDS']
+
+def shutdown():
+    """Stop the hashing pool, e.g. before a worker forks or exits"""
+    global _executor, _slots
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _slots = None
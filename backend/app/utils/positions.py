@@ -0,0 +1,132 @@
+import threading
+from flask import current_app
+from .. import db
+from ..models.task import Task
+from .background import submit
+from .events import project_changed
+from .changes import record_changes
+
+# Columns with a rebalance queued or running, keyed by (project_id, status)
+_pending_rebalances = set()
+_pending_lock = threading.Lock()
+
+def key_between(before, after):
+    """Return a sort key strictly between two neighbouring keys (either may be None)"""
+    if before is None and after is None:
+        return 1.0
+    if before is None:
+        return after - 1.0
+    if after is None:
+        return before + 1.0
+    return (before + after) / 2
+
+def position_for_rank(project_id, status, rank, exclude_id=None):
+    """
+    Compute the sort key that places a task at ``rank`` (1-based) in a column.
+    
+    Only the two neighbours around the target slot are read, and only the
+    moved task is written. Returns the key, whether the column has become
+    too dense and should be rebalanced once the change is committed, and
+    whether it was already renumbered in the current transaction (the caller
+    then publishes 'tasks.rebalanced' after committing).
+    """
+    rank = max(int(rank), 1)
+    query = db.session.query(Task.position).filter(
+        Task.project_id == project_id,
+        Task.status == status
+    )
+    if exclude_id is not None:
+        query = query.filter(Task.id != exclude_id)
+    
+    offset = max(rank - 2, 0)
+    neighbours = [
+        row.position for row in
+        query.order_by(Task.position, Task.id).offset(offset).limit(2)
+    ]
+    
+    if rank == 1:
+        before, after = None, neighbours[0] if neighbours else None
+    else:
+        before = neighbours[0] if neighbours else None
+        after = neighbours[1] if len(neighbours) > 1 else None
+        if before is None:
+            # Rank is past the end of the column: append after the last task
+            before = query.with_entities(db.func.max(Task.position)).scalar()
+    
+    position = key_between(before, after)
+    gap = current_app.config['POSITION_MIN_GAP']
+    if before is not None and after is not None and not (before < position < after):
+        # Float precision is exhausted between these neighbours: rebalance
+        # the column now and retry against the renumbered keys
+        rebalance_column(project_id, status, commit=False)
+        position, needs_rebalance, _ = position_for_rank(project_id, status, rank, exclude_id)
+        return position, needs_rebalance, True
+    
+    needs_rebalance = (
+        (before is not None and position - before < gap) or
+        (after is not None and after - position < gap)
+    )
+    return position, needs_rebalance, False
+
+def get_column_ends(columns):
+    """Return the current max position for each (project_id, status) column"""
+    if not columns:
+        return {}
+    project_ids = {project_id for project_id, _ in columns}
+    statuses = {status for _, status in columns}
+    rows = db.session.query(
+        Task.project_id, Task.status, db.func.max(Task.position)
+    ).filter(
+        Task.project_id.in_(project_ids),
+        Task.status.in_(statuses)
+    ).group_by(Task.project_id, Task.status)
+    return {(project_id, status): position or 0 for project_id, status, position in rows}
+
+def schedule_rebalance(project_id, status):
+    """Queue a background renumbering of a column, once per column at a time"""
+    key = (project_id, status)
+    with _pending_lock:
+        if key in _pending_rebalances:
+            return
+        _pending_rebalances.add(key)
+    submit(_run_rebalance, project_id, status)
+
+def _run_rebalance(project_id, status):
+    try:
+        rebalance_column(project_id, status)
+    finally:
+        with _pending_lock:
+            _pending_rebalances.discard((project_id, status))
+
+def rebalance_column(project_id, status, commit=True):
+    """
+    Renumber a column's sort keys to 1.0, 2.0, ... keeping the current order.
+    
+    Returns the number of tasks renumbered. With ``commit=False`` nothing is
+    published: the caller commits and announces 'tasks.rebalanced'.
+    """
+    rows = db.session.query(Task.id).filter(
+        Task.project_id == project_id,
+        Task.status == status
+    ).order_by(Task.position, Task.id).with_for_update().all()
+    
+    chunk_size = current_app.config['POSITION_REBALANCE_CHUNK']
+    for start in range(0, len(rows), chunk_size):
+        params = [
+            {'id': row.id, 'position': float(start + i + 1)}
+            for i, row in enumerate(rows[start:start + chunk_size])
+        ]
+        db.session.execute(db.update(Task), params)
+    record_changes([('task', row.id, project_id, 'upsert', None) for row in rows])
+    
+    if commit:
+        db.session.commit()
+        project_changed(project_id, 'tasks.rebalanced', {'status': status})
+    return len(rows)
+
+def rebalance_all():
+    """Renumber every column; used by the CLI and after migrating old positions"""
+    columns = db.session.query(Task.project_id, Task.status).distinct().all()
+    for project_id, status in columns:
+        rebalance_column(project_id, status)
+    return len(columns)
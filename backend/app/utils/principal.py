@@ -0,0 +1,27 @@
+from flask import current_app
+from .. import db
+from .cache import LRUCache
+
+# user_id -> serialized user, shared by the requests of this process
+_users = LRUCache(max_entries=10000)
+
+def user_claims(user):
+    """Claims carried in access tokens so routes can authorize without a lookup"""
+    return {'role': user.role, 'status': user.status}
+
+def get_user_dict(user_id):
+    """Return a user's serialized profile, from the principal cache when possible"""
+    from ..models.user import User
+    
+    data = _users.get(user_id)
+    if data is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        data = user.to_dict()
+        _users.set(user_id, data, current_app.config['PRINCIPAL_CACHE_TTL'])
+    return data
+
+def invalidate_user(user_id):
+    """Drop a cached profile after the user changes"""
+    _users.delete(user_id)
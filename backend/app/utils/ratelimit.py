@@ -0,0 +1,50 @@
+import threading
+import time
+
+class RateLimitExceeded(Exception):
+    """Raised when a caller exceeds a rate limit; rendered as a 429"""
+    
+    def __init__(self, retry_after):
+        super().__init__('Too many attempts, try again later')
+        self.retry_after = retry_after
+
+class RateLimiter:
+    """
+    Fixed-window counters kept in process memory.
+    
+    Each worker counts separately, so the effective limit across a deployment
+    is roughly the configured limit times the number of workers.
+    """
+    
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._windows = {}
+        self._lock = threading.Lock()
+    
+    def hit(self, key, limit, period):
+        """Count an attempt for ``key``; raise RateLimitExceeded past ``limit`` per ``period`` seconds"""
+        if limit <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            started, count = self._windows.get(key, (now, 0))
+            if now - started >= period:
+                started, count = now, 0
+            if count >= limit:
+                raise RateLimitExceeded(int(period - (now - started)) + 1)
+            if len(self._windows) >= self.max_keys:
+                self._prune(now, period)
+            self._windows[key] = (started, count + 1)
+    
+    def reset(self, key):
+        with self._lock:
+            self._windows.pop(key, None)
+    
+    def _prune(self, now, period):
+        expired = [key for key, (started, _) in self._windows.items() if now - started >= period]
+        for key in expired:
+            del self._windows[key]
+        if len(self._windows) >= self.max_keys:
+            self._windows.clear()
+
+login_limiter = RateLimiter()
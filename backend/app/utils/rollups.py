@@ -0,0 +1,165 @@
+from datetime import date
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from .. import db
+from ..models.rollup import TaskRollup
+from ..models.task import Task
+
+UNASSIGNED = 0
+
+def task_snapshot(task, **changes):
+    """
+    The values of a task that feed the rollups, taken before and after a write.
+    
+    ``task`` may be a Task or a row with the same columns; ``changes`` override
+    its values, for writes that never load the task as an object.
+    """
+    def value(column):
+        return changes[column] if column in changes else getattr(task, column)
+    
+    return (
+        value('project_id'),
+        value('assignee_id') or UNASSIGNED,
+        value('status') or 'not-started',
+        value('estimated_hours') or 0,
+        value('actual_hours') or 0
+    )
+
+def apply_rollups(before=(), after=()):
+    """
+    Move tasks between rollup rows inside the current transaction.
+    
+    ``before`` holds snapshots of the tasks as they were (removed from their
+    rows) and ``after`` as they are now (added to theirs); a create has no
+    before, a delete no after. Deltas are summed per row first so a bulk
+    write touches each (project, assignee, status) row once. Each row is
+    adjusted with an atomic ``SET x = x + delta`` so concurrent writers
+    never lose increments.
+    """
+    deltas = {}
+    for sign, snapshots in ((-1, before), (1, after)):
+        for project_id, assignee_id, status, estimated, actual in snapshots:
+            delta = deltas.setdefault((project_id, assignee_id, status), [0, 0.0, 0.0])
+            delta[0] += sign
+            delta[1] += sign * estimated
+            delta[2] += sign * actual
+    
+    for (project_id, assignee_id, status), (count, estimated, actual) in deltas.items():
+        if not (count or estimated or actual):
+            continue
+        key = {'project_id': project_id, 'assignee_id': assignee_id, 'status': status}
+        if _increment(key, count, estimated, actual):
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(TaskRollup).values(
+                    task_count=count, estimated_hours=estimated, actual_hours=actual, **key
+                ))
+        except IntegrityError:
+            # Another transaction created the row first
+            _increment(key, count, estimated, actual)
+
+def _increment(key, count, estimated, actual):
+    result = db.session.execute(
+        db.update(TaskRollup)
+        .where(*(getattr(TaskRollup, column) == value for column, value in key.items()))
+        .values(
+            task_count=TaskRollup.task_count + count,
+            estimated_hours=TaskRollup.estimated_hours + estimated,
+            actual_hours=TaskRollup.actual_hours + actual
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+def delete_project_rollups(project_id):
+    """Drop the rollup rows of a project that is being deleted"""
+    db.session.execute(
+        db.delete(TaskRollup).where(TaskRollup.project_id == project_id),
+        execution_options={'synchronize_session': False}
+    )
+
+def rebuild_rollups(project_id=None):
+    """Recompute the rollups from the tasks table with one INSERT ... SELECT"""
+    delete = db.delete(TaskRollup)
+    tasks = db.select(
+        Task.project_id,
+        db.func.coalesce(Task.assignee_id, UNASSIGNED),
+        db.func.coalesce(Task.status, 'not-started'),
+        db.func.count(Task.id),
+        db.func.coalesce(db.func.sum(Task.estimated_hours), 0),
+        db.func.coalesce(db.func.sum(Task.actual_hours), 0)
+    ).group_by(
+        Task.project_id,
+        db.func.coalesce(Task.assignee_id, UNASSIGNED),
+        db.func.coalesce(Task.status, 'not-started')
+    )
+    if project_id is not None:
+        delete = delete.where(TaskRollup.project_id == project_id)
+        tasks = tasks.where(Task.project_id == project_id)
+    
+    db.session.execute(delete, execution_options={'synchronize_session': False})
+    result = db.session.execute(db.insert(TaskRollup).from_select(
+        ['project_id', 'assignee_id', 'status', 'task_count', 'estimated_hours', 'actual_hours'],
+        tasks
+    ))
+    db.session.commit()
+    return result.rowcount
+
+def _totals(rows, done_statuses):
+    by_status = {}
+    for row in rows:
+        if row.task_count:
+            # The project totals span every assignee's row for a status
+            by_status[row.status] = by_status.get(row.status, 0) + row.task_count
+    tasks_count = sum(by_status.values())
+    done = sum(count for status, count in by_status.items() if status in done_statuses)
+    return {
+        'tasks_count': tasks_count,
+        'by_status': by_status,
+        'estimated_hours': round(sum(row.estimated_hours for row in rows), 2),
+        'actual_hours': round(sum(row.actual_hours for row in rows), 2),
+        'progress': round(100 * done / tasks_count) if tasks_count else 0
+    }
+
+def project_stats(project_id):
+    """
+    Project and per-assignee rollups with derived progress.
+    
+    Overdue counts depend on today's date rather than on writes, so they are
+    counted live; the query is a range scan on (project_id, due_date).
+    """
+    done_statuses = current_app.config['TASK_DONE_STATUSES']
+    rows = TaskRollup.query.filter_by(project_id=project_id).all()
+    overdue = dict(
+        db.session.query(
+            db.func.coalesce(Task.assignee_id, UNASSIGNED),
+            db.func.count(Task.id)
+        ).filter(
+            Task.project_id == project_id,
+            Task.due_date < date.today(),
+            db.func.coalesce(Task.status, 'not-started').notin_(done_statuses)
+        ).group_by(db.func.coalesce(Task.assignee_id, UNASSIGNED)).all()
+    )
+    
+    by_assignee = {}
+    for row in rows:
+        by_assignee.setdefault(row.assignee_id, []).append(row)
+    
+    assignees = []
+    for assignee_id, assignee_rows in sorted(by_assignee.items()):
+        totals = _totals(assignee_rows, done_statuses)
+        if not totals['tasks_count']:
+            continue
+        assignees.append({
+            'assignee_id': assignee_id or None,
+            **totals,
+            'overdue': overdue.get(assignee_id, 0)
+        })
+    
+    return {
+        'project_id': project_id,
+        **_totals(rows, done_statuses),
+        'overdue': sum(overdue.values()),
+        'assignees': assignees
+    }
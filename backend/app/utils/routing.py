@@ -0,0 +1,226 @@
+import itertools
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.sql.dml import UpdateBase
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_listening = False
+
+# Replication lag in seconds, by database backend
+LAG_QUERIES = {
+    'postgresql': 'SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())',
+    'mysql': 'SHOW REPLICA STATUS',
+}
+
+class RoutingSession(Session):
+    """
+    Session that sends the reads of read-only requests to a replica.
+    
+    The replica is chosen per request (see ``_choose_route``). Flushes and
+    Core INSERT/UPDATE/DELETE statements always go to the primary, and so
+    does everything after the request's first write, so a request reads
+    what it wrote.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase) and has_request_context():
+            replica = g.get('_db_replica')
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+class Replica:
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.down_until = 0.0
+        self.checked_at = 0.0
+
+class ReplicaPool:
+    """
+    The configured replicas, their health and round-robin selection.
+    
+    A replica is probed (SELECT 1, plus its replication lag where the
+    backend reports it) at most every ``health_interval`` seconds when it is
+    about to be used. One that fails the probe, lags more than ``max_lag``
+    seconds or drops a connection is skipped for ``retry_seconds``. With no
+    healthy replica, reads fail over to the primary.
+    """
+    
+    def __init__(self, replicas, retry_seconds, health_interval, max_lag, logger):
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self.health_interval = health_interval
+        self.max_lag = max_lag
+        self.logger = logger
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        for replica in replicas:
+            event.listen(replica.engine, 'handle_error', self._error_handler(replica))
+    
+    def choose(self):
+        """Return the engine of a healthy replica, or None to use the primary"""
+        now = time.monotonic()
+        with self._lock:
+            start = next(self._next)
+        count = len(self.replicas)
+        for i in range(count):
+            replica = self.replicas[(start + i) % count]
+            if replica.down_until > now:
+                continue
+            if now - replica.checked_at >= self.health_interval and not self._probe(replica, now):
+                continue
+            return replica.engine
+        return None
+    
+    def mark_down(self, replica, reason):
+        now = time.monotonic()
+        if replica.down_until > now:
+            return
+        replica.down_until = now + self.retry_seconds
+        self.logger.warning('Replica %s is unavailable (%s); reading from the primary for %ss',
+                            replica.name, reason, self.retry_seconds)
+    
+    def _probe(self, replica, now):
+        replica.checked_at = now
+        try:
+            with replica.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+                lag = self._lag(connection)
+        except Exception as error:
+            self.mark_down(replica, error.__class__.__name__)
+            return False
+        if lag is not None and lag > self.max_lag:
+            self.mark_down(replica, f'{lag:.0f}s behind')
+            return False
+        return True
+    
+    def _lag(self, connection):
+        query = LAG_QUERIES.get(connection.dialect.name)
+        if query is None:
+            return None
+        row = connection.execute(text(query)).mappings().first()
+        if row is None:
+            return None
+        if connection.dialect.name == 'mysql':
+            # Seconds_Behind_Master before MySQL 8.0.22; NULL while replication is stopped
+            lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+            return float('inf') if lag is None else float(lag)
+        lag = next(iter(row.values()))
+        return None if lag is None else float(lag)
+    
+    def _error_handler(self, replica):
+        def handle_error(context):
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(replica, context.original_exception.__class__.__name__)
+        return handle_error
+
+def configure_replicas(app):
+    """Declare each DB_REPLICA_URLS entry as a 'replica_<n>' bind; call before db.init_app"""
+    urls = app.config['DB_REPLICA_URLS']
+    if urls:
+        app.config['SQLALCHEMY_BINDS'] = {
+            **(app.config.get('SQLALCHEMY_BINDS') or {}),
+            **{f'replica_{i}': url for i, url in enumerate(urls)}
+        }
+
+def init_replicas(app, engines):
+    """Create the replica pool and the request hooks that route to it"""
+    replicas = [
+        Replica(key, engine) for key, engine in sorted(engines.items(), key=lambda item: str(item[0]))
+        if isinstance(key, str) and key.startswith('replica_')
+    ]
+    if not replicas:
+        app.extensions['db_replicas'] = None
+        return None
+    pool = app.extensions['db_replicas'] = ReplicaPool(
+        replicas,
+        app.config['DB_REPLICA_RETRY_SECONDS'],
+        app.config['DB_REPLICA_HEALTH_INTERVAL'],
+        app.config['DB_REPLICA_MAX_LAG'],
+        app.logger
+    )
+    app.before_request(_choose_route)
+    app.after_request(_remember_write)
+    
+    global _listening
+    if not _listening:
+        from .. import db
+        event.listen(db.session, 'after_flush', lambda session, context: mark_written())
+        event.listen(db.session, 'do_orm_execute', _on_execute)
+        _listening = True
+    return pool
+
+def mark_written():
+    """Pin the rest of this request to the primary and stick the user to it afterwards"""
+    if has_request_context():
+        g._db_replica = None
+        g._db_wrote = True
+
+def _on_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mark_written()
+
+def _choose_route():
+    g._db_replica = None
+    if request.method not in SAFE_METHODS or _sticky():
+        return
+    g._db_replica = current_app.extensions['db_replicas'].choose()
+
+def _sticky():
+    """Whether the caller wrote recently enough that replicas may not have caught up"""
+    config = current_app.config
+    try:
+        if float(request.cookies.get(config['DB_STICKY_COOKIE'], 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    
+    cache = _shared_cache()
+    if cache is None:
+        return False
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        # Invalid tokens are rejected by the view itself
+        return False
+    return user_id is not None and cache.get(f'primary-until:{user_id}') is not None
+
+def _remember_write(response):
+    if not g.get('_db_wrote'):
+        return response
+    config = current_app.config
+    window = config['DB_STICKY_SECONDS']
+    response.set_cookie(
+        config['DB_STICKY_COOKIE'],
+        str(int(time.time() + window)),
+        max_age=window,
+        httponly=True,
+        samesite='Lax'
+    )
+    
+    cache = _shared_cache()
+    try:
+        user_id = get_jwt_identity()
+    except Exception:
+        user_id = None
+    if cache is not None and user_id is not None:
+        cache.set(f'primary-until:{user_id}', 1, window)
+    return response
+
+def _shared_cache():
+    """
+    The response cache when every worker sees the same one, else None.
+    
+    A write remembered in a per-process cache would only keep that worker's
+    later requests on the primary, so the cookie is all that is used then.
+    """
+    from .cache import get_cache
+    cache = get_cache()
+    return cache if cache is not None and cache.shared else None
@@ -0,0 +1,148 @@
+import re
+from .. import db
+from .helpers import InvalidArgument
+from ..models.project import Project
+from ..models.task import Task
+
+MAX_TERMS = 10
+# Shorter terms match whole words only: a one or two letter prefix matches
+# most of a large corpus and makes ranking it slow
+MIN_PREFIX_LENGTH = 3
+
+# (table, indexed columns) for every searchable entity
+SEARCH_TABLES = {
+    'tasks': ('tasks', ('title', 'description')),
+    'projects': ('projects', ('name', 'description')),
+}
+
+# FTS5 tables over the entity tables' own rows (external content), kept in
+# step by triggers so every write path, including bulk Core statements,
+# updates the index in the same transaction
+FTS5_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5("
+    "{columns}, content='{table}', content_rowid='id', "
+    "prefix='3', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {table}_fts(rowid, {columns}) VALUES (new.id, {new}); END",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {table}_fts({table}_fts, rowid, {columns}) VALUES ('delete', old.id, {old}); END",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF {columns} ON {table} BEGIN "
+    "INSERT INTO {table}_fts({table}_fts, rowid, {columns}) VALUES ('delete', old.id, {old}); "
+    "INSERT INTO {table}_fts(rowid, {columns}) VALUES (new.id, {new}); END",
+)
+
+def search_backend():
+    """'fts5' on SQLite, 'fulltext' on MySQL, otherwise a LIKE scan"""
+    name = db.engine.dialect.name
+    if name == 'sqlite':
+        return 'fts5'
+    if name in ('mysql', 'mariadb'):
+        return 'fulltext'
+    return 'like'
+
+def init_search(app):
+    """Create the search indexes that db.create_all() cannot express"""
+    with app.app_context():
+        ensure_search_index()
+
+def ensure_search_index():
+    """
+    Create any missing search index, filling it from the existing rows.
+    
+    Returns the entities whose index was (re)built. On SQLite a missing
+    trigger also means the entity table was recreated, so its index is
+    rebuilt rather than trusted.
+    """
+    backend = search_backend()
+    built = []
+    with db.engine.begin() as connection:
+        if backend == 'fts5':
+            existing = {
+                name for (name,) in connection.execute(db.text(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_fts_%'"
+                ))
+            }
+            for entity, (table, columns) in SEARCH_TABLES.items():
+                if f'{table}_fts_update' in existing:
+                    continue
+                names = ', '.join(columns)
+                for statement in FTS5_DDL:
+                    connection.execute(db.text(statement.format(
+                        table=table,
+                        columns=names,
+                        new=', '.join(f'new.{column}' for column in columns),
+                        old=', '.join(f'old.{column}' for column in columns)
+                    )))
+                connection.execute(db.text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+                built.append(entity)
+        elif backend == 'fulltext':
+            for entity, (table, columns) in SEARCH_TABLES.items():
+                indexes = {index['name'] for index in db.inspect(connection).get_indexes(table)}
+                if f'ft_{table}' not in indexes:
+                    connection.execute(db.text(
+                        f"CREATE FULLTEXT INDEX ft_{table} ON {table} ({', '.join(columns)})"
+                    ))
+                    built.append(entity)
+    return built
+
+def rebuild_search_index():
+    """Rebuild every FTS5 index from its table; MySQL maintains FULLTEXT itself"""
+    if search_backend() != 'fts5':
+        return []
+    ensure_search_index()
+    with db.engine.begin() as connection:
+        for table, _ in SEARCH_TABLES.values():
+            connection.execute(db.text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+    return list(SEARCH_TABLES)
+
+def parse_terms(text):
+    """Split a search string into at most MAX_TERMS lowercase word terms"""
+    terms = re.findall(r'\w+', (text or '').lower())[:MAX_TERMS]
+    if not terms:
+        raise InvalidArgument('Search query is required')
+    return terms
+
+def _prefix(term):
+    return '*' if len(term) >= MIN_PREFIX_LENGTH else ''
+
+def _escape_like(term):
+    """Match the term literally in a LIKE pattern (terms may contain '_')"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def search_clause(entity, terms):
+    """
+    Return (join target or None, filter, rank, descending) for a search.
+    
+    Every term must match, as a prefix of a word in any indexed column, so
+    "des rev" finds "Design review"; terms under MIN_PREFIX_LENGTH must
+    match a whole word. Results are ordered by rank and then
+    id. On SQLite the rank is BM25 with titles weighted above descriptions
+    (lower is better); on MySQL it is the FULLTEXT relevance (higher is
+    better, and InnoDB ignores terms shorter than innodb_ft_min_token_size).
+    """
+    model = {'tasks': Task, 'projects': Project}[entity]
+    table, columns = SEARCH_TABLES[entity]
+    backend = search_backend()
+    
+    if backend == 'fts5':
+        fts = db.table(f'{table}_fts', db.column('rowid'), db.column(f'{table}_fts'))
+        match = ' '.join(f'"{term}"' + _prefix(term) for term in terms)
+        rank = db.func.bm25(db.literal_column(f'{table}_fts'), 10.0, 1.0)
+        return (
+            (fts, fts.c.rowid == model.id),
+            db.literal_column(f'{table}_fts').op('MATCH')(match),
+            rank.label('rank'),
+            False
+        )
+    
+    model_columns = [getattr(model, column) for column in columns]
+    if backend == 'fulltext':
+        from sqlalchemy.dialects.mysql import match
+        relevance = match(*model_columns, against=' '.join(f'+{term}' + _prefix(term) for term in terms)).in_boolean_mode()
+        return None, relevance > 0, relevance.label('rank'), True
+    
+    clauses = [
+        db.or_(*(column.ilike(f'%{_escape_like(term)}%', escape='\\') for column in model_columns))
+        for term in terms
+    ]
+    return None, db.and_(*clauses), db.literal_column('0').label('rank'), False
@@ -0,0 +1,93 @@
+from ..models.task import Task
+from ..models.user import User
+
+TASK_FIELD_ORDER = (
+    'id', 'title', 'description', 'status', 'priority', 'due_date', 'estimated_hours',
+    'actual_hours', 'position', 'project_id', 'assignee_id', 'assignee',
+    'created_at', 'updated_at'
+)
+USER_FIELD_ORDER = ('id', 'name', 'email', 'role', 'status', 'created_at', 'updated_at')
+DATE_FIELDS = {'due_date', 'created_at', 'updated_at'}
+
+class TaskRowSerializer:
+    """
+    Serialize task listings from plain column rows instead of ORM objects.
+    
+    ``select`` rewrites a Task query to fetch only the needed columns (plus
+    the assignee's columns through an outer join), so no Task or User objects
+    are hydrated. ``serialize`` produces the same keys as Task.to_dict, or
+    with ``users_map`` replaces the nested assignee with a ``users`` map keyed
+    by id so each assignee is sent once per response.
+    """
+    
+    def __init__(self, fields=None, users_map=False, sort_columns=()):
+        fields = fields or TASK_FIELD_ORDER
+        self.include_assignee = 'assignee' in fields
+        self.users_map = users_map
+        self.output = [name for name in TASK_FIELD_ORDER if name in fields and name != 'assignee']
+        
+        # Columns needed for pagination and the assignee, but not output.
+        # Sort keys that are not Task columns (e.g. a search rank) are
+        # selected as given.
+        self.names = list(self.output)
+        self.expressions = {}
+        for column in sort_columns:
+            if column.key not in self.names:
+                self.names.append(column.key)
+                if not hasattr(Task, column.key):
+                    self.expressions[column.key] = column
+        if self.include_assignee and 'assignee_id' not in self.names:
+            self.names.append('assignee_id')
+        self.dates = {i for i, name in enumerate(self.names) if name in DATE_FIELDS}
+        self.assignee_index = self.names.index('assignee_id') if self.include_assignee else None
+    
+    def select(self, query):
+        columns = [
+            self.expressions[name] if name in self.expressions else getattr(Task, name).label(name)
+            for name in self.names
+        ]
+        if not self.include_assignee:
+            return query.with_entities(*columns)
+        
+        user_columns = [
+            getattr(User, name).label(f'assignee_{name}') for name in USER_FIELD_ORDER
+        ]
+        return query.with_entities(*columns, *user_columns).outerjoin(
+            User, User.id == Task.assignee_id
+        )
+    
+    def serialize(self, rows):
+        """Return the task dicts and the users map (empty unless users_map is set)"""
+        tasks = []
+        users = {}
+        output_count = len(self.output)
+        width = len(self.names)
+        
+        for row in rows:
+            values = list(row)
+            for i in self.dates:
+                if values[i] is not None:
+                    values[i] = values[i].isoformat()
+            data = dict(zip(self.output, values[:output_count]))
+            
+            if self.include_assignee:
+                assignee_id = values[self.assignee_index]
+                assignee = None
+                if assignee_id is not None:
+                    assignee = users.get(assignee_id)
+                    if assignee is None:
+                        assignee = _user_dict(values[width:])
+                        users[assignee_id] = assignee
+                if not self.users_map:
+                    data['assignee'] = assignee
+            
+            tasks.append(data)
+        
+        return tasks, (users if self.users_map else {})
+
+def _user_dict(values):
+    data = dict(zip(USER_FIELD_ORDER, values))
+    for name in ('created_at', 'updated_at'):
+        if data[name] is not None:
+            data[name] = data[name].isoformat()
+    return data
@@ -0,0 +1,12 @@
+"""
+Production entry point with asyncio read endpoints.
+
+    uvicorn asgi:app --workers 4
+
+Uses ProductionConfig unless FLASK_ENV names another configuration. See
+app/asgi.py; wsgi.py serves the same API from threaded workers instead.
+"""
+import os
+from app.asgi import create_asgi_app
+
+app = create_asgi_app(os.getenv('FLASK_ENV', 'production'))
@@ -0,0 +1,83 @@
+"""
+Compare concurrent read throughput of the WSGI and ASGI entry points.
+
+    python -m benchmarks.seed --tasks 100000
+    python -m benchmarks.async_reads --latency-ms 5 --concurrency 64
+
+Every statement on the benchmark database is delayed by --latency-ms to
+simulate a remote database. The harness then replays the read mix of
+benchmarks/load.py against gunicorn (threaded workers, wsgi path) and
+uvicorn (asyncio read endpoints, asgi path) with the same number of worker
+processes and the same connection pool, and reports req/s, p50/p99 and
+errors for each.
+"""
+import argparse
+import os
+import sys
+
+from .common import make_app, db
+from .load import DEFAULT_PATHS, drive, percentile, start, start_server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency-ms', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker')
+    parser.add_argument('--pool-size', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--warmup', type=float, default=2.0)
+    parser.add_argument('--port', type=int, default=8055)
+    parser.add_argument('--user-id', type=int, default=1)
+    args = parser.parse_args()
+    
+    from flask_jwt_extended import create_access_token
+    from app.models import project_members
+    
+    app = make_app()
+    with app.app_context():
+        token = create_access_token(identity=args.user_id)
+        project_id = db.session.query(db.func.min(project_members.c.project_id)).filter(
+            project_members.c.user_id == args.user_id
+        ).scalar()
+    headers = {'Authorization': f'Bearer {token}'}
+    paths = [path.format(project_id=project_id) for path in DEFAULT_PATHS]
+    
+    # Inherited by both servers
+    os.environ.update({
+        'BENCHMARK_DB_LATENCY_MS': str(args.latency_ms),
+        'DB_POOL_SIZE': str(args.pool_size),
+        # Measure the database path rather than the response cache
+        'RESPONSE_CACHE_BACKEND': 'none'
+    })
+    servers = {
+        f'wsgi {args.workers}x{args.threads} threads': lambda: start_server(
+            args.port, args.workers, args.threads, args.pool_size
+        ),
+        f'asgi {args.workers} workers': lambda: start(
+            [
+                sys.executable, '-m', 'uvicorn', '--factory', 'benchmarks.common:make_asgi_app',
+                '--port', str(args.port), '--workers', str(args.workers),
+                '--log-level', 'warning', '--no-access-log'
+            ],
+            args.port
+        ),
+    }
+    
+    print(f'{args.latency_ms:g} ms per statement, {args.concurrency} concurrent clients')
+    print(f"{'server':24} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, launch in servers.items():
+        server = launch()
+        try:
+            drive(args.port, headers, paths, args.concurrency, args.warmup)
+            latencies, errors = drive(args.port, headers, paths, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+        print(
+            f'{name:24} {len(latencies) / args.duration:>9.1f} '
+            f'{percentile(latencies, 0.5):>8.2f} {percentile(latencies, 0.99):>8.2f} {errors:>7}'
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import sys
+import time
+
+from sqlalchemy import event
+from sqlalchemy.util import await_only
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.config import Config, ProductionConfig, config  # noqa: E402
+
+class BenchmarkConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ.get('BENCHMARK_DATABASE_URL', 'sqlite:///benchmark.db')
+    JWT_VERIFY_SUB = False
+    BACKGROUND_TASKS_INLINE = True
+    # Pooled like production so benchmarks/load.py measures the pool settings
+    SQLALCHEMY_ENGINE_OPTIONS = ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS
+
+config['benchmark'] = BenchmarkConfig
+
+# Simulated network round trip added to every statement, e.g. to a
+# database in another availability zone
+LATENCY_MS = float(os.environ.get('BENCHMARK_DB_LATENCY_MS', 0))
+
+def make_app():
+    """Create an app bound to the benchmark database"""
+    app = create_app('benchmark')
+    if LATENCY_MS:
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', _sleep)
+    return app
+
+def make_asgi_app():
+    """Create the ASGI app (app/asgi.py) bound to the benchmark database"""
+    from app.asgi import create_asgi_app
+    
+    app = create_asgi_app('benchmark')
+    if LATENCY_MS:
+        flask_app = app.state.flask_app
+        with flask_app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', _sleep)
+        event.listen(flask_app.extensions['async_engine'].sync_engine, 'before_cursor_execute', _async_sleep)
+    return app
+
+def _sleep(*args):
+    time.sleep(LATENCY_MS / 1000)
+
+def _async_sleep(*args):
+    # Runs inside the asyncio engine's greenlet, so this yields to the event
+    # loop the way waiting on a real network socket would
+    await_only(asyncio.sleep(LATENCY_MS / 1000))
+
+def timed(fn, repeat=5):
+    """Run fn several times and return the best wall time in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+__all__ = ['make_app', 'make_asgi_app', 'timed', 'db']
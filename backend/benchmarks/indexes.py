@@ -0,0 +1,76 @@
+"""
+Compare query plans and timings for the hot paths with and without indexes.
+
+    python -m benchmarks.seed --tasks 1000000
+    python -m benchmarks.indexes
+
+Drops the indexes declared on the models, runs each query, recreates the
+indexes and runs them again.
+"""
+import argparse
+
+from .common import make_app, timed, db
+
+def hot_queries(project_id, user_id):
+    from app.models import Task, Project, project_members
+    
+    column = (Task.project_id == project_id) & (Task.status == 'in-progress')
+    return {
+        'board column': db.select(Task.id, Task.title, Task.position)
+            .where(column).order_by(Task.position, Task.id).limit(100),
+        'column max position': db.select(db.func.max(Task.position)).where(column),
+        'tasks by assignee': db.select(Task.id).where(Task.assignee_id == user_id),
+        'projects by owner': db.select(Project.id).where(Project.owner_id == user_id),
+        'memberships by user': db.select(project_members.c.project_id)
+            .where(project_members.c.user_id == user_id),
+    }
+
+def explain(statement):
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect.name == 'sqlite' else 'EXPLAIN '
+    rows = db.session.execute(db.text(prefix + sql)).fetchall()
+    return ['  '.join(str(value) for value in row) for row in rows]
+
+def run(queries, repeat):
+    results = {}
+    for name, statement in queries.items():
+        plan = explain(statement)
+        elapsed = timed(lambda: db.session.execute(statement).fetchall(), repeat)
+        results[name] = (elapsed, plan)
+    return results
+
+def declared_indexes():
+    return [index for table in db.metadata.sorted_tables for index in table.indexes]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--project-id', type=int, default=1)
+    parser.add_argument('--user-id', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    app = make_app()
+    with app.app_context():
+        queries = hot_queries(args.project_id, args.user_id)
+        indexes = declared_indexes()
+        
+        with db.engine.begin() as connection:
+            for index in indexes:
+                index.drop(connection, checkfirst=True)
+        before = run(queries, args.repeat)
+        
+        with db.engine.begin() as connection:
+            for index in indexes:
+                index.create(connection, checkfirst=True)
+        db.session.execute(db.text('ANALYZE'))
+        after = run(queries, args.repeat)
+    
+    for name in queries:
+        (before_ms, before_plan), (after_ms, after_plan) = before[name], after[name]
+        print(f'{name}: {before_ms:.2f} ms -> {after_ms:.2f} ms')
+        print('  before: ' + ' | '.join(before_plan))
+        print('  after:  ' + ' | '.join(after_plan))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Measure API throughput under gunicorn for several worker, thread and pool sizes.
+
+    python -m benchmarks.seed --tasks 100000
+    python -m benchmarks.load --workers 1,2,4 --threads 4,8 --pool-size 5,10
+
+For every combination, starts gunicorn with gunicorn.conf.py on the
+benchmark database. Client threads then replay a mix of read requests for
+--duration seconds, and the harness reports requests per second, p50 and
+p99 latency, and errors. Requests come from --concurrency client threads in
+this process, so above a few thousand requests per second the client
+becomes the limit. For more load, point wrk or hey at the printed URL and
+token. Run against the same database engine as production (set
+BENCHMARK_DATABASE_URL): SQLite serialises writers and is only useful for
+comparing read paths.
+"""
+import argparse
+import http.client
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from .common import make_app, db
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PATHS = (
+    '/api/v1/tasks/project/{project_id}?limit=50',
+    '/api/v1/tasks?limit=50',
+    '/api/v1/projects?limit=20',
+    '/api/v1/projects/{project_id}/stats',
+)
+
+def int_list(value):
+    return [int(item) for item in value.split(',')]
+
+def wait_for_port(server, port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server did not start listening on port {port}')
+
+def start_server(port, workers, threads, pool_size):
+    """Start gunicorn with gunicorn.conf.py on the benchmark database"""
+    return start(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'benchmarks.common:make_app()'],
+        port,
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_THREADS=str(threads),
+        GUNICORN_ACCESS_LOG='',
+        GUNICORN_LOG_LEVEL='warning',
+        DB_POOL_SIZE=str(pool_size)
+    )
+
+def start(command, port, **env):
+    """Run a server command from the backend directory and wait until it listens"""
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env=dict(os.environ, **env))
+    try:
+        wait_for_port(server, port)
+    except RuntimeError:
+        server.kill()
+        raise
+    return server
+
+def drive(port, headers, paths, concurrency, duration):
+    """Replay the paths round-robin from client threads; returns latencies and errors"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    
+    def client(offset):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local, failed = [], 0
+        for path in itertools.islice(itertools.cycle(paths), offset, None):
+            if time.monotonic() >= deadline:
+                break
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            local.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+    
+    clients = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    return sorted(latencies), errors[0]
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int_list, default=[1, 2, 4])
+    parser.add_argument('--threads', type=int_list, default=[4, 8])
+    parser.add_argument('--pool-size', type=int_list, default=[5, 10])
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--warmup', type=float, default=2.0)
+    parser.add_argument('--port', type=int, default=8055)
+    parser.add_argument('--user-id', type=int, default=1)
+    parser.add_argument('--project-id', type=int, help='Defaults to one of the user\'s projects')
+    parser.add_argument('--path', action='append', help='Request path (repeatable); defaults to a read mix')
+    args = parser.parse_args()
+    
+    from flask_jwt_extended import create_access_token
+    from app.models import project_members
+    
+    app = make_app()
+    with app.app_context():
+        token = create_access_token(identity=args.user_id)
+        project_id = args.project_id or db.session.query(db.func.min(project_members.c.project_id)).filter(
+            project_members.c.user_id == args.user_id
+        ).scalar()
+    headers = {'Authorization': f'Bearer {token}'}
+    paths = [path.format(project_id=project_id) for path in (args.path or DEFAULT_PATHS)]
+    
+    print(f'token: {token}')
+    print(f"{'workers':>7} {'threads':>7} {'pool':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers, threads, pool_size in itertools.product(args.workers, args.threads, args.pool_size):
+        server = start_server(args.port, workers, threads, pool_size)
+        try:
+            drive(args.port, headers, paths, args.concurrency, args.warmup)
+            latencies, errors = drive(args.port, headers, paths, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+        print(
+            f'{workers:>7} {threads:>7} {pool_size:>5} {len(latencies) / args.duration:>9.1f} '
+            f'{percentile(latencies, 0.5):>8.2f} {percentile(latencies, 0.99):>8.2f} {errors:>7}'
+        )
+
+if __name__ == '__main__':
+    main()
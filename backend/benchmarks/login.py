@@ -0,0 +1,98 @@
+"""
+Load-test /auth/login throughput and the latency of other requests meanwhile.
+
+    python -m benchmarks.login --executor process --threads 16 --seconds 10
+
+Runs a login storm from several threads while one more thread polls
+/auth/profile, then reports logins per second and the profile latency
+percentiles. Compare --executor inline (bcrypt on the request thread) with
+--executor process (bcrypt on the hashing pool).
+"""
+import argparse
+import threading
+import time
+
+from .common import make_app, db
+
+PASSWORD = 'benchmark-password'
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--executor', choices=('inline', 'process'), default='process')
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+    
+    from flask_jwt_extended import create_access_token
+    from app.models import User
+    
+    app = make_app()
+    app.config.update(
+        PASSWORD_HASH_EXECUTOR=args.executor,
+        BCRYPT_ROUNDS=args.rounds,
+        LOGIN_RATE_LIMIT_EMAIL=0,
+        LOGIN_RATE_LIMIT_IP=0
+    )
+    prefix = app.config['API_PREFIX']
+    
+    with app.app_context():
+        db.session.query(User).filter(User.email.like('login-bench-%')).delete()
+        user = User(name='Login bench', email='login-bench-0@example.com')
+        user.set_password(PASSWORD)
+        password_hash = user.password_hash
+        db.session.add_all([
+            User(name=f'Login bench {i}', email=f'login-bench-{i}@example.com', password_hash=password_hash)
+            for i in range(args.users)
+        ])
+        db.session.commit()
+        profile_user = User.query.filter_by(email='login-bench-0@example.com').first()
+        headers = {'Authorization': 'Bearer ' + create_access_token(identity=profile_user.id)}
+    
+    deadline = time.perf_counter() + args.seconds
+    logins = []
+    profile_latencies = []
+    lock = threading.Lock()
+    
+    def storm(index):
+        client = app.test_client()
+        count = 0
+        while time.perf_counter() < deadline:
+            email = f'login-bench-{(index + count) % args.users}@example.com'
+            response = client.post(f'{prefix}/auth/login', json={'email': email, 'password': PASSWORD})
+            assert response.status_code == 200, response.get_json()
+            count += 1
+        with lock:
+            logins.append(count)
+    
+    def poll():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            client.get(f'{prefix}/auth/profile', headers=headers)
+            profile_latencies.append((time.perf_counter() - start) * 1000)
+    
+    threads = [threading.Thread(target=storm, args=(i,)) for i in range(args.threads)]
+    threads.append(threading.Thread(target=poll))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    total = sum(logins)
+    print(f'executor={args.executor} rounds={args.rounds} threads={args.threads}')
+    print(f'logins: {total} in {args.seconds:.0f}s ({total / args.seconds:.1f}/s)')
+    print(
+        f'profile latency during storm: p50 {percentile(profile_latencies, 50):.1f} ms, '
+        f'p95 {percentile(profile_latencies, 95):.1f} ms, p99 {percentile(profile_latencies, 99):.1f} ms'
+    )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Time ranked search requests against a seeded corpus.
+
+    python -m benchmarks.seed --tasks 1000000
+    python -m benchmarks.search --target-ms 200
+
+Startup builds the search index if the seed left it missing (timed
+separately). Then it issues search requests as a project member: a common
+term, a rare term, a three-letter prefix, two terms, a projects search and
+the second page of the common term. Exits non-zero if any best time
+exceeds the target.
+"""
+import argparse
+import sys
+import time
+
+from .common import make_app, timed, db
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--user-id', type=int, default=1)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=200.0)
+    args = parser.parse_args()
+    
+    from flask_jwt_extended import create_access_token
+    from app.models import Task
+    from app.utils.search import search_backend
+    
+    start = time.perf_counter()
+    app = make_app()
+    print(f'startup and index check {time.perf_counter() - start:.1f} s')
+    with app.app_context():
+        backend = search_backend()
+        tasks = db.session.query(db.func.count(Task.id)).scalar()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=args.user_id)}'}
+    
+    client = app.test_client()
+    
+    def request(query):
+        response = client.get(f'/api/v1/search?limit={args.limit}&{query}', headers=headers)
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()
+    
+    first_page = request('q=design')
+    queries = {
+        'common term': 'q=design',
+        'rare term': 'q=onboarding+7',
+        'short prefix': 'q=dep',
+        'two terms': 'q=review+invoice',
+        'projects': 'q=project&type=projects',
+    }
+    if first_page['next_cursor']:
+        queries['second page'] = f"q=design&cursor={first_page['next_cursor']}"
+    
+    print(f'{backend} backend, {tasks} tasks, limit {args.limit}')
+    slow = []
+    for name, query in queries.items():
+        elapsed = timed(lambda: request(query), args.repeat)
+        print(f'{name:18} {elapsed:8.2f} ms')
+        if elapsed > args.target_ms:
+            slow.append(name)
+    
+    if slow:
+        print(f"over the {args.target_ms:g} ms target: {', '.join(slow)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Seed the benchmark database with users, projects, memberships and tasks.
+
+    python -m benchmarks.seed --tasks 1000000
+
+Project sizes follow a long-tailed distribution (a few large boards, many
+small ones), tasks are assigned to members of their project, and about one
+in seven has no due date. Every user's password is PASSWORD, so the login
+scenarios can authenticate as any of them. The rollups and the "My Work"
+inbox are rebuilt afterwards, since the Core inserts bypass their upkeep.
+"""
+import argparse
+import bisect
+import itertools
+import random
+from datetime import date, datetime, timedelta
+
+from .common import make_app, db
+
+STATUSES = ('not-started', 'in-progress', 'review', 'completed')
+PRIORITIES = ('low', 'medium', 'high', 'urgent')
+CHUNK_SIZE = 10000
+PASSWORD = 'benchmark-password'
+UNDATED_SHARE = 0.15
+UNASSIGNED_SHARE = 0.2
+
+# Title vocabulary, so search benchmarks see common, rare and shared-prefix terms
+VERBS = ('design', 'review', 'fix', 'write', 'test', 'deploy', 'migrate', 'document', 'plan', 'refactor')
+NOUNS = (
+    'homepage', 'login', 'invoice', 'dashboard', 'report', 'onboarding', 'search',
+    'billing', 'export', 'notifications', 'settings', 'analytics', 'checkout', 'profile'
+)
+
+def seed(tasks=10000, users=None, projects=None, members_per_project=8, seed_value=42):
+    """
+    Insert a reproducible dataset with Core executemany in chunks.
+    
+    Users and projects scale with the task count unless given explicitly.
+    All users share one password hash, so bcrypt runs once.
+    """
+    from app.models import User, Project, Task, project_members
+    from app.utils.inbox import rebuild_inbox
+    from app.utils.passwords import hash_password
+    from app.utils.rollups import rebuild_rollups
+    
+    rng = random.Random(seed_value)
+    users = users or max(tasks // 200, 10)
+    projects = projects or max(tasks // 1000, 5)
+    now = datetime.utcnow()
+    password_hash = hash_password(PASSWORD)
+    
+    db.session.execute(db.insert(User), [
+        {
+            'name': f'User {i}',
+            'email': f'user{i}@example.com',
+            'password_hash': password_hash,
+            'role': 'member',
+            'status': 'active',
+            'created_at': now,
+            'updated_at': now
+        }
+        for i in range(1, users + 1)
+    ])
+    db.session.execute(db.insert(Project), [
+        {
+            'name': f'Project {i}',
+            'description': 'Seeded project',
+            'status': rng.choice(('planning', 'active', 'completed')),
+            'priority': rng.choice(PRIORITIES),
+            'owner_id': rng.randint(1, users),
+            'created_at': now,
+            'updated_at': now - timedelta(minutes=i)
+        }
+        for i in range(1, projects + 1)
+    ])
+    
+    memberships = set()
+    members = {}
+    for project_id in range(1, projects + 1):
+        members[project_id] = rng.sample(range(1, users + 1), min(members_per_project, users))
+        for user_id in members[project_id]:
+            memberships.add((project_id, user_id))
+    db.session.execute(project_members.insert(), [
+        {'project_id': project_id, 'user_id': user_id, 'role': 'member', 'joined_at': now}
+        for project_id, user_id in sorted(memberships)
+    ])
+    db.session.commit()
+    
+    # Pareto weights give a long tail of project sizes
+    cumulative = list(itertools.accumulate(rng.paretovariate(1.2) for _ in range(projects)))
+    
+    positions = {}
+    batch = []
+    for i in range(1, tasks + 1):
+        project_id = bisect.bisect(cumulative, rng.random() * cumulative[-1]) + 1
+        status = rng.choice(STATUSES)
+        positions[(project_id, status)] = positions.get((project_id, status), 0) + 1
+        batch.append({
+            'title': f'{rng.choice(VERBS).capitalize()} {rng.choice(NOUNS)} {i}',
+            'description': 'Seeded task description ' * 4,
+            'status': status,
+            'priority': rng.choice(PRIORITIES),
+            'due_date': (
+                date.today() + timedelta(days=rng.randint(-30, 90))
+                if rng.random() >= UNDATED_SHARE else None
+            ),
+            'estimated_hours': float(rng.randint(1, 16)),
+            'actual_hours': 0.0,
+            'position': float(positions[(project_id, status)]),
+            'project_id': project_id,
+            'assignee_id': rng.choice(members[project_id]) if rng.random() >= UNASSIGNED_SHARE else None,
+            'created_at': now,
+            'updated_at': now - timedelta(seconds=i)
+        })
+        if len(batch) >= CHUNK_SIZE:
+            db.session.execute(db.insert(Task), batch)
+            db.session.commit()
+            batch = []
+    if batch:
+        db.session.execute(db.insert(Task), batch)
+        db.session.commit()
+    
+    rebuild_rollups()
+    inbox = rebuild_inbox()
+    
+    return {
+        'users': users,
+        'projects': projects,
+        'memberships': len(memberships),
+        'tasks': tasks,
+        'inbox rows': inbox
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--projects', type=int)
+    parser.add_argument('--members-per-project', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    app = make_app()
+    with app.app_context():
+        db.drop_all(bind_key=None)
+        db.create_all(bind_key=None)
+        counts = seed(args.tasks, args.users, args.projects, args.members_per_project, args.seed)
+    print(', '.join(f'{value} {key}' for key, value in counts.items()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare the ORM to_dict + jsonify path with the row serializer + fast encoder.
+
+    python -m benchmarks.seed --tasks 100000
+    python -m benchmarks.serialization --rows 5000
+"""
+import argparse
+import json
+
+from .common import make_app, timed, db
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    from sqlalchemy.orm import joinedload
+    from app.models import Task
+    from app.utils.encoding import FastJSONProvider
+    from app.utils.serializers import TaskRowSerializer
+    
+    app = make_app()
+    with app.test_request_context():
+        fast = FastJSONProvider(app)
+        
+        def orm_path():
+            db.session.expunge_all()
+            tasks = Task.query.options(joinedload(Task.assignee)).order_by(Task.id).limit(args.rows).all()
+            return json.dumps({'tasks': [task.to_dict() for task in tasks]})
+        
+        def row_path():
+            serializer = TaskRowSerializer()
+            rows = serializer.select(Task.query).order_by(Task.id).limit(args.rows)
+            tasks, _ = serializer.serialize(rows)
+            return fast.dumps({'tasks': tasks})
+        
+        def row_path_users_map():
+            serializer = TaskRowSerializer(users_map=True)
+            rows = serializer.select(Task.query).order_by(Task.id).limit(args.rows)
+            tasks, users = serializer.serialize(rows)
+            return fast.dumps({'tasks': tasks, 'users': users})
+        
+        results = {
+            'to_dict + json': (timed(orm_path, args.repeat), len(orm_path())),
+            'rows + fast encoder': (timed(row_path, args.repeat), len(row_path())),
+            'rows + users map': (timed(row_path_users_map, args.repeat), len(row_path_users_map())),
+        }
+    
+    for name, (elapsed, size) in results.items():
+        print(f'{name:22} {elapsed:8.2f} ms  {size / 1024:8.1f} KiB')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""
+Replay scripted user flows and report latency and queries per endpoint.
+
+    python -m benchmarks.seed --tasks 10000
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.seed --tasks 10000
+    python -m benchmarks.suite --check benchmarks/baseline.json
+
+Scenarios run in-process through the test client as a member of the
+largest seeded project: board (project, board and members), reorder (drag a
+card), bulk (status changes on 50 cards), inbox and feed ("My Work" and the
+task and project listings) and login. Every request must succeed. The
+report gives p50, p95 and p99 latency and the statements each request ran.
+
+The scenarios write to the database and their statement counts depend on
+its state, so seed afresh (with the same arguments) before recording or
+checking a baseline.
+
+--check compares against a baseline from the same dataset and exits 1 when
+an endpoint runs more statements than before, or its p95 exceeds the
+baseline by more than --tolerance (plus --slack-ms, which absorbs noise on
+sub-millisecond requests). Latency baselines only transfer between similar
+machines; statement counts are exact anywhere.
+"""
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import sys
+import time
+
+from sqlalchemy import event
+
+from .common import make_app, db
+from .login import percentile
+from .seed import PASSWORD, STATUSES
+
+SCENARIOS = ('board', 'reorder', 'bulk', 'inbox', 'feed', 'login')
+BULK_SIZE = 50
+
+class Recorder:
+    """Issue requests through the test client, timing them and counting their statements"""
+    
+    def __init__(self, app, headers):
+        self.client = app.test_client()
+        self.prefix = app.config['API_PREFIX']
+        self.headers = headers
+        self.samples = {}
+        self.scenario = None
+        self.recording = True
+        self.queries = 0
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._count)
+    
+    def _count(self, *args):
+        self.queries += 1
+    
+    def request(self, label, method, path, **kwargs):
+        self.queries = 0
+        start = time.perf_counter()
+        response = self.client.open(self.prefix + path, method=method, headers=self.headers, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        assert response.status_code in (200, 201), (label, response.status_code, response.get_json())
+        if self.recording:
+            self.samples.setdefault((self.scenario, label), []).append((elapsed, self.queries))
+        return response.get_json()
+
+def board(recorder, ctx):
+    project_id = ctx['rng'].choice(ctx['project_ids'])
+    recorder.request('GET /projects/<id>', 'GET', f'/projects/{project_id}')
+    recorder.request('GET /tasks/project/<id>', 'GET', f'/tasks/project/{project_id}?limit=100')
+    recorder.request('GET /projects/<id>/members', 'GET', f'/projects/{project_id}/members')
+
+def reorder(recorder, ctx):
+    rng = ctx['rng']
+    recorder.request('POST /tasks/reorder', 'POST', '/tasks/reorder', json={
+        'task_id': rng.choice(ctx['task_ids']),
+        'position': rng.randint(1, 20),
+        'status': rng.choice(STATUSES)
+    })
+
+def bulk(recorder, ctx):
+    rng = ctx['rng']
+    recorder.request('POST /tasks/bulk', 'POST', '/tasks/bulk', json={'operations': [
+        {'op': 'update', 'id': task_id, 'data': {'status': rng.choice(STATUSES)}}
+        for task_id in rng.sample(ctx['task_ids'], min(BULK_SIZE, len(ctx['task_ids'])))
+    ]})
+
+def inbox(recorder, ctx):
+    first = recorder.request('GET /tasks/inbox', 'GET', '/tasks/inbox?limit=50')
+    if first['next_cursor']:
+        recorder.request('GET /tasks/inbox?cursor', 'GET', f"/tasks/inbox?limit=50&cursor={first['next_cursor']}")
+
+def feed(recorder, ctx):
+    recorder.request('GET /tasks', 'GET', '/tasks?limit=50')
+    recorder.request('GET /projects', 'GET', '/projects')
+
+def login(recorder, ctx):
+    recorder.request('POST /auth/login', 'POST', '/auth/login', json={'email': ctx['email'], 'password': PASSWORD})
+
+def benchmark_user():
+    """Pick a member of the largest project, with that user's projects and some of their tasks"""
+    from app.models import User, Project, Task, project_members
+    from app.utils.access import accessible_project_ids_query
+    
+    largest = db.session.query(Task.project_id).group_by(Task.project_id).order_by(
+        db.func.count(Task.id).desc(), Task.project_id
+    ).limit(1).scalar()
+    if largest is None:
+        raise SystemExit('The benchmark database is empty; run python -m benchmarks.seed first')
+    user_id = db.session.query(db.func.min(project_members.c.user_id)).filter(
+        project_members.c.project_id == largest
+    ).scalar()
+    project_ids = [row[0] for row in db.session.query(Project.id).filter(
+        Project.id.in_(accessible_project_ids_query(user_id))
+    ).order_by(Project.id)]
+    task_ids = [row[0] for row in db.session.query(Task.id).filter(
+        Task.project_id.in_(project_ids)
+    ).order_by(Task.id).limit(5000)]
+    return user_id, db.session.get(User, user_id).email, project_ids, task_ids
+
+def dataset():
+    from app.models import User, Project, Task
+    return {
+        'users': User.query.count(),
+        'projects': Project.query.count(),
+        'tasks': Task.query.count()
+    }
+
+def summarize(samples):
+    report = {}
+    for (scenario, label), values in samples.items():
+        latencies = [elapsed for elapsed, _ in values]
+        report[label] = {
+            'scenario': scenario,
+            'requests': len(values),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'queries': max(queries for _, queries in values)
+        }
+    return report
+
+def compare(report, baseline, scenarios, tolerance, slack_ms):
+    """Return the regressions of a report against a baseline report for the scenarios that ran"""
+    problems = []
+    for label, expected in baseline['endpoints'].items():
+        if expected['scenario'] not in scenarios:
+            continue
+        actual = report['endpoints'].get(label)
+        if actual is None:
+            problems.append(f'{label}: not measured')
+            continue
+        if actual['queries'] > expected['queries']:
+            problems.append(f"{label}: {actual['queries']} statements, baseline {expected['queries']}")
+        limit = expected['p95_ms'] * (1 + tolerance) + slack_ms
+        if actual['p95_ms'] > limit:
+            problems.append(
+                f"{label}: p95 {actual['p95_ms']:.1f} ms, baseline {expected['p95_ms']:.1f} ms "
+                f"(limit {limit:.1f} ms)"
+            )
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help='Comma-separated subset of: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--response-cache', action='store_true',
+                        help='Keep the response cache on, measuring warm board loads')
+    parser.add_argument('--save-baseline', metavar='PATH')
+    parser.add_argument('--check', metavar='PATH')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Allowed relative p95 growth over the baseline')
+    parser.add_argument('--slack-ms', type=float, default=2.0)
+    args = parser.parse_args()
+    
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    
+    from flask_jwt_extended import create_access_token
+    
+    app = make_app()
+    app.config.update(LOGIN_RATE_LIMIT_EMAIL=0, LOGIN_RATE_LIMIT_IP=0)
+    if not args.response_cache:
+        app.extensions['response_cache'] = None
+    
+    with app.app_context():
+        user_id, email, project_ids, task_ids = benchmark_user()
+        headers = {'Authorization': 'Bearer ' + create_access_token(identity=user_id)}
+        data = dataset()
+    
+    ctx = {
+        'email': email,
+        'project_ids': project_ids,
+        'task_ids': task_ids
+    }
+    recorder = Recorder(app, headers)
+    runners = {name: globals()[name] for name in SCENARIOS}
+    for name in scenarios:
+        recorder.scenario = name
+        # Seeded per scenario, so a subset replays the same requests
+        ctx['rng'] = random.Random(f'{args.seed}:{name}')
+        recorder.recording = False
+        for _ in range(args.warmup):
+            runners[name](recorder, ctx)
+        recorder.recording = True
+        for _ in range(args.iterations):
+            runners[name](recorder, ctx)
+    
+    report = {
+        'dataset': data,
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'database': app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0]
+        },
+        'iterations': args.iterations,
+        'endpoints': summarize(recorder.samples)
+    }
+    
+    print(f"{data['tasks']} tasks, {data['projects']} projects, {data['users']} users; "
+          f'user {user_id} sees {len(project_ids)} projects')
+    print(f"{'endpoint':<32}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}")
+    for label, row in report['endpoints'].items():
+        print(f"{label:<32}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['queries']:>9}")
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as output:
+            json.dump(report, output, indent=2)
+            output.write('\n')
+        print(f'Baseline written to {args.save_baseline}')
+    
+    if args.check:
+        with open(args.check) as source:
+            baseline = json.load(source)
+        if baseline['dataset'] != data:
+            print(f"Baseline was recorded on a different dataset: {baseline['dataset']}")
+            sys.exit(2)
+        problems = compare(report, baseline, scenarios, args.tolerance, args.slack_ms)
+        for problem in problems:
+            print(f'REGRESSION {problem}')
+        if problems:
+            sys.exit(1)
+        print('No regressions against the baseline')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Gunicorn settings for production.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden from the environment. Each worker process
+has its own connection pool (DB_POOL_SIZE + DB_MAX_OVERFLOW connections),
+its own password hashing pool. The in-process response cache and event
+broker cannot be shared, so with more than one worker they default to
+'none' and asking for them explicitly is an error; set
+RESPONSE_CACHE_BACKEND and EVENT_BROKER to 'redis' to have cache
+invalidation and live events reach every worker. benchmarks/load.py measures throughput for different worker, thread
+and pool settings.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Threaded workers: requests spend most of their time waiting on the
+# database, and SSE streams hold a thread for up to EVENT_STREAM_MAX_SECONDS
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# A write only invalidates the cache of the worker that handled it, and its
+# events only reach that worker's streams, so other workers would serve
+# stale responses and ETags for up to RESPONSE_CACHE_TTL
+PROCESS_LOCAL_BACKENDS = {'RESPONSE_CACHE_BACKEND': 'lru', 'EVENT_BROKER': 'memory'}
+if workers > 1:
+    for name, backend in PROCESS_LOCAL_BACKENDS.items():
+        if os.environ.get(name, 'none') == backend:
+            raise RuntimeError(f"{name}={backend} is per process and cannot serve {workers} workers; use 'redis' or 'none'")
+        os.environ.setdefault(name, 'none')
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then to bound memory growth; the jitter keeps
+# them from restarting together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# Load the app once in the master: create_all and the search index check
+# run once and workers share the imported code. post_fork below resets what
+# must not be shared.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# An empty GUNICORN_ACCESS_LOG turns the access log off
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+# Share the CPUs between the workers' password hashing pools instead of
+# giving every worker one process per CPU
+os.environ.setdefault(
+    'PASSWORD_HASH_WORKERS',
+    str(max(1, multiprocessing.cpu_count() // workers))
+)
+
+def post_fork(server, worker):
+    """Give each worker its own database connections and event subscription"""
+    from app.utils.database import dispose_engine
+    from app.utils.events import init_events
+    
+    if not server.cfg.preload_app:
+        return
+    app = server.app.wsgi()
+    dispose_engine(app)
+    # The Redis broker's listener thread does not survive the fork
+    init_events(app)
@@ -0,0 +1,11 @@
+-- Convert tasks.position from a dense integer rank to a fractional sort key.
+--
+-- Existing integer positions are already valid keys (1.0, 2.0, ...), so no
+-- data needs rewriting. Run `flask rebalance-positions` afterwards to space
+-- out any columns whose positions had drifted (gaps or duplicates).
+
+-- MySQL
+ALTER TABLE tasks MODIFY position DOUBLE DEFAULT 0;
+
+-- SQLite stores REAL values in INTEGER columns without conversion, so no
+-- schema change is required there.
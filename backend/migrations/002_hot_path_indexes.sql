@@ -0,0 +1,21 @@
+-- Indexes for the hot query paths declared in app/models.
+--
+--   tasks (project_id, status, position)  board reads, MAX(position) in
+--                                          create_task, reorder neighbours
+--   tasks (assignee_id)                   task feed, "assigned to me"
+--   projects (owner_id)                   project listing, access checks
+--   project_members (user_id, project_id) membership by user; the primary
+--                                          key already covers by project
+--
+-- InnoDB creates an implicit index for every foreign key column and drops it
+-- once another index can enforce the constraint, so on MySQL these replace
+-- rather than duplicate the implicit ones.
+--
+-- The statements work on both MySQL and SQLite. On large MySQL tables run
+-- them during a quiet period or with an online schema change tool.
+-- benchmarks/indexes.py shows the query plans and timings before and after.
+
+CREATE INDEX ix_tasks_project_status_position ON tasks (project_id, status, position);
+CREATE INDEX ix_tasks_assignee_id ON tasks (assignee_id);
+CREATE INDEX ix_projects_owner_id ON projects (owner_id);
+CREATE INDEX ix_project_members_user_id ON project_members (user_id, project_id);
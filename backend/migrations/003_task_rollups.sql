@@ -0,0 +1,21 @@
+-- Incrementally maintained task rollups behind GET /projects/<id>/stats.
+--
+-- db.create_all() creates the task_rollups table on startup but does not add
+-- indexes to the existing tasks table. Apply this, then fill the rollups for
+-- existing data once:
+--
+--   flask rebuild-task-rollups
+--
+-- The same command repairs the rollups if they ever drift from the tasks.
+
+CREATE TABLE IF NOT EXISTS task_rollups (
+    project_id INTEGER NOT NULL,
+    assignee_id INTEGER NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    task_count INTEGER NOT NULL DEFAULT 0,
+    estimated_hours FLOAT NOT NULL DEFAULT 0,
+    actual_hours FLOAT NOT NULL DEFAULT 0,
+    PRIMARY KEY (project_id, assignee_id, status)
+);
+
+CREATE INDEX ix_tasks_project_due_date ON tasks (project_id, due_date);
@@ -0,0 +1,15 @@
+-- Full-text indexes behind GET /api/v1/search.
+--
+-- The app creates these on startup when they are missing (see
+-- app/utils/search.py), which on a large table means a long first boot.
+-- To build them ahead of a deploy instead:
+
+-- MySQL: InnoDB keeps FULLTEXT indexes current on every write
+CREATE FULLTEXT INDEX ft_tasks ON tasks (title, description);
+CREATE FULLTEXT INDEX ft_projects ON projects (name, description);
+
+-- SQLite: FTS5 tables over the tasks and projects rows, kept current by
+-- triggers. Create them by starting the app once, then repair at any time
+-- with:
+--
+--   flask rebuild-search-index
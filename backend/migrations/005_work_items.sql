@@ -0,0 +1,23 @@
+-- Precomputed "My Work" inbox behind GET /tasks/inbox.
+--
+-- db.create_all() creates the work_items table on startup; this is the same
+-- DDL for deployments that manage the schema by hand. Fill the inbox for
+-- existing data once:
+--
+--   flask rebuild-inbox
+--
+-- flask check-inbox reports rows that drifted from the tasks and project
+-- memberships (exit status 1), and --fix rebuilds them.
+
+CREATE TABLE IF NOT EXISTS work_items (
+    user_id INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    due_key DATE NOT NULL,
+    priority_rank INTEGER NOT NULL,
+    PRIMARY KEY (user_id, task_id)
+);
+
+CREATE INDEX ix_work_items_inbox ON work_items (user_id, due_key, priority_rank, task_id);
+CREATE INDEX ix_work_items_task_id ON work_items (task_id);
+CREATE INDEX ix_work_items_project_user ON work_items (project_id, user_id);
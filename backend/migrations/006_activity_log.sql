@@ -0,0 +1,20 @@
+-- Activity log behind GET /projects/<id>/activity.
+--
+-- db.create_all() creates the table on startup; this is the same DDL for
+-- deployments that manage the schema by hand. Old entries are removed with
+--
+--   flask prune-activity-log --days 180
+
+-- MySQL
+CREATE TABLE IF NOT EXISTS activity_log (
+    id INTEGER NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    task_id INTEGER,
+    user_id INTEGER,
+    action VARCHAR(40) NOT NULL,
+    data JSON,
+    created_at DATETIME
+);
+
+CREATE INDEX ix_activity_log_project_id_id ON activity_log (project_id, id);
+CREATE INDEX ix_activity_log_created_at ON activity_log (created_at);
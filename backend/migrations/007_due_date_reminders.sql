@@ -0,0 +1,29 @@
+-- Due-date reminders: the notifications table and the indexes the scanner
+-- walks one due date at a time.
+--
+-- db.create_all() creates the notifications table on startup but does not
+-- add indexes to the existing tasks and projects tables. Schedule the scan
+-- with cron (or run `flask run-scheduler` as a long-lived process):
+--
+--   */5 * * * * flask scan-due-dates
+
+CREATE INDEX ix_tasks_due_date_id ON tasks (due_date, id);
+CREATE INDEX ix_projects_due_date_id ON projects (due_date, id);
+
+-- MySQL
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    entity VARCHAR(20) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    kind VARCHAR(20) NOT NULL,
+    due_date DATE NOT NULL,
+    title VARCHAR(200),
+    created_at DATETIME,
+    delivered_at DATETIME,
+    CONSTRAINT uq_notifications_window UNIQUE (entity, entity_id, kind, due_date, user_id)
+);
+
+CREATE INDEX ix_notifications_user_id_id ON notifications (user_id, id);
+CREATE INDEX ix_notifications_delivered_at_id ON notifications (delivered_at, id);
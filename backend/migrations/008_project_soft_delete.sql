@@ -0,0 +1,37 @@
+-- Soft-deleted projects and database-level cascades.
+--
+-- DELETE /projects/<id> now only sets projects.deleted_at; the owner can
+-- restore the project for PROJECT_RESTORE_DAYS, after which its tasks,
+-- activity and notifications are removed in batches. Schedule the purge
+-- with cron (or run `flask run-scheduler` as a long-lived process):
+--
+--   0 * * * * flask purge-deleted-projects
+
+ALTER TABLE projects ADD COLUMN deleted_at TIMESTAMP;
+CREATE INDEX ix_projects_deleted_at ON projects (deleted_at);
+
+-- PostgreSQL: let the database remove tasks and memberships with their
+-- project, so a stray ORM delete never loads the collections first.
+ALTER TABLE tasks DROP CONSTRAINT tasks_project_id_fkey;
+ALTER TABLE tasks ADD CONSTRAINT tasks_project_id_fkey
+    FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE;
+ALTER TABLE project_members DROP CONSTRAINT project_members_project_id_fkey;
+ALTER TABLE project_members ADD CONSTRAINT project_members_project_id_fkey
+    FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE;
+
+-- MySQL (the generated constraint names may differ; see SHOW CREATE TABLE)
+ALTER TABLE projects ADD COLUMN deleted_at DATETIME;
+CREATE INDEX ix_projects_deleted_at ON projects (deleted_at);
+ALTER TABLE tasks DROP FOREIGN KEY tasks_ibfk_1;
+ALTER TABLE tasks ADD CONSTRAINT tasks_project_id_fkey
+    FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE;
+ALTER TABLE project_members DROP FOREIGN KEY project_members_ibfk_1;
+ALTER TABLE project_members ADD CONSTRAINT project_members_project_id_fkey
+    FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE;
+
+-- SQLite cannot alter foreign keys and only enforces them with
+-- PRAGMA foreign_keys = ON; the purge deletes the rows itself, so only the
+-- column and index above are needed there:
+--
+--   ALTER TABLE projects ADD COLUMN deleted_at DATETIME;
+--   CREATE INDEX ix_projects_deleted_at ON projects (deleted_at);
@@ -0,0 +1,27 @@
+-- Bulk task imports: one row per uploaded file, holding its progress so an
+-- interrupted import resumes after the last committed batch.
+--
+-- db.create_all() creates the import_jobs table on startup. Uploads are
+-- stored under instance/imports/ until their job completes.
+
+-- MySQL
+CREATE TABLE IF NOT EXISTS import_jobs (
+    id INTEGER NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    user_id INTEGER,
+    format VARCHAR(10) NOT NULL,
+    filename VARCHAR(255),
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    size BIGINT NOT NULL DEFAULT 0,
+    bytes_read BIGINT NOT NULL DEFAULT 0,
+    rows_read INTEGER NOT NULL DEFAULT 0,
+    rows_imported INTEGER NOT NULL DEFAULT 0,
+    rows_failed INTEGER NOT NULL DEFAULT 0,
+    errors JSON,
+    message TEXT,
+    created_at DATETIME,
+    updated_at DATETIME,
+    finished_at DATETIME
+);
+
+CREATE INDEX ix_import_jobs_project_id_id ON import_jobs (project_id, id);
@@ -4,4 +4,5 @@ from app import create_app
 app = create_app(os.getenv('FLASK_ENV', 'default'))
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Development server only; see wsgi.py and gunicorn.conf.py for production
+    app.run(host='0.0.0.0', port=5000, debug=app.config['DEBUG'])
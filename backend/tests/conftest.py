@@ -0,0 +1,68 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.config import Config, config
+from app.models import User
+
+class TestingConfig(Config):
+    TESTING = True
+    JWT_SECRET_KEY = 'testing-jwt-secret-key-of-32-bytes!'
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    # Identities are integer user ids
+    JWT_VERIFY_SUB = False
+    SYNC_SETTLE_SECONDS = 0
+    BACKGROUND_TASKS_INLINE = True
+    BCRYPT_ROUNDS = 4
+    PASSWORD_HASH_EXECUTOR = 'inline'
+
+config['testing'] = TestingConfig
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app('testing')
+    # An absolute path keeps uploads out of the instance folder
+    app.config['IMPORT_DIR'] = str(tmp_path / 'imports')
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    """Create a user and return it with the headers of an authenticated request"""
+    def make_user(name, **fields):
+        user = User(name=name, email=f'{name}@example.com', password_hash='x', **fields)
+        db.session.add(user)
+        db.session.commit()
+        return user, {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+    return make_user
+
+class StatementCounter:
+    """Counts the statements sent to the database while active"""
+    
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+    
+    def _record(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+    
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+    
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+    
+    @property
+    def count(self):
+        return len(self.statements)
+
+@pytest.fixture
+def count_statements(app):
+    return lambda: StatementCounter(db.engine)
@@ -0,0 +1,67 @@
+from app import create_app, db
+from app.config import config
+from app.models import Project, User
+from app.utils.ratelimit import login_limiter
+
+def test_profile_update_invalidates_cached_project_responses(app, client, make_user):
+    owner, headers = make_user('owner')
+    member, member_headers = make_user('member')
+    project = Project(name='Project', owner_id=owner.id)
+    project.members.append(member)
+    db.session.add(project)
+    db.session.commit()
+    
+    def member_names():
+        response = client.get(f'/api/v1/projects/{project.id}', headers=headers)
+        assert response.status_code == 200
+        return sorted(user['name'] for user in response.get_json()['project']['members'])
+    
+    assert member_names() == ['member']
+    assert client.put('/api/v1/auth/profile', headers=member_headers, json={'name': 'renamed'}).status_code == 200
+    assert member_names() == ['renamed']
+
+def test_login_rejects_non_string_credentials(client):
+    for body in ({'email': ['a@example.com'], 'password': 'x'}, {'email': 'a@example.com', 'password': {'x': 1}}):
+        response = client.post('/api/v1/auth/login', json=body)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Email and password must be strings'
+
+def _login_statuses(client, forwarded_for):
+    return [
+        client.post(
+            '/api/v1/auth/login',
+            json={'email': f'user{number}@example.com', 'password': 'x'},
+            headers={'X-Forwarded-For': address},
+            environ_base={'REMOTE_ADDR': '10.0.0.1'}
+        ).status_code
+        for number, address in enumerate(forwarded_for)
+    ]
+
+def test_login_ip_limit_uses_the_peer_address_by_default(app, client, monkeypatch):
+    monkeypatch.setattr(login_limiter, '_windows', {})
+    app.config['LOGIN_RATE_LIMIT_IP'] = 1
+    
+    assert _login_statuses(client, ['203.0.113.1', '203.0.113.2']) == [401, 429]
+
+def test_login_ip_limit_uses_the_forwarded_address_behind_a_proxy(monkeypatch):
+    class ProxiedConfig(config['testing']):
+        PROXY_FIX_X_FOR = 1
+        LOGIN_RATE_LIMIT_IP = 1
+    
+    monkeypatch.setitem(config, 'proxied', ProxiedConfig)
+    monkeypatch.setattr(login_limiter, '_windows', {})
+    client = create_app('proxied').test_client()
+    
+    assert _login_statuses(client, ['203.0.113.1', '203.0.113.2', '203.0.113.1']) == [401, 401, 429]
+
+def test_login_rejects_inactive_users(client):
+    assert client.post('/api/v1/auth/register', json={
+        'name': 'user', 'email': 'user@example.com', 'password': 'secret'
+    }).status_code == 201
+    assert client.post('/api/v1/auth/login', json={'email': 'user@example.com', 'password': 'secret'}).status_code == 200
+    
+    User.query.filter_by(email='user@example.com').update({'status': 'inactive'})
+    db.session.commit()
+    response = client.post('/api/v1/auth/login', json={'email': 'user@example.com', 'password': 'secret'})
+    assert response.status_code == 403
+    assert 'access_token' not in response.get_json()
@@ -0,0 +1,90 @@
+import logging
+import pytest
+from app import db
+from app.models import Project
+from app.utils import events
+from app.utils.events import InProcessBroker, RedisBroker
+
+def _stream_start(client, project_id, headers):
+    response = client.get(f'/api/v1/projects/{project_id}/events', headers=headers, buffered=False)
+    assert response.status_code == 200
+    chunks = response.iter_encoded()
+    start = next(chunks)
+    while not start.endswith(b'\n\n'):
+        start += next(chunks)
+    response.close()
+    return start.decode('utf-8')
+
+@pytest.fixture
+def project(make_user):
+    owner, headers = make_user('owner')
+    project = Project(name='Project', owner_id=owner.id)
+    db.session.add(project)
+    db.session.commit()
+    return project.id, headers
+
+def test_stream_starts_with_the_current_version(client, project):
+    project_id, headers = project
+    start = _stream_start(client, project_id, headers)
+    assert start.startswith('retry: 3000\nid: ')
+    assert 'resync' not in start
+
+def test_reconnect_after_missed_events_resyncs(client, project):
+    project_id, headers = project
+    version = _stream_start(client, project_id, headers).split('id: ')[1].split('\n')[0]
+    
+    assert 'resync' not in _stream_start(client, project_id, {**headers, 'Last-Event-ID': version})
+    
+    client.put(f'/api/v1/projects/{project_id}', headers=headers, json={'name': 'Renamed'})
+    start = _stream_start(client, project_id, {**headers, 'Last-Event-ID': version})
+    assert 'event: resync' in start
+    assert f'id: {version}\n' not in start
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = messages
+        self.closed = False
+    
+    def listen(self):
+        for message in self.messages:
+            if isinstance(message, Exception):
+                raise message
+            yield message
+    
+    def close(self):
+        self.closed = True
+
+class StopListening(BaseException):
+    pass
+
+def test_redis_listener_reconnects_and_resyncs(monkeypatch, caplog):
+    message = {'channel': b'pm:events:project:1', 'data': b'{}'}
+    broken = FakePubSub([message, ConnectionError('connection lost')])
+    reconnected = FakePubSub([message])
+    
+    broker = RedisBroker.__new__(RedisBroker)
+    broker.logger = logging.getLogger('test-events')
+    broker.max_retry_seconds = 30
+    broker._local = InProcessBroker()
+    broker._pubsub = broken
+    monkeypatch.setattr(broker, '_connect', lambda: reconnected)
+    subscription = broker.subscribe('project:1')
+    
+    delays = []
+    def sleep(delay):
+        delays.append(delay)
+        if len(delays) == 2:
+            raise StopListening()
+    monkeypatch.setattr(events.time, 'sleep', sleep)
+    
+    with caplog.at_level(logging.INFO, 'test-events'), pytest.raises(StopListening):
+        # The second subscription ends like a dropped connection, and the
+        # test stops the listener when it waits to reconnect again
+        broker._listen()
+    
+    assert broken.closed
+    assert subscription.get(timeout=0) == '{}'
+    assert subscription.get(timeout=0) == '{}'
+    assert subscription.overflowed
+    assert 'Event broker lost its connection' in caplog.text
+    assert 'Event broker reconnected' in caplog.text
@@ -0,0 +1,37 @@
+import os
+import runpy
+import pytest
+
+CONFIG = os.path.join(os.path.dirname(__file__), '..', 'gunicorn.conf.py')
+
+@pytest.fixture
+def environ(monkeypatch):
+    for name in ('WEB_CONCURRENCY', 'RESPONSE_CACHE_BACKEND', 'EVENT_BROKER', 'PASSWORD_HASH_WORKERS'):
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+def test_several_workers_disable_process_local_backends(environ):
+    environ.setenv('WEB_CONCURRENCY', '3')
+    runpy.run_path(CONFIG)
+    assert os.environ['RESPONSE_CACHE_BACKEND'] == 'none'
+    assert os.environ['EVENT_BROKER'] == 'none'
+
+@pytest.mark.parametrize('name, backend', [('RESPONSE_CACHE_BACKEND', 'lru'), ('EVENT_BROKER', 'memory')])
+def test_several_workers_refuse_process_local_backends(environ, name, backend):
+    environ.setenv('WEB_CONCURRENCY', '3')
+    environ.setenv(name, backend)
+    with pytest.raises(RuntimeError, match=name):
+        runpy.run_path(CONFIG)
+
+def test_shared_backends_and_single_workers_are_kept(environ):
+    environ.setenv('WEB_CONCURRENCY', '3')
+    environ.setenv('RESPONSE_CACHE_BACKEND', 'redis')
+    environ.setenv('EVENT_BROKER', 'redis')
+    runpy.run_path(CONFIG)
+    assert os.environ['RESPONSE_CACHE_BACKEND'] == 'redis'
+    
+    environ.delenv('RESPONSE_CACHE_BACKEND')
+    environ.delenv('EVENT_BROKER')
+    environ.setenv('WEB_CONCURRENCY', '1')
+    runpy.run_path(CONFIG)
+    assert 'RESPONSE_CACHE_BACKEND' not in os.environ
@@ -0,0 +1,111 @@
+import io
+import json
+import os
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import ImportJob, Project, Task
+from app.utils.imports import claim_import, create_import, import_path, run_import
+
+class Crash(Exception):
+    pass
+
+@pytest.fixture
+def project(make_user):
+    owner, headers = make_user('owner')
+    project = Project(name='Project', owner_id=owner.id)
+    db.session.add(project)
+    db.session.commit()
+    return project.id, owner, headers
+
+def _titles(project_id):
+    return sorted(title for title, in db.session.query(Task.title).filter_by(project_id=project_id))
+
+def test_csv_import(client, project, make_user):
+    project_id, owner, headers = project
+    assignee, _ = make_user('assignee')
+    data = (
+        '﻿Title,Status,Assignee_Email,Due_Date,Estimated_Hours,Description\n'
+        'First,in-progress,assignee@example.com,2030-01-31,2.5,"Two\nlines"\n'
+        'Second,,,,,\n'
+        '\n'
+        ',todo,,,,\n'
+        'Third,,nobody@example.com,,,\n'
+        'Fourth,,,not-a-date,,\n'
+    ).encode('utf-8')
+    
+    response = client.post(
+        f'/api/v1/projects/{project_id}/import', headers=headers,
+        data={'file': (io.BytesIO(data), 'tasks.csv')}, content_type='multipart/form-data'
+    )
+    assert response.status_code == 202
+    job = client.get(f'/api/v1/projects/{project_id}/imports/{response.get_json()["job"]["id"]}', headers=headers).get_json()['job']
+    
+    assert job['status'] == 'completed'
+    assert job['progress'] == 1.0
+    assert (job['rows_read'], job['rows_imported'], job['rows_failed']) == (5, 2, 3)
+    assert job['errors'] == [
+        {'row': 3, 'error': 'Title is required'},
+        {'row': 4, 'error': 'Unknown assignee: nobody@example.com'},
+        {'row': 5, 'error': 'Invalid due_date: not-a-date'}
+    ]
+    first = Task.query.filter_by(project_id=project_id, title='First').one()
+    assert (first.status, first.assignee_id, str(first.due_date), first.estimated_hours, first.description) == (
+        'in-progress', assignee.id, '2030-01-31', 2.5, 'Two\nlines'
+    )
+    assert _titles(project_id) == ['First', 'Second']
+    assert not os.path.exists(import_path(db.session.get(ImportJob, job['id'])))
+
+def test_ndjson_import(app, client, project):
+    project_id, owner, headers = project
+    app.config['IMPORT_MAX_ERRORS'] = 2
+    lines = [json.dumps({'title': 'First', 'assignee_id': owner.id}), '[1]', '{broken', json.dumps({'title': 'Second'}), '"text"']
+    
+    response = client.post(f'/api/v1/projects/{project_id}/import?format=ndjson', headers=headers, data='\n'.join(lines).encode())
+    assert response.status_code == 202
+    job = db.session.get(ImportJob, response.get_json()['job']['id'])
+    
+    assert (job.status, job.rows_read, job.rows_imported, job.rows_failed) == ('completed', 5, 2, 3)
+    # Only the first IMPORT_MAX_ERRORS errors are kept
+    assert job.errors == [{'row': 2, 'error': 'Each line must be a JSON object'}, {'row': 3, 'error': 'Invalid JSON'}]
+    assert _titles(project_id) == ['First', 'Second']
+
+@pytest.mark.parametrize('fmt, data', [
+    ('csv', 'title,status\n' + ''.join(f'Task {number},not-started\n' for number in range(7))),
+    ('ndjson', ''.join(json.dumps({'title': f'Task {number}'}) + '\n' for number in range(7)))
+])
+def test_interrupted_import_resumes_without_duplicates(app, project, fmt, data):
+    project_id, owner, _ = project
+    app.config['IMPORT_BATCH_SIZE'] = 3
+    job = create_import(project_id, owner.id, fmt, [data.encode()])
+    
+    def crash(job):
+        raise Crash()
+    
+    assert claim_import(job.id)
+    with pytest.raises(Crash):
+        run_import(job.id, progress=crash)
+    job = db.session.get(ImportJob, job.id)
+    assert (job.status, job.rows_read, job.rows_imported) == ('failed', 3, 3)
+    assert 0 < job.bytes_read < job.size
+    
+    assert claim_import(job.id)
+    job = run_import(job.id)
+    assert (job.status, job.rows_read, job.rows_imported, job.rows_failed) == ('completed', 7, 7, 0)
+    assert _titles(project_id) == [f'Task {number}' for number in range(7)]
+
+def test_only_stalled_running_imports_can_be_claimed(app, project):
+    project_id, owner, _ = project
+    job = create_import(project_id, owner.id, 'csv', [b'title\nTask\n'])
+    
+    assert claim_import(job.id)
+    # Running and recently updated: its worker is alive
+    assert not claim_import(job.id)
+    
+    stalled = datetime.utcnow() - timedelta(seconds=app.config['IMPORT_STALE_SECONDS'] + 1)
+    ImportJob.query.filter_by(id=job.id).update({'updated_at': stalled})
+    db.session.commit()
+    assert claim_import(job.id)
+    
+    run_import(job.id)
+    assert not claim_import(job.id)
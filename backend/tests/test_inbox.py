@@ -0,0 +1,77 @@
+from app import db
+from app.models import WorkItem
+
+def _check_inbox(app):
+    result = app.test_cli_runner().invoke(args=['check-inbox'])
+    assert result.exit_code == 0, result.output
+    assert 'Inbox is consistent' in result.output
+
+def _inbox_ids(client, headers):
+    response = client.get('/api/v1/tasks/inbox', headers=headers)
+    assert response.status_code == 200
+    return [task['id'] for task in response.get_json()['tasks']]
+
+def test_inbox_does_not_drift(app, client, make_user):
+    owner, headers = make_user('owner')
+    member, member_headers = make_user('member')
+    other, other_headers = make_user('other')
+    
+    project_id = client.post('/api/v1/projects', headers=headers, json={'name': 'Project'}).get_json()['project']['id']
+    for user in (member, other):
+        assert client.post(f'/api/v1/projects/{project_id}/members', headers=headers, json={'user_id': user.id}).status_code == 200
+    _check_inbox(app)
+    
+    # Create
+    first = client.post('/api/v1/tasks', headers=headers, json={
+        'title': 'First', 'project_id': project_id, 'due_date': '2030-01-01', 'priority': 'low'
+    }).get_json()['task']['id']
+    second = client.post('/api/v1/tasks', headers=headers, json={
+        'title': 'Second', 'project_id': project_id, 'assignee_id': other.id, 'priority': 'urgent'
+    }).get_json()['task']['id']
+    _check_inbox(app)
+    assert _inbox_ids(client, member_headers) == [first, second]
+    
+    # Update the sort keys
+    assert client.put(f'/api/v1/tasks/{second}', headers=headers, json={'due_date': '2029-06-01'}).status_code == 200
+    _check_inbox(app)
+    assert _inbox_ids(client, member_headers) == [second, first]
+    
+    # Reorder into the completed column, which leaves the inbox
+    assert client.post('/api/v1/tasks/reorder', headers=headers, json={
+        'task_id': first, 'position': 1, 'status': 'completed'
+    }).status_code == 200
+    _check_inbox(app)
+    assert _inbox_ids(client, member_headers) == [second]
+    
+    # Bulk update, create and delete
+    response = client.post('/api/v1/tasks/bulk', headers=headers, json={'operations': [
+        {'op': 'update', 'id': first, 'data': {'status': 'in-progress'}},
+        {'op': 'create', 'data': {'title': 'Third', 'project_id': project_id, 'due_date': '2028-01-01'}},
+        {'op': 'delete', 'id': second}
+    ]})
+    assert response.status_code == 200
+    third = response.get_json()['results'][1]['id']
+    _check_inbox(app)
+    assert _inbox_ids(client, member_headers) == [third, first]
+    
+    # Member removal
+    assert client.delete(f'/api/v1/projects/{project_id}/members/{member.id}', headers=headers).status_code == 200
+    _check_inbox(app)
+    assert _inbox_ids(client, member_headers) == []
+    assert _inbox_ids(client, other_headers) == [third, first]
+
+def test_check_inbox_reports_and_fixes_drift(app, client, make_user):
+    owner, headers = make_user('owner')
+    project_id = client.post('/api/v1/projects', headers=headers, json={'name': 'Project'}).get_json()['project']['id']
+    client.post('/api/v1/tasks', headers=headers, json={'title': 'Task', 'project_id': project_id})
+    
+    db.session.execute(db.delete(WorkItem))
+    db.session.commit()
+    
+    result = app.test_cli_runner().invoke(args=['check-inbox'])
+    assert result.exit_code == 1
+    assert '1 missing rows, 0 stale rows' in result.output
+    
+    result = app.test_cli_runner().invoke(args=['check-inbox', '--fix'])
+    assert result.exit_code == 0
+    _check_inbox(app)
@@ -0,0 +1,68 @@
+from datetime import date, datetime, timedelta
+from app import db
+from app.models import Notification, Project, Task
+from app.utils import notifications
+from app.utils.notifications import scan_due_dates
+
+TODAY = date(2030, 6, 15)
+
+def _project(owner, **fields):
+    project = Project(name='Project', owner_id=owner.id, **fields)
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+def _task(project, title, due_date, **fields):
+    task = Task(title=title, project_id=project.id, due_date=due_date, **fields)
+    db.session.add(task)
+    db.session.commit()
+    return task
+
+def _reminders():
+    return sorted((n.title, n.kind, n.user_id) for n in Notification.query)
+
+def test_scanning_twice_creates_each_reminder_once(make_user):
+    owner, _ = make_user('owner')
+    assignee, _ = make_user('assignee')
+    project = _project(owner)
+    _task(project, 'Tomorrow', TODAY + timedelta(days=1), assignee_id=assignee.id)
+    _task(project, 'Late', TODAY - timedelta(days=2))
+    
+    assert scan_due_dates(TODAY) == 2
+    assert scan_due_dates(TODAY) == 0
+    assert _reminders() == [('Late', 'overdue', owner.id), ('Tomorrow', 'due_soon', assignee.id)]
+
+def test_concurrent_scan_rows_are_kept_once(make_user, monkeypatch):
+    owner, _ = make_user('owner')
+    project = _project(owner)
+    first = _task(project, 'First', TODAY)
+    _task(project, 'Second', TODAY)
+    
+    class RacingDatetime(datetime):
+        """Lets another scan insert a reminder between the existence check and the insert"""
+        
+        @classmethod
+        def utcnow(cls):
+            monkeypatch.setattr(notifications, 'datetime', datetime)
+            db.session.execute(db.insert(Notification).values(
+                user_id=owner.id, project_id=project.id, entity='task', entity_id=first.id,
+                kind='due_soon', due_date=TODAY, title='First'
+            ))
+            return datetime.utcnow()
+    
+    monkeypatch.setattr(notifications, 'datetime', RacingDatetime)
+    # Only the Second reminder is this scan's; the unique constraint rejects its duplicate of First
+    assert scan_due_dates(TODAY) == 1
+    assert _reminders() == [('First', 'due_soon', owner.id), ('Second', 'due_soon', owner.id)]
+
+def test_done_tasks_and_deleted_projects_are_skipped(app, make_user):
+    owner, _ = make_user('owner')
+    project = _project(owner)
+    deleted = _project(owner, deleted_at=datetime.utcnow(), due_date=TODAY)
+    for status in app.config['TASK_DONE_STATUSES']:
+        _task(project, status, TODAY, status=status)
+    _task(project, 'Open', TODAY, status='in-progress')
+    _task(deleted, 'In deleted project', TODAY)
+    
+    assert scan_due_dates(TODAY) == 1
+    assert _reminders() == [('Open', 'due_soon', owner.id)]
@@ -0,0 +1,94 @@
+import os
+from datetime import date, datetime, timedelta
+from app import db
+from app.models import Activity, ImportJob, Notification, Project, Task, TaskRollup, WorkItem, project_members
+from app.utils.deletion import purge_deleted_projects, purge_project
+from app.utils.imports import create_import, import_path
+from app.utils.notifications import scan_due_dates
+
+def _create_project(client, headers, name='Project'):
+    return client.post('/api/v1/projects', headers=headers, json={'name': name}).get_json()['project']['id']
+
+def _create_task(client, headers, project_id, title='Task', **fields):
+    return client.post('/api/v1/tasks', headers=headers, json={'project_id': project_id, 'title': title, **fields}).get_json()['task']['id']
+
+def _age_deletion(project_id, days):
+    Project.query.filter_by(id=project_id).update({'deleted_at': datetime.utcnow() - timedelta(days=days)})
+    db.session.commit()
+
+def test_deleted_project_is_hidden_until_restored(client, make_user):
+    owner, headers = make_user('owner')
+    project_id = _create_project(client, headers)
+    _create_task(client, headers, project_id, title='Needle')
+    
+    def visible():
+        return (
+            [project['id'] for project in client.get('/api/v1/projects', headers=headers).get_json()['projects']],
+            [task['title'] for task in client.get('/api/v1/tasks', headers=headers).get_json()['tasks']],
+            [task['title'] for task in client.get('/api/v1/search?q=Needle', headers=headers).get_json()['tasks']]
+        )
+    
+    assert visible() == ([project_id], ['Needle'], ['Needle'])
+    assert client.delete(f'/api/v1/projects/{project_id}', headers=headers).status_code == 200
+    assert visible() == ([], [], [])
+    assert client.get(f'/api/v1/projects/{project_id}', headers=headers).status_code == 404
+    
+    deleted = client.get('/api/v1/projects/deleted', headers=headers).get_json()['projects']
+    assert [project['id'] for project in deleted] == [project_id]
+    assert client.post(f'/api/v1/projects/{project_id}/restore', headers=headers).status_code == 200
+    assert visible() == ([project_id], ['Needle'], ['Needle'])
+
+def test_restore_window_expires(app, client, make_user):
+    owner, headers = make_user('owner')
+    project_id = _create_project(client, headers)
+    assert client.delete(f'/api/v1/projects/{project_id}', headers=headers).status_code == 200
+    
+    _age_deletion(project_id, app.config['PROJECT_RESTORE_DAYS'] - 1)
+    assert [project['id'] for project in client.get('/api/v1/projects/deleted', headers=headers).get_json()['projects']] == [project_id]
+    
+    _age_deletion(project_id, app.config['PROJECT_RESTORE_DAYS'] + 1)
+    assert client.get('/api/v1/projects/deleted', headers=headers).get_json()['projects'] == []
+    assert client.post(f'/api/v1/projects/{project_id}/restore', headers=headers).status_code == 410
+
+def test_purge_deleted_projects_removes_dependent_rows(app, client, make_user):
+    owner, headers = make_user('owner')
+    member, _ = make_user('member')
+    project_id = _create_project(client, headers)
+    kept_id = _create_project(client, headers, name='Kept')
+    for target in (project_id, kept_id):
+        assert client.post(f'/api/v1/projects/{target}/members', headers=headers, json={'user_id': member.id}).status_code == 200
+        _create_task(client, headers, target, assignee_id=member.id, due_date=date.today().isoformat())
+    create_import(project_id, owner.id, 'csv', [b'title\nFirst\n'])
+    scan_due_dates()
+    
+    def rows(target):
+        return {
+            model.__name__: model.query.filter_by(project_id=target).count()
+            for model in (Task, Activity, Notification, TaskRollup, WorkItem, ImportJob)
+        } | {'members': db.session.query(project_members).filter_by(project_id=target).count()}
+    
+    assert all(rows(project_id)[name] for name in ('Task', 'Activity', 'Notification', 'TaskRollup', 'WorkItem', 'ImportJob', 'members'))
+    kept = rows(kept_id)
+    
+    assert client.delete(f'/api/v1/projects/{project_id}', headers=headers).status_code == 200
+    # Still restorable: nothing is purged yet
+    assert purge_deleted_projects() == 0
+    _age_deletion(project_id, app.config['PROJECT_RESTORE_DAYS'] + 1)
+    assert purge_deleted_projects() == 1
+    
+    assert db.session.get(Project, project_id) is None
+    assert set(rows(project_id).values()) == {0}
+    assert rows(kept_id) == kept
+
+def test_purge_removes_import_jobs_and_uploads(client, make_user):
+    owner, headers = make_user('owner')
+    project_id = _create_project(client, headers)
+    job = create_import(project_id, owner.id, 'csv', [b'title\nFirst\n'])
+    path = import_path(job)
+    assert os.path.exists(path)
+    
+    assert client.delete(f'/api/v1/projects/{project_id}', headers=headers).status_code == 200
+    purge_project(project_id)
+    
+    assert ImportJob.query.filter_by(project_id=project_id).count() == 0
+    assert not os.path.exists(path)
@@ -0,0 +1,72 @@
+from app import db
+from app.models import Task
+from app.utils.rollups import UNASSIGNED
+
+def _create_task(client, headers, project_id, **fields):
+    response = client.post('/api/v1/tasks', headers=headers, json={'project_id': project_id, **fields})
+    assert response.status_code == 201
+    return response.get_json()['task']['id']
+
+def _grouped_tasks(project_id):
+    """The stats rollups should hold, computed straight from the tasks table"""
+    rows = db.session.query(
+        db.func.coalesce(Task.assignee_id, UNASSIGNED),
+        db.func.coalesce(Task.status, 'not-started'),
+        db.func.count(Task.id),
+        db.func.coalesce(db.func.sum(Task.estimated_hours), 0),
+        db.func.coalesce(db.func.sum(Task.actual_hours), 0)
+    ).filter(Task.project_id == project_id).group_by(
+        db.func.coalesce(Task.assignee_id, UNASSIGNED),
+        db.func.coalesce(Task.status, 'not-started')
+    ).all()
+    return {(assignee_id or None, status): (count, round(estimated, 2), round(actual, 2))
+            for assignee_id, status, count, estimated, actual in rows}
+
+def _stats_groups(stats):
+    totals = {}
+    for assignee in stats['assignees']:
+        for status, count in assignee['by_status'].items():
+            totals[(assignee['assignee_id'], status)] = count
+    return totals
+
+def test_stats_match_tasks_after_mixed_writes(client, make_user):
+    owner, headers = make_user('owner')
+    member, _ = make_user('member')
+    project_id = client.post('/api/v1/projects', headers=headers, json={'name': 'Project'}).get_json()['project']['id']
+    assert client.post(f'/api/v1/projects/{project_id}/members', headers=headers, json={'user_id': member.id}).status_code == 200
+    
+    ids = [
+        _create_task(client, headers, project_id, title=f'Task {number}', estimated_hours=number, actual_hours=0.5)
+        for number in range(6)
+    ]
+    _create_task(client, headers, project_id, title='Assigned', assignee_id=member.id, status='in-progress')
+    
+    assert client.put(f'/api/v1/tasks/{ids[0]}', headers=headers, json={'status': 'done', 'actual_hours': 3}).status_code == 200
+    assert client.put(f'/api/v1/tasks/{ids[1]}', headers=headers, json={'assignee_id': member.id}).status_code == 200
+    assert client.put(f'/api/v1/tasks/{ids[2]}', headers=headers, json={'assignee_id': owner.id, 'status': 'in-progress'}).status_code == 200
+    response = client.post('/api/v1/tasks/bulk', headers=headers, json={'operations': [
+        {'op': 'create', 'data': {'title': 'Bulk', 'project_id': project_id, 'assignee_id': owner.id, 'estimated_hours': 4}},
+        {'op': 'update', 'id': ids[1], 'data': {'status': 'done', 'estimated_hours': 7.25}},
+        {'op': 'update', 'id': ids[2], 'data': {'assignee_id': None}},
+        {'op': 'update', 'id': ids[3], 'data': {'status': 'in-progress', 'assignee_id': member.id}},
+        {'op': 'delete', 'id': ids[4]}
+    ]})
+    assert response.status_code == 200
+    assert all(result['status'] != 'error' for result in response.get_json()['results'])
+    assert client.delete(f'/api/v1/tasks/{ids[5]}', headers=headers).status_code == 200
+    
+    stats = client.get(f'/api/v1/projects/{project_id}/stats', headers=headers).get_json()['stats']
+    expected = _grouped_tasks(project_id)
+    
+    assert _stats_groups(stats) == {key: count for key, (count, _, _) in expected.items()}
+    by_status = {}
+    for (_, status), (count, _, _) in expected.items():
+        by_status[status] = by_status.get(status, 0) + count
+    assert stats['by_status'] == by_status
+    assert stats['tasks_count'] == Task.query.filter_by(project_id=project_id).count() == 6
+    assert stats['estimated_hours'] == round(sum(estimated for _, estimated, _ in expected.values()), 2)
+    assert stats['actual_hours'] == round(sum(actual for _, _, actual in expected.values()), 2)
+    for assignee in stats['assignees']:
+        groups = [value for (assignee_id, _), value in expected.items() if assignee_id == assignee['assignee_id']]
+        assert assignee['estimated_hours'] == round(sum(estimated for _, estimated, _ in groups), 2)
+        assert assignee['actual_hours'] == round(sum(actual for _, _, actual in groups), 2)
@@ -0,0 +1,115 @@
+import shutil
+import time
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.config import config
+from app.models import Project, User
+from app.utils.cache import LRUCache
+
+class SharedLRUCache(LRUCache):
+    """Stands in for a cache all workers share"""
+    shared = True
+
+@pytest.fixture
+def replicated(tmp_path):
+    """
+    An app on two SQLite files, where the replica has not seen the last write.
+    
+    Project 1 is called 'Original' on the replica and 'Updated' on the
+    primary, so a response tells which database it was read from.
+    """
+    class ReplicatedConfig(config['testing']):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/primary.db'
+        DB_REPLICA_URLS = [f'sqlite:///{tmp_path}/replica.db']
+        RESPONSE_CACHE_BACKEND = 'none'
+    
+    config['replicated'] = ReplicatedConfig
+    app = create_app('replicated')
+    with app.app_context():
+        user = User(name='owner', email='owner@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Project(name='Original', owner_id=user.id))
+        db.session.commit()
+        shutil.copy(tmp_path / 'primary.db', tmp_path / 'replica.db')
+        
+        Project.query.get(1).name = 'Updated'
+        db.session.commit()
+        app.config['test_headers'] = {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+        db.session.remove()
+    yield app
+    del config['replicated']
+
+def _project_name(app, client=None):
+    client = client or app.test_client()
+    response = client.get('/api/v1/projects/1', headers=app.config['test_headers'])
+    assert response.status_code == 200
+    return response.get_json()['project']['name']
+
+def _replica(app):
+    return app.extensions['db_replicas'].replicas[0]
+
+def test_reads_go_to_the_replica(replicated):
+    assert _project_name(replicated) == 'Original'
+
+def test_writes_go_to_the_primary(replicated):
+    client = replicated.test_client()
+    response = client.put('/api/v1/projects/1', headers=replicated.config['test_headers'], json={'description': 'New'})
+    assert response.status_code == 200
+    assert response.get_json()['project']['name'] == 'Updated'
+
+def test_writer_sticks_to_the_primary_by_cookie(replicated):
+    client = replicated.test_client()
+    response = client.put('/api/v1/projects/1', headers=replicated.config['test_headers'], json={'description': 'New'})
+    assert replicated.config['DB_STICKY_COOKIE'] in response.headers['Set-Cookie']
+    
+    assert _project_name(replicated, client) == 'Updated'
+    # Without the cookie and with a per-process cache, reads stay on the replica
+    assert _project_name(replicated) == 'Original'
+
+def test_writer_sticks_to_the_primary_by_identity(replicated):
+    replicated.extensions['response_cache'] = SharedLRUCache()
+    replicated.test_client().put('/api/v1/projects/1', headers=replicated.config['test_headers'], json={'description': 'New'})
+    
+    assert _project_name(replicated) == 'Updated'
+
+def test_identity_is_not_remembered_in_a_per_process_cache(replicated):
+    replicated.extensions['response_cache'] = LRUCache()
+    replicated.test_client().put('/api/v1/projects/1', headers=replicated.config['test_headers'], json={'description': 'New'})
+    
+    assert _project_name(replicated) == 'Original'
+
+def test_replica_responses_are_not_cached(replicated):
+    replicated.extensions['response_cache'] = LRUCache()
+    response = replicated.test_client().get('/api/v1/projects/1', headers=replicated.config['test_headers'])
+    assert response.get_json()['project']['name'] == 'Original'
+    assert response.headers.get('ETag') is None
+    
+    replicated.extensions['db_replicas'].mark_down(_replica(replicated), 'test')
+    assert _project_name(replicated) == 'Updated'
+
+def test_failover_when_the_replica_is_marked_down(replicated):
+    pool = replicated.extensions['db_replicas']
+    pool.mark_down(_replica(replicated), 'test')
+    assert _project_name(replicated) == 'Updated'
+    
+    _replica(replicated).down_until = 0.0
+    assert _project_name(replicated) == 'Original'
+
+def test_failover_when_the_probe_fails(replicated, monkeypatch):
+    replica = _replica(replicated)
+    
+    def connect():
+        raise OperationalError('SELECT 1', {}, Exception('unable to open database file'))
+    
+    monkeypatch.setattr(replica.engine, 'connect', connect)
+    assert _project_name(replicated) == 'Updated'
+    assert replica.down_until > time.monotonic()
+
+def test_failover_when_the_replica_lags(replicated, monkeypatch):
+    pool = replicated.extensions['db_replicas']
+    monkeypatch.setattr(pool, '_lag', lambda connection: pool.max_lag + 1)
+    assert _project_name(replicated) == 'Updated'
+    assert _replica(replicated).down_until > time.monotonic()
@@ -0,0 +1,19 @@
+from app import db
+from app.models import Project, Task
+from app.utils import search
+
+def test_like_fallback_matches_underscores_literally(client, make_user, monkeypatch):
+    monkeypatch.setattr(search, 'search_backend', lambda: 'like')
+    owner, headers = make_user('owner')
+    project = Project(name='Project', owner_id=owner.id)
+    db.session.add(project)
+    db.session.flush()
+    db.session.add_all([
+        Task(title='Rename user_id column', project_id=project.id),
+        Task(title='Rename userXid column', project_id=project.id)
+    ])
+    db.session.commit()
+    
+    response = client.get('/api/v1/search?q=user_id', headers=headers)
+    assert response.status_code == 200
+    assert [task['title'] for task in response.get_json()['tasks']] == ['Rename user_id column']
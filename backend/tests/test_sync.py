@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models import ChangeLog
+
+def _token(client, headers):
+    response = client.get('/api/v1/sync', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()['token']
+
+def _create_project(client, headers):
+    return client.post('/api/v1/projects', headers=headers, json={'name': 'Project'}).get_json()['project']['id']
+
+def _create_task(client, headers, project_id, title='Task'):
+    return client.post('/api/v1/tasks', headers=headers, json={'title': title, 'project_id': project_id}).get_json()['task']['id']
+
+def _age_changes():
+    ChangeLog.query.update({'created_at': datetime.utcnow() - timedelta(minutes=2)})
+    db.session.commit()
+
+def test_recent_changes_are_held_back(app, client, make_user):
+    owner, headers = make_user('owner')
+    project_id = _create_project(client, headers)
+    _age_changes()
+    token = _token(client, headers)
+    
+    app.config['SYNC_SETTLE_SECONDS'] = 60
+    task_id = _create_task(client, headers, project_id)
+    # A transaction that has not committed yet may hold a lower id than
+    # this row, so neither the token nor the changes may pass it
+    assert _token(client, headers) == token
+    assert client.get(f'/api/v1/sync?since={token}', headers=headers).status_code == 204
+    
+    _age_changes()
+    response = client.get(f'/api/v1/sync?since={token}', headers=headers)
+    assert response.status_code == 200
+    assert [task['id'] for task in response.get_json()['tasks']['upserted']] == [task_id]
+
+def test_pruned_and_unknown_tokens_expire(app, client, make_user):
+    owner, headers = make_user('owner')
+    
+    # Empty log: only the initial token is valid
+    assert _token(client, headers) == '0'
+    assert client.get('/api/v1/sync?since=0', headers=headers).status_code == 204
+    assert client.get('/api/v1/sync?since=5', headers=headers).status_code == 410
+    
+    project_id = _create_project(client, headers)
+    for number in range(3):
+        _create_task(client, headers, project_id, f'Task {number}')
+    newest = db.session.query(db.func.max(ChangeLog.id)).scalar()
+    assert client.get(f'/api/v1/sync?since={newest + 1}', headers=headers).status_code == 410
+    
+    result = app.test_cli_runner().invoke(args=['prune-change-log', '--days', '0'])
+    assert result.exit_code == 0, result.output
+    # The newest entry is kept, so pruned tokens are still recognised
+    assert db.session.query(ChangeLog.id).all() == [(newest,)]
+    assert client.get('/api/v1/sync?since=0', headers=headers).status_code == 410
+    assert client.get(f'/api/v1/sync?since={newest - 1}', headers=headers).status_code == 200
+    assert client.get(f'/api/v1/sync?since={newest}', headers=headers).status_code == 204
+
+def test_new_member_receives_the_existing_tasks(client, make_user):
+    owner, headers = make_user('owner')
+    member, member_headers = make_user('member')
+    project_id = _create_project(client, headers)
+    task_ids = [_create_task(client, headers, project_id, f'Task {number}') for number in range(3)]
+    
+    token = _token(client, member_headers)
+    assert client.post(f'/api/v1/projects/{project_id}/members', headers=headers, json={'user_id': member.id}).status_code == 200
+    
+    changes = client.get(f'/api/v1/sync?since={token}', headers=member_headers).get_json()
+    assert [project['id'] for project in changes['projects']['upserted']] == [project_id]
+    assert sorted(task['id'] for task in changes['tasks']['upserted']) == task_ids
+    
+    # Addressed to the new member only
+    assert client.get(f'/api/v1/sync?since={token}', headers=headers).get_json()['tasks']['upserted'] == []
+
+def test_non_member_assignee_syncs_assigned_tasks(client, make_user):
+    owner, headers = make_user('owner')
+    assignee, assignee_headers = make_user('assignee')
+    other, _ = make_user('other')
+    project_id = _create_project(client, headers)
+    token = _token(client, assignee_headers)
+    
+    task_id = client.post('/api/v1/tasks', headers=headers, json={
+        'title': 'Assigned', 'project_id': project_id, 'assignee_id': assignee.id
+    }).get_json()['task']['id']
+    unassigned_id = _create_task(client, headers, project_id, 'Unassigned')
+    
+    changes = client.get(f'/api/v1/sync?since={token}', headers=assignee_headers).get_json()
+    assert [task['id'] for task in changes['tasks']['upserted']] == [task_id]
+    assert unassigned_id not in changes['tasks']['deleted']
+    token = changes['token']
+    
+    # Reassigned away: the task must disappear from the assignee's clients
+    assert client.put(f'/api/v1/tasks/{task_id}', headers=headers, json={'assignee_id': other.id}).status_code == 200
+    changes = client.get(f'/api/v1/sync?since={token}', headers=assignee_headers).get_json()
+    assert changes['tasks'] == {'upserted': [], 'deleted': [task_id]}
+    token = changes['token']
+    
+    # Assigned again through a bulk update, then deleted
+    client.post('/api/v1/tasks/bulk', headers=headers, json={'operations': [
+        {'op': 'update', 'id': task_id, 'data': {'assignee_id': assignee.id}}
+    ]})
+    changes = client.get(f'/api/v1/sync?since={token}', headers=assignee_headers).get_json()
+    assert [task['id'] for task in changes['tasks']['upserted']] == [task_id]
+    token = changes['token']
+    
+    assert client.delete(f'/api/v1/tasks/{task_id}', headers=headers).status_code == 200
+    changes = client.get(f'/api/v1/sync?since={token}', headers=assignee_headers).get_json()
+    assert changes['tasks'] == {'upserted': [], 'deleted': [task_id]}
+
+def test_member_assignee_keeps_reassigned_tasks(client, make_user):
+    owner, headers = make_user('owner')
+    member, member_headers = make_user('member')
+    project_id = _create_project(client, headers)
+    client.post(f'/api/v1/projects/{project_id}/members', headers=headers, json={'user_id': member.id})
+    task_id = client.post('/api/v1/tasks', headers=headers, json={
+        'title': 'Assigned', 'project_id': project_id, 'assignee_id': member.id
+    }).get_json()['task']['id']
+    token = _token(client, member_headers)
+    
+    client.put(f'/api/v1/tasks/{task_id}', headers=headers, json={'assignee_id': owner.id})
+    changes = client.get(f'/api/v1/sync?since={token}', headers=member_headers).get_json()
+    assert [task['id'] for task in changes['tasks']['upserted']] == [task_id]
+    assert changes['tasks']['deleted'] == []
@@ -0,0 +1,107 @@
+import json
+import math
+from app import db
+from app.models import Project, Task
+
+def _add_projects(owner, member, assignee, count):
+    """Add ``count`` projects with tasks spread over the three users"""
+    for _ in range(count):
+        project = Project(name='Project', owner_id=owner.id)
+        project.members.append(member)
+        db.session.add(project)
+        db.session.flush()
+        for number in range(5):
+            db.session.add(Task(
+                title=f'Task {number}',
+                project_id=project.id,
+                assignee_id=(owner.id, member.id, assignee.id)[number % 3]
+            ))
+    db.session.commit()
+
+def test_get_tasks_statement_count_is_constant(client, make_user, count_statements):
+    owner, headers = make_user('owner')
+    member, member_headers = make_user('member')
+    assignee, assignee_headers = make_user('assignee')
+    
+    counts = []
+    for projects in (1, 10):
+        _add_projects(owner, member, assignee, projects)
+        for request_headers in (headers, member_headers, assignee_headers):
+            for query in ('', '?assignees=map'):
+                with count_statements() as counter:
+                    response = client.get(f'/api/v1/tasks{query}', headers=request_headers)
+                assert response.status_code == 200
+                counts.append((request_headers is headers, query, counter.count))
+    
+    small, large = counts[:len(counts) // 2], counts[len(counts) // 2:]
+    assert small == large
+    assert all(count <= 3 for _, _, count in large)
+
+def test_get_tasks_lists_assigned_and_project_tasks(client, make_user):
+    owner, headers = make_user('owner')
+    member, member_headers = make_user('member')
+    assignee, assignee_headers = make_user('assignee')
+    _add_projects(owner, member, assignee, 2)
+    
+    assert len(client.get('/api/v1/tasks', headers=headers).get_json()['tasks']) == 10
+    assert len(client.get('/api/v1/tasks', headers=member_headers).get_json()['tasks']) == 10
+    # Not a member: only the tasks assigned to them
+    assert len(client.get('/api/v1/tasks', headers=assignee_headers).get_json()['tasks']) == 2
+
+def test_bulk_reports_invalid_ids_per_operation(client, make_user):
+    owner, headers = make_user('owner')
+    project = Project(name='Project', owner_id=owner.id)
+    db.session.add(project)
+    db.session.commit()
+    
+    response = client.post('/api/v1/tasks/bulk', headers=headers, json={'operations': [
+        {'op': 'update', 'id': [1], 'data': {'title': 'x'}},
+        {'op': 'delete', 'id': {'id': 1}},
+        {'op': 'create', 'data': {'title': 'x', 'project_id': [project.id]}},
+        {'op': 'create', 'data': {'title': 'x', 'project_id': {'id': project.id}}},
+        {'op': 'update', 'id': True, 'data': {'title': 'x'}},
+        {'op': 'create', 'data': ['title']},
+        {'op': 'create', 'data': {'title': 'Created', 'project_id': project.id}}
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['error'] for result in results[:6]] == [
+        'Invalid task ID', 'Invalid task ID', 'Invalid project ID', 'Invalid project ID',
+        'Invalid task ID', 'Invalid task data'
+    ]
+    assert results[6]['status'] == 'ok'
+
+def test_export_varies_on_accept_encoding(client, make_user):
+    owner, headers = make_user('owner')
+    for encoding in ('gzip', 'identity'):
+        response = client.get('/api/v1/tasks/export', headers={**headers, 'Accept-Encoding': encoding})
+        assert response.status_code == 200
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert (response.headers.get('Content-Encoding') == 'gzip') == (encoding == 'gzip')
+
+def test_reorder_announces_an_inline_rebalance(app, client, make_user):
+    owner, headers = make_user('owner')
+    project = Project(name='Project', owner_id=owner.id)
+    db.session.add(project)
+    db.session.flush()
+    # No float fits between the first two keys
+    tasks = [
+        Task(title=title, project_id=project.id, status='not-started', position=position)
+        for title, position in (('a', 1.0), ('b', math.nextafter(1.0, 2.0)), ('c', 3.0))
+    ]
+    db.session.add_all(tasks)
+    db.session.commit()
+    
+    subscription = app.extensions['event_broker'].subscribe(f'project:{project.id}')
+    response = client.post('/api/v1/tasks/reorder', headers=headers, json={'task_id': tasks[2].id, 'position': 2})
+    assert response.status_code == 200
+    
+    events = []
+    while (message := subscription.get(timeout=0)) is not None:
+        events.append(json.loads(message))
+    subscription.close()
+    assert [event['type'] for event in events] == ['tasks.rebalanced', 'task.reordered']
+    assert events[0]['data'] == {'status': 'not-started'}
+    
+    titles = [task['title'] for task in client.get(f'/api/v1/tasks/project/{project.id}', headers=headers).get_json()['tasks']]
+    assert titles == ['a', 'c', 'b']
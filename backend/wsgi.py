@@ -0,0 +1,11 @@
+"""
+Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Uses ProductionConfig unless FLASK_ENV names another configuration.
+"""
+import os
+from app import create_app
+
+app = create_app(os.getenv('FLASK_ENV', 'production'))
@@ -10,4 +10,5 @@ export const projectEndpoints = {
   removeMember: (projectId, memberId) => `/projects/${projectId}/members/${memberId}`,
   updateProgress: (id) => `/projects/${id}/progress`,
   getMembers: (id) => `/projects/${id}/members`,
+  events: (id) => `/projects/${id}/events`,
 };
\ No newline at end of file
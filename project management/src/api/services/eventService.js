@@ -0,0 +1,43 @@
+// Project event service - live board updates over Server-Sent Events
+import { API_BASE_URL } from '../config/axiosConfig';
+import { projectEndpoints } from '../endpoints/projectEndpoints';
+
+const EVENT_TYPES = [
+  'task.created',
+  'task.updated',
+  'task.reordered',
+  'task.deleted',
+  'tasks.bulk',
+  'tasks.rebalanced',
+  'member.added',
+  'member.removed',
+  'project.updated',
+  'project.deleted',
+];
+
+export const eventService = {
+  // Subscribe to a project's change events. `onEvent` receives the parsed
+  // event ({ type, project_id, version, data }); `onResync` is called when
+  // the server asks the client to reload because it fell behind.
+  // Returns a function that closes the connection.
+  subscribe: (projectId, { onEvent, onResync } = {}) => {
+    const token = localStorage.getItem('authToken');
+    const url = `${API_BASE_URL}${projectEndpoints.events(projectId)}?jwt=${encodeURIComponent(token || '')}`;
+    const source = new EventSource(url);
+
+    const handle = (message) => {
+      if (onEvent) {
+        onEvent(JSON.parse(message.data));
+      }
+    };
+
+    EVENT_TYPES.forEach((type) => source.addEventListener(type, handle));
+    source.addEventListener('resync', () => {
+      if (onResync) {
+        onResync();
+      }
+    });
+
+    return () => source.close();
+  },
+};